@@ -1,5 +1,6 @@
 from .gamuLogger import Logger, LEVELS, SENSITIVE_LEVELS, TERMINAL_TARGETS, Target
 from .gamuLogger import deepDebug, debug, info, warning, error, critical, message
-from .gamuLogger import debugFunc, deepDebugFunc, chrono, Module
+from .gamuLogger import debugFunc, deepDebugFunc, chrono, Module, OVERFLOW_POLICIES, FORMATS
+from .asyncLogger import AsyncLogger
 
 __version__ = "{version}"
\ No newline at end of file
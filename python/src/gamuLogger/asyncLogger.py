@@ -0,0 +1,60 @@
+import asyncio
+from typing import Any
+
+from .utils import getCallerFrame, getCallerFilePath, getCallerFunctionName
+from .customTypes import LEVELS
+from .gamuLogger import Logger, legacyCallerInfo
+
+
+class AsyncLogger:
+    """
+    asyncio front end of the `Logger`, sharing its targets and configuration; the event loop never waits for the outputs:
+    ```python
+    await AsyncLogger.info("request handled")   # returns once the line is written, the loop runs other tasks meanwhile
+    Logger.submit(LEVELS.INFO, "request handled") # does not wait at all
+    await Logger.aflush()                       # before shutting down
+    ```
+    The record (time, caller, module, thread) is created in the calling coroutine; it is then written by the writer thread of
+    `Logger.submit`, in order
+    """
+    @staticmethod
+    async def deepDebug(message : Any, *args : Any, callerInfo : tuple[str, str]|None = None):
+        await AsyncLogger.__log(LEVELS.DEEP_DEBUG, message, args, callerInfo)
+
+    @staticmethod
+    async def debug(message : Any, *args : Any, callerInfo : tuple[str, str]|None = None):
+        await AsyncLogger.__log(LEVELS.DEBUG, message, args, callerInfo)
+
+    @staticmethod
+    async def info(message : Any, *args : Any, callerInfo : tuple[str, str]|None = None):
+        await AsyncLogger.__log(LEVELS.INFO, message, args, callerInfo)
+
+    @staticmethod
+    async def warning(message : Any, *args : Any, callerInfo : tuple[str, str]|None = None):
+        await AsyncLogger.__log(LEVELS.WARNING, message, args, callerInfo)
+
+    @staticmethod
+    async def error(message : Any, *args : Any, callerInfo : tuple[str, str]|None = None):
+        await AsyncLogger.__log(LEVELS.ERROR, message, args, callerInfo)
+
+    @staticmethod
+    async def critical(message : Any, *args : Any, callerInfo : tuple[str, str]|None = None):
+        await AsyncLogger.__log(LEVELS.CRITICAL, message, args, callerInfo)
+
+    @staticmethod
+    async def flush():
+        """
+        Same as `Logger.aflush()`
+        """
+        await Logger.aflush()
+
+    @staticmethod
+    async def __log(level : LEVELS, message : Any, args : tuple, callerInfo : tuple[str, str]|None):
+        if not Logger.isEnabledFor(level):
+            return
+        if args and callerInfo is None:
+            args, callerInfo = legacyCallerInfo(message, args, stacklevel=4) # reported at the line awaiting the logging method
+        if callerInfo is None:
+            frame = getCallerFrame(2) # the coroutine awaiting the logging method
+            callerInfo = getCallerFilePath(frame), getCallerFunctionName(frame)
+        await asyncio.wrap_future(Logger.submit(level, message, *args, callerInfo=callerInfo))
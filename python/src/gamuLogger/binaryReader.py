@@ -0,0 +1,45 @@
+from typing import Iterator
+import argparse
+import sys
+
+from .customTypes import LEVELS, Target
+from .logRecord import LogRecord
+from .binarySink import Entry, readLog
+
+
+def renderEntry(entry : Entry, targetType : Target.Type = Target.Type.FILE, timePrecision : int = 0) -> str:
+    """
+    Render an entry of a binary log as the line a text target would have written (ending with a new line)
+    """
+    timestamp, level, module, file, function, message = entry
+    if level is None: # written by `Logger.message`
+        return message + "\n"
+    record = LogRecord.restore(LEVELS(level), message, (file or "", function or ""), timestamp, module, timePrecision)
+    return record.render(targetType)
+
+
+def render(filepath : str, targetType : Target.Type = Target.Type.FILE, timePrecision : int = 0) -> Iterator[str]:
+    """
+    The lines of every segment of a binary log, in writing order
+    """
+    for entry in readLog(filepath):
+        yield renderEntry(entry, targetType, timePrecision)
+
+
+def main(argv : list[str]|None = None):
+    parser = argparse.ArgumentParser(prog="python -m gamuLogger.binaryReader", description="Print a binary log in the gamuLogger text format")
+    parser.add_argument('file', help='path given to the binary target (the segments are <file>.000001, <file>.000002...)')
+    parser.add_argument('--timePrecision', '-p', type=int, default=0, help='number of decimals of the seconds')
+    parser.add_argument('--color', action='store_true', help='color the lines like a terminal target')
+    args = parser.parse_args(argv)
+
+    targetType = Target.Type.TERMINAL if args.color else Target.Type.FILE
+    try:
+        for line in render(args.file, targetType, args.timePrecision):
+            sys.stdout.write(line)
+    except BrokenPipeError:
+        pass # piped to head or less
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,225 @@
+from typing import Iterator
+import glob
+import mmap
+import os
+import re
+import struct
+import threading
+import weakref
+import atexit
+
+
+MAGIC = b"GAMULOG\x01" # first bytes of every segment, the last one is the version of the format
+FRAME = struct.Struct('<IB') # length of the body, kind of frame
+RECORD = struct.Struct('<qBII') # timestamp (ns), level, module id, call site id; followed by the message
+ID = struct.Struct('<I')
+
+FRAME_MODULE = 1 # id, complete name of the module
+FRAME_SITE = 2 # id, file and function separated by a null character
+FRAME_RECORD = 3
+
+RAW_LEVEL = 255 # level of the messages written by `Logger.message`, that have no level nor call site
+
+Entry = tuple[int, int|None, str|None, str|None, str|None, str] # timestamp (ns), level value, module, file, function, message
+
+
+class BinarySink:
+    """
+    Append the records to memory-mapped segment files (`<filepath>.000001`, `<filepath>.000002`...) of `segmentSize` bytes,
+    allocated when they are opened: a record is a few bytes copied in memory, and a new segment is started when the current one is full\n
+    The targets using it receive entries (see `Entry`) instead of lines; each segment is self-contained, the modules and call sites
+    are written once per segment and then referred to by an id. A segment is cut to its used size when it is closed, and the
+    unused end of a segment left by a crash reads as the end of the log. Use `binaryReader` to read the segments as text
+    """
+    __instances = weakref.WeakSet() #type: weakref.WeakSet[BinarySink]
+
+    def __init__(self, filepath : str, segmentSize : int = 64 * 1024 * 1024):
+        if segmentSize < len(MAGIC) + FRAME.size + RECORD.size:
+            raise ValueError("The segment size is too small")
+        self.filepath = filepath
+        self.segmentSize = segmentSize
+        self.lock = threading.RLock()
+        self.segment = 0 # index of the current segment
+        self.__file = None
+        self.__map = None #type: mmap.mmap|None
+        self.__position = 0
+        self.__modules = {} #type: dict[str, int]
+        self.__sites = {} #type: dict[tuple[str, str], int]
+        self.__open()
+
+        BinarySink.__instances.add(self)
+
+    @property
+    def __name__(self) -> str:
+        return self.filepath
+
+    def segmentPath(self, index : int) -> str:
+        return f"{self.filepath}.{index:06d}"
+
+    @staticmethod
+    def segments(filepath : str) -> list[str]:
+        """
+        The segment files of a binary log, in writing order
+        """
+        pattern = re.compile(re.escape(os.path.basename(filepath)) + r"\.\d{6}$")
+        return sorted(path for path in glob.glob(glob.escape(filepath) + ".*") if pattern.match(os.path.basename(path)))
+
+    def __open(self, size : int = 0):
+        """
+        Start a new segment, after the existing ones
+        """
+        existing = BinarySink.segments(self.filepath)
+        index = max(self.segment, int(existing[-1].rsplit('.', 1)[1]) if existing else 0) + 1
+        while True:
+            try:
+                file = open(self.segmentPath(index), 'x+b') # another process may create the same segment
+                break
+            except FileExistsError:
+                index += 1
+        size = max(size, self.segmentSize)
+        file.truncate(size)
+        self.__file = file
+        self.__map = mmap.mmap(file.fileno(), size)
+        self.__map[:len(MAGIC)] = MAGIC
+        self.__position = len(MAGIC)
+        self.segment = index
+
+    def __encode(self, entry : Entry) -> bytes:
+        timestamp, level, module, file, function, message = entry
+        frames = []
+        moduleId = 0
+        if module is not None:
+            moduleId = self.__modules.get(module, 0)
+            if moduleId == 0:
+                moduleId = self.__modules[module] = len(self.__modules) + 1
+                body = ID.pack(moduleId) + module.encode('utf-8')
+                frames.append(FRAME.pack(len(body), FRAME_MODULE) + body)
+        siteId = 0
+        if file is not None and function is not None:
+            siteId = self.__sites.get((file, function), 0)
+            if siteId == 0:
+                siteId = self.__sites[(file, function)] = len(self.__sites) + 1
+                body = ID.pack(siteId) + f"{file}\0{function}".encode('utf-8')
+                frames.append(FRAME.pack(len(body), FRAME_SITE) + body)
+        body = RECORD.pack(timestamp, RAW_LEVEL if level is None else level, moduleId, siteId) + message.encode('utf-8')
+        frames.append(FRAME.pack(len(body), FRAME_RECORD) + body)
+        return b''.join(frames)
+
+    def __call__(self, entry : Entry):
+        with self.lock:
+            if self.__map is None:
+                self.__open()
+            data = self.__encode(entry)
+            if self.__position + len(data) > len(self.__map): #type: ignore
+                self.__close()
+                data = self.__encode(entry) # the new segment defines the module and the call site again
+                self.__open(len(MAGIC) + len(data))
+            start = self.__position
+            # the header is copied last: a reader never sees a frame before its body is complete
+            self.__map[start + FRAME.size:start + len(data)] = data[FRAME.size:] #type: ignore
+            self.__map[start:start + FRAME.size] = data[:FRAME.size] #type: ignore
+            self.__position += len(data)
+
+    def flush(self):
+        """
+        Write the modified pages of the segment to the disk (the records are visible to readers as soon as they are written);
+        called by `Logger.flush()`, not after each ERROR record like the other outputs
+        """
+        with self.lock:
+            if self.__map is not None:
+                self.__map.flush()
+
+    def __close(self):
+        self.__map.flush() #type: ignore
+        self.__map.close() #type: ignore
+        self.__file.truncate(self.__position) #type: ignore
+        self.__file.close() #type: ignore
+        self.__map = None
+        self.__file = None
+        self.__modules = {} # the ids are only valid in their segment
+        self.__sites = {}
+
+    def roll(self):
+        """
+        Close the current segment and start a new one
+        """
+        with self.lock:
+            if self.__map is not None:
+                self.__close()
+            self.__open()
+
+    def close(self):
+        """
+        Close the current segment, cut to its used size; a new segment is started if the sink is used after being closed
+        """
+        with self.lock:
+            if self.__map is not None:
+                self.__close()
+
+    @property
+    def closed(self) -> bool:
+        return self.__map is None
+
+    @staticmethod
+    def closeAll():
+        for sink in list(BinarySink.__instances):
+            sink.close()
+
+    @staticmethod
+    def afterFork():
+        """
+        Called in the child process after `os.fork()`: the segment is shared with the parent, so the child leaves it to the parent
+        and writes its records in a segment of its own, started on its first record
+        """
+        for sink in list(BinarySink.__instances):
+            sink.lock = threading.RLock()
+            if sink.__map is not None:
+                sink.__map.close() # only unmapped in the child
+                sink.__file.close() #type: ignore
+                sink.__map = None
+                sink.__file = None
+                sink.__modules = {}
+                sink.__sites = {}
+
+
+def readSegment(path : str) -> Iterator[Entry]:
+    """
+    Decode the records of a segment file, in writing order
+    """
+    with open(path, 'rb') as file:
+        data = file.read()
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a gamuLogger binary log segment")
+    modules = {} #type: dict[int, str]
+    sites = {} #type: dict[int, tuple[str, str]]
+    position = len(MAGIC)
+    while position + FRAME.size <= len(data):
+        length, kind = FRAME.unpack_from(data, position)
+        start = position + FRAME.size
+        if length == 0 or start + length > len(data):
+            return # the unused end of the segment, or a record cut by a crash
+        match kind:
+            case 1: # FRAME_MODULE
+                modules[ID.unpack_from(data, start)[0]] = data[start + ID.size:start + length].decode('utf-8')
+            case 2: # FRAME_SITE
+                file, function = data[start + ID.size:start + length].decode('utf-8').split('\0', 1)
+                sites[ID.unpack_from(data, start)[0]] = (file, function)
+            case 3: # FRAME_RECORD
+                timestamp, level, moduleId, siteId = RECORD.unpack_from(data, start)
+                file, function = sites.get(siteId, (None, None))
+                message = data[start + RECORD.size:start + length].decode('utf-8')
+                yield timestamp, None if level == RAW_LEVEL else level, modules.get(moduleId), file, function, message
+            case _:
+                raise ValueError(f"Unknown frame kind {kind} in {path}")
+        position = start + length
+
+
+def readLog(filepath : str) -> Iterator[Entry]:
+    """
+    Decode the records of every segment of a binary log, in writing order
+    """
+    for path in BinarySink.segments(filepath):
+        yield from readSegment(path)
+
+
+atexit.register(BinarySink.closeAll)
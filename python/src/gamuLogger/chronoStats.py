@@ -0,0 +1,183 @@
+from typing import Any, Callable
+import threading
+import traceback
+
+
+class ChronoStats:
+    """
+    Timing statistics of a function decorated with `@chrono(stats=True)`: count, total, min, max and a streaming histogram\n
+    The histogram keeps 16 buckets per power of two, so the quantiles are exact below 16ns and within 1/16 (6.25%) above;
+    its size does not depend on the number of calls
+    """
+    SUB_BUCKETS = 16
+    __instances = {} #type: dict[str, ChronoStats]
+    __instancesLock = threading.Lock()
+    __reporter = None #type: threading.Thread|None
+    __reporterInterval = 0.0
+    __reporterCallback = None #type: Callable[[], None]|None
+    __reporterWakeUp = threading.Event()
+    __reporterLock = threading.Lock()
+
+    def __init__(self, name : str):
+        self.name = name
+        self.__lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Forget every recorded duration
+        """
+        with self.__lock:
+            self.count = 0
+            self.total = 0 # in nanoseconds
+            self.min = 0
+            self.max = 0
+            self.__buckets = {} #type: dict[int, int]
+
+    def add(self, duration : int):
+        """
+        Record a duration, in nanoseconds
+        """
+        index = ChronoStats.__bucket(duration)
+        with self.__lock:
+            if self.count == 0 or duration < self.min:
+                self.min = duration
+            if duration > self.max:
+                self.max = duration
+            self.count += 1
+            self.total += duration
+            self.__buckets[index] = self.__buckets.get(index, 0) + 1
+
+    def quantile(self, q : float) -> int:
+        """
+        Estimated duration (in nanoseconds) below which a fraction `q` of the calls are
+        """
+        with self.__lock:
+            return self.__quantile(q)
+
+    def __quantile(self, q : float) -> int:
+        if self.count == 0:
+            return 0
+        rank = q * self.count
+        seen = 0
+        for index in sorted(self.__buckets):
+            seen += self.__buckets[index]
+            if seen >= rank:
+                lower, width = ChronoStats.__bounds(index)
+                return min(max(lower + width // 2, self.min), self.max)
+        return self.max
+
+    def toDict(self) -> dict[str, Any]:
+        """
+        The statistics, durations in seconds:
+        `{"count": 3, "total": 0.3, "mean": 0.1, "min": 0.05, "max": 0.2, "p50": 0.05, "p95": 0.2, "p99": 0.2}`
+        """
+        with self.__lock:
+            return {
+                "count": self.count,
+                "total": self.total / 1e9,
+                "mean": self.total / self.count / 1e9 if self.count else 0.0,
+                "min": self.min / 1e9,
+                "max": self.max / 1e9,
+                "p50": self.__quantile(0.50) / 1e9,
+                "p95": self.__quantile(0.95) / 1e9,
+                "p99": self.__quantile(0.99) / 1e9
+            }
+
+    @staticmethod
+    def __bucket(duration : int) -> int:
+        if duration < ChronoStats.SUB_BUCKETS:
+            return max(duration, 0)
+        shift = duration.bit_length() - 5 # keep the leading bit and the 4 next ones
+        return (shift + 1) * ChronoStats.SUB_BUCKETS + ((duration >> shift) & 15)
+
+    @staticmethod
+    def __bounds(index : int) -> tuple[int, int]:
+        """
+        Lowest duration and width of a bucket
+        """
+        if index < ChronoStats.SUB_BUCKETS:
+            return index, 1
+        shift = index // ChronoStats.SUB_BUCKETS - 1
+        return (ChronoStats.SUB_BUCKETS + index % ChronoStats.SUB_BUCKETS) << shift, 1 << shift
+
+    @staticmethod
+    def get(name : str) -> 'ChronoStats':
+        """
+        The statistics of the function `name`, created if needed
+        """
+        with ChronoStats.__instancesLock:
+            if name not in ChronoStats.__instances:
+                ChronoStats.__instances[name] = ChronoStats(name)
+            return ChronoStats.__instances[name]
+
+    @staticmethod
+    def all(reset : bool = False) -> dict[str, dict[str, Any]]:
+        """
+        The statistics of every function that was called at least once, by name; with `reset`, they start again from zero
+        """
+        with ChronoStats.__instancesLock:
+            instances = list(ChronoStats.__instances.values())
+        result = {}
+        for stats in instances:
+            if stats.count > 0:
+                result[stats.name] = stats.toDict()
+                if reset:
+                    stats.reset()
+        return result
+
+    @staticmethod
+    def clear():
+        """
+        Reset the statistics of every function (they stay registered, as the decorated functions keep recording in them)
+        """
+        with ChronoStats.__instancesLock:
+            instances = list(ChronoStats.__instances.values())
+        for stats in instances:
+            stats.reset()
+
+    @staticmethod
+    def setReporter(interval : float, callback : Callable[[], None]|None):
+        """
+        Call `callback` every `interval` seconds from a background thread; `interval=0` stops it
+        """
+        with ChronoStats.__reporterLock:
+            ChronoStats.__reporterInterval = interval
+            ChronoStats.__reporterCallback = callback
+            ChronoStats.__reporterWakeUp.set() # the running thread takes the new interval into account
+            if interval > 0 and ChronoStats.__reporter is None:
+                ChronoStats.__reporter = threading.Thread(target=ChronoStats.__report, name="gamuLogger-chrono", daemon=True)
+                ChronoStats.__reporter.start()
+
+    @staticmethod
+    def __report():
+        while True:
+            with ChronoStats.__reporterLock:
+                interval = ChronoStats.__reporterInterval
+                if interval <= 0:
+                    ChronoStats.__reporter = None
+                    return
+                ChronoStats.__reporterWakeUp.clear()
+            if ChronoStats.__reporterWakeUp.wait(interval):
+                continue # the interval changed
+            callback = ChronoStats.__reporterCallback
+            if callback is not None:
+                try:
+                    callback()
+                except Exception:
+                    traceback.print_exc()
+
+    @staticmethod
+    def afterFork():
+        """
+        Called in the child process after `os.fork()`: the child starts with empty statistics and its own reporter thread
+        """
+        ChronoStats.__instancesLock = threading.Lock()
+        for stats in ChronoStats.__instances.values():
+            stats.__lock = threading.Lock()
+            stats.reset()
+        ChronoStats.__reporterLock = threading.Lock()
+        ChronoStats.__reporterWakeUp = threading.Event()
+        ChronoStats.__reporter = None
+        if ChronoStats.__reporterInterval > 0:
+            ChronoStats.setReporter(ChronoStats.__reporterInterval, ChronoStats.__reporterCallback)
@@ -7,74 +7,115 @@ from json import loads
 from xml.etree import ElementTree
 import threading
 
+from .sinks import FileSink, RotatingFileSink, BackgroundWriter, OVERFLOW_POLICIES, parseSize, parseInterval
+from .binarySink import BinarySink
+from .redaction import Redactor
+from .filters import TargetFilter
+from .lineTemplate import LineTemplate
+
 class Module:
+    """
+    A named part of the program, attached to a file and a function; modules are indexed both by (file, function) and by complete name
+    """
+    __slots__ = ('parent', 'name', 'file', 'function', '__completeName', '__completePath', '__renderings')
     __instances = {} #type: dict[tuple[str|None, str|None], Module]
+    __byName = {} #type: dict[str, Module]
+    
     def __init__(self, name : str, parent : 'Module|None' = None, file : str|None = None, function : str|None = None):
         self.parent = parent
         self.name = name
         self.file = file
         self.function = function
         
+        # the parent of a module never changes, so its complete name and path can be computed once
+        self.__completeName = name if parent is None else f'{parent.getCompleteName()}.{name}' #type: str
+        self.__completePath = [name] if parent is None else parent.getCompletePath() + [name] #type: list[str]
+        self.__renderings = {} #type: dict[Target.Type, str]
+        
+        previous = Module.__instances.get((file, function))
+        if previous is not None:
+            Module.__unindex(previous)
         Module.__instances[(self.file, self.function)] = self
+        Module.__byName[self.__completeName] = self
     
     def getCompleteName(self) -> str:
-        if self.parent is None:
-            return self.name
-        return f'{self.parent.getCompleteName()}.{self.name}'
+        return self.__completeName
     
     def getCompletePath(self) -> list[str]:
-        if self.parent is None:
-            return [self.name]
-        return self.parent.getCompletePath() + [self.name]
+        return self.__completePath.copy()
+    
+    def render(self, targetType : 'Target.Type') -> str:
+        """
+        Return the path of the module as it appears in a line, each name centered on 15 characters (and colored for terminals)
+        """
+        rendering = self.__renderings.get(targetType)
+        if rendering is None:
+            rendering = self.__renderings[targetType] = Module.renderPath(self.__completePath, targetType)
+        return rendering
+    
+    @staticmethod
+    def renderPath(path : list[str], targetType : 'Target.Type') -> str:
+        """
+        Render a module path as it appears in a line, without the module being registered (see `render`)
+        """
+        if targetType == Target.Type.TERMINAL:
+            return ''.join(f" [ {COLORS.BLUE}{name.center(15)}{COLORS.RESET} ]" for name in path)
+        return ''.join(f" [ {name.center(15)} ]" for name in path)
+    
+    @staticmethod
+    def __unindex(module : 'Module'):
+        if Module.__instances.get((module.file, module.function)) is module:
+            del Module.__instances[(module.file, module.function)]
+        if Module.__byName.get(module.getCompleteName()) is module:
+            del Module.__byName[module.getCompleteName()]
     
     @staticmethod
     def get(filename : str, function : str) -> 'Module':
-        if Module.exist(filename, function):
-            return Module.__instances[(filename, function)]
-        else:
+        module = Module.__instances.get((filename, function))
+        if module is None:
             raise ValueError(f"No module found for file {filename} and function {function}")
+        return module
         
     @staticmethod
     def exist(filename : str, function : str) -> bool:
         return (filename, function) in Module.__instances
     
+    @staticmethod
+    def find(filename : str, function : str) -> 'Module|None':
+        """
+        Return the module of this file and function, or None if there is none
+        """
+        return Module.__instances.get((filename, function))
+    
     @staticmethod
     def delete(filename : str, function : str):
-        if Module.exist(filename, function):
-            del Module.__instances[(filename, function)]
-        else:
-            raise ValueError(f"No module found for file {filename} and function {function}")
+        Module.__unindex(Module.get(filename, function))
     
     @staticmethod
     def getByName(name : str) -> 'Module':
-        for module in Module.__instances.values():
-            if module.getCompleteName() == name:
-                return module
-        raise ValueError(f"No module found for name {name}")
+        module = Module.__byName.get(name)
+        if module is None:
+            raise ValueError(f"No module found for name {name}")
+        return module
     
     @staticmethod
     def existByName(name : str) -> bool:
-        return any(
-            module.getCompleteName() == name
-            for module in Module.__instances.values()
-        )
+        return name in Module.__byName
     
     @staticmethod
     def deleteByName(name : str):
-        if not Module.existByName(name):
-            raise ValueError(f"No module found for name {name}")
-        module = Module.getByName(name)
-        del Module.__instances[(module.file, module.function)]
+        Module.__unindex(Module.getByName(name))
         
     
     @staticmethod
     def clear():
         Module.__instances = {}
+        Module.__byName = {}
         
     @staticmethod
     def new(name : str, file : str|None = None, function : str|None = None) -> 'Module':
-        if Module.existByName(name):
-            existing = Module.getByName(name)
+        existing = Module.__byName.get(name)
+        if existing is not None:
             if file == existing.file and function == existing.function:
                 return existing
             else:
@@ -82,8 +123,6 @@ class Module:
 
         if '.' in name:
             parentName, moduleName = name.rsplit('.', 1)
-            if not Module.existByName(parentName):
-                raise ValueError(f"No module found for name {parentName}")
             #get the parent module
             parent = Module.getByName(parentName)
             return Module(moduleName, parent, file, function)
@@ -235,6 +274,32 @@ class SENSITIVE_LEVELS(Enum):
     def from_bool(value : bool) -> 'SENSITIVE_LEVELS':
         return SENSITIVE_LEVELS.SHOW if value else SENSITIVE_LEVELS.HIDE
     
+class FORMATS(Enum):
+    TEXT = 50
+    JSONL = 51
+    BINARY = 52 # for the targets writing in a `BinarySink`, that receive entries instead of lines
+    
+    def __str__(self) -> str:
+        match self:
+            case FORMATS.TEXT:
+                return 'text'
+            case FORMATS.JSONL:
+                return 'jsonl'
+            case FORMATS.BINARY:
+                return 'binary'
+    
+    @staticmethod
+    def from_string(format : str) -> 'FORMATS':
+        match format.lower():
+            case 'text':
+                return FORMATS.TEXT
+            case 'jsonl' | 'json':
+                return FORMATS.JSONL
+            case 'binary':
+                return FORMATS.BINARY
+            case _:
+                raise ValueError(f"Invalid format: {format}")
+    
 class TERMINAL_TARGETS(Enum):
     STDOUT = 30
     STDERR = 31
@@ -258,6 +323,7 @@ class TERMINAL_TARGETS(Enum):
 
 class Target:
     __instances = {} #type: dict[str, Target]
+    __levelListener = None #type: Callable[[], None]|None # called when the level of a target changes
     
     class Type(Enum):
         FILE = 20
@@ -303,17 +369,58 @@ class Target:
             self.target = target
             
 
-        self.properties = {} #type: dict[str, Any]
+        self.properties = {'format': FORMATS.TEXT, 'template': None} #type: dict[str, Any]
+        self.filter = None #type: TargetFilter|None
         self.__lock = threading.Lock()
+        self.__writer = None #type: BackgroundWriter|None
 
     @staticmethod
-    def fromFile(file : str) -> 'Target':
-        def writeToFile(string : str):
-            with open(file, 'a') as f:
-                f.write(string)
-        with open(file, 'w') as f: # clear the file
-            f.write('')
-        return Target(writeToFile, file)
+    def fromFile(file : str, bufferSize : int = 0, flushInterval : float = 1.0) -> 'Target':
+        """
+        Create a target writing in a file (the file is cleared); the file stays open, see `FileSink` for the buffering options
+        """
+        return Target(FileSink(file, bufferSize, flushInterval), file)
+    
+    @staticmethod
+    def fromRotatingFile(file : str, maxBytes : int|str = 0, rotate : float|str = 0, keep : int = 5, compression : str = 'gzip', bufferSize : int = 0, flushInterval : float = 1.0) -> 'Target':
+        """
+        Create a target writing in a file that is rotated when it reaches `maxBytes` (`"10M"` is accepted) and/or at every `rotate`
+        interval (in seconds, or `"hourly"`, `"daily"`, `"weekly"`, `"30m"`...); the `keep` last files are kept, compressed in the background.
+        The file is not cleared, see `RotatingFileSink`
+        """
+        return Target(RotatingFileSink(file, parseSize(maxBytes), parseInterval(rotate), keep, compression, bufferSize, flushInterval), file)
+    
+    @staticmethod
+    def fromBinaryFile(file : str, segmentSize : int|str = 64 * 1024 * 1024) -> 'Target':
+        """
+        Create a target appending the records to memory-mapped binary segments `<file>.000001`... of `segmentSize` bytes
+        (`"64M"` is accepted), see `BinarySink`; read them with `python -m gamuLogger.binaryReader <file>`
+        """
+        target = Target(BinarySink(file, parseSize(segmentSize)), file)
+        target["format"] = FORMATS.BINARY
+        return target
+    
+    @staticmethod
+    def fromFileOptions(file : str, options : dict[str, Any]) -> 'Target':
+        """
+        Create a file target from configuration options (json data, xml attributes or command line `key=value` arguments); the target is
+        rotating if `rotate` or `maxBytes` is given, and binary if `format` is `binary`
+        """
+        if str(options.get('format', 'text')).lower() == 'binary':
+            return Target.fromBinaryFile(file, options.get('segmentSize', 64 * 1024 * 1024))
+        bufferSize = int(options.get('bufferSize', 0))
+        flushInterval = float(options.get('flushInterval', 1.0))
+        if 'rotate' in options or 'maxBytes' in options:
+            return Target.fromRotatingFile(
+                file,
+                options.get('maxBytes', 0),
+                options.get('rotate', 0),
+                int(options.get('keep', 5)),
+                options.get('compression', 'gzip'),
+                bufferSize,
+                flushInterval
+            )
+        return Target.fromFile(file, bufferSize, flushInterval)
 
     @staticmethod
     def fromJson(fpathOrData: str|dict) -> 'Target':
@@ -324,7 +431,56 @@ class Target:
         {
             "file": "log.txt",
             "level": "info",
-            "sensitiveMode": "hide"
+            "sensitiveMode": "hide",
+            "format": "text",       // optional: text, or jsonl to write one compact json object per line
+            "bufferSize": 8192,     // optional, in characters, 0 to write every line immediately
+            "flushInterval": 1.0    // optional, in seconds
+        }
+        ```
+        Rotating file:
+        ```json
+        {
+            "file": "log.txt",
+            "rotate": "daily",      // optional: interval (hourly, daily, weekly, or seconds)
+            "maxBytes": "10M",      // optional: maximum size of a file
+            "keep": 5,              // optional: number of rotated files to keep
+            "compression": "gzip"   // optional: gzip, zstd or none
+        }
+        ```
+        Binary file (memory-mapped segments log.bin.000001, log.bin.000002...):
+        ```json
+        {
+            "file": "log.bin",
+            "format": "binary",
+            "segmentSize": "64M"    // optional: size of a segment
+        }
+        ```
+        Any target can limit the lines of each call site, keep only a part of the DEBUG and INFO lines, and collapse repeated lines:
+        ```json
+        {
+            "file": "log.txt",
+            "rateLimit": 10,        // lines per second for each call site (file, function and level)
+            "burst": 100,           // optional: lines a call site can write at once, defaults to rateLimit
+            "sampling": 0.1,        // fraction of the DEBUG and INFO lines to keep
+            "summaryInterval": 10,  // optional: seconds between the "N similar messages suppressed" lines
+            "dedup": true,          // hold back the repeats of the previous line, replaced by "last message repeated N times"
+            "dedupTimeout": 5       // optional: seconds after which the repeats held back are reported
+        }
+        ```
+        Any target can lay out its text lines with a template (see `LineTemplate` for the fields):
+        ```json
+        {
+            "terminal": "stdout",
+            "template": "{time} [{level}] {module} {message}"
+        }
+        ```
+        Any target can write from a background thread:
+        ```json
+        {
+            "file": "log.txt",
+            "nonBlocking": true,
+            "queueSize": 10000,             // optional
+            "overflowPolicy": "dropOldest"  // optional: block, dropOldest or dropNewest
         }
         ```
         Stdout (console):
@@ -344,7 +500,7 @@ class Target:
         result = None #type: Target|None
                 
         if 'file' in data:
-            result = Target.fromFile(data['file'])
+            result = Target.fromFileOptions(data['file'], data)
         elif 'terminal' in data:
             result = Target(TERMINAL_TARGETS.from_string(data['terminal']))
         else:
@@ -355,6 +511,12 @@ class Target:
         
         result["level"] = LEVELS.from_string(data['level']) if 'level' in data else LEVELS.INFO
         result["sensitiveMode"] = SENSITIVE_LEVELS.from_string(data['sensitiveMode']) if 'sensitiveMode' in data else SENSITIVE_LEVELS.HIDE
+        result["format"] = result.checkFormat(FORMATS.from_string(data['format']) if 'format' in data else FORMATS.TEXT)
+        result["template"] = LineTemplate(data['template']) if data.get('template') else None
+        result.filter = TargetFilter.fromOptions(data)
+        
+        if data.get('nonBlocking', False):
+            result.setNonBlocking(int(data.get('queueSize', 10000)), OVERFLOW_POLICIES.from_string(data.get('overflowPolicy', 'block')))
         
         return result
 
@@ -364,7 +526,27 @@ class Target:
         examples of xml data:
         File:
         ```xml
-        <target level="info" sensitiveMode="hide" file="log.txt"/>
+        <target level="info" sensitiveMode="hide" file="log.txt" format="text" bufferSize="8192" flushInterval="1.0"/>
+        ```
+        Rotating file:
+        ```xml
+        <target file="log.txt" rotate="daily" maxBytes="10M" keep="5" compression="gzip"/>
+        ```
+        Binary file:
+        ```xml
+        <target file="log.bin" format="binary" segmentSize="64M"/>
+        ```
+        Rate limit and sampling (any target):
+        ```xml
+        <target terminal="stdout" rateLimit="10" burst="100" sampling="0.1" summaryInterval="10" dedup="true" dedupTimeout="5"/>
+        ```
+        Template of the lines (any target, see `LineTemplate` for the fields):
+        ```xml
+        <target terminal="stdout" template="{time} [{level}] {module} {message}"/>
+        ```
+        Non-blocking (any target):
+        ```xml
+        <target file="log.txt" nonBlocking="true" queueSize="10000" overflowPolicy="dropOldest"/>
         ```
         Stdout (console):
         ```xml
@@ -382,7 +564,7 @@ class Target:
             raise ValueError("The root element must be 'target'")
         
         if "file" in data.attrib:
-            result = Target.fromFile(data.attrib['file'])
+            result = Target.fromFileOptions(data.attrib['file'], dict(data.attrib))
         elif "terminal" in data.attrib:
             result = Target(TERMINAL_TARGETS.from_string(data.attrib['terminal']))
         else:
@@ -393,13 +575,86 @@ class Target:
             
         result["level"] = LEVELS.from_string(data.attrib['level']) if 'level' in data.attrib else LEVELS.INFO
         result["sensitiveMode"] = SENSITIVE_LEVELS.from_string(data.attrib['sensitiveMode']) if 'sensitiveMode' in data.attrib else SENSITIVE_LEVELS.HIDE
+        result["format"] = result.checkFormat(FORMATS.from_string(data.attrib['format']) if 'format' in data.attrib else FORMATS.TEXT)
+        result["template"] = LineTemplate(data.attrib['template']) if data.attrib.get('template') else None
+        result.filter = TargetFilter.fromOptions(data.attrib)
+        
+        if data.attrib.get('nonBlocking', 'false').lower() == 'true':
+            result.setNonBlocking(int(data.attrib.get('queueSize', 10000)), OVERFLOW_POLICIES.from_string(data.attrib.get('overflowPolicy', 'block')))
         
         return result
             
 
     def __call__(self, string : str):
+        if self.__writer is not None:
+            self.__writer(string)
+            return
         with self.__lock: # prevent multiple threads to write at the same time
             self.target(string)
+            
+    def flush(self, wait : bool = True):
+        """
+        Flush the underlying output, if it is buffered\n
+        For a non-blocking target, `wait=False` only asks the writer thread to flush after the lines already queued
+        """
+        if self.__writer is not None:
+            if wait:
+                self.__writer.flush()
+            else:
+                self.__writer.requestFlush()
+        elif hasattr(self.target, 'flush'):
+            with self.__lock:
+                self.target.flush()
+                
+    def __writeOutput(self, string : str):
+        self.target(string) # looked up at every call, so the output can be replaced (see `LogHub`)
+                
+    def __flushOutput(self):
+        if hasattr(self.target, 'flush'):
+            self.target.flush()
+                
+    def close(self):
+        """
+        Flush and close the underlying output, if it can be closed (files)
+        """
+        self.setBlocking()
+        if hasattr(self.target, 'close'):
+            with self.__lock:
+                self.target.close()
+                
+    def setNonBlocking(self, queueSize : int = 10000, overflowPolicy : OVERFLOW_POLICIES = OVERFLOW_POLICIES.BLOCK):
+        """
+        Write the lines from a dedicated thread: logging only appends the line to a queue of `queueSize` lines
+        """
+        self.setBlocking()
+        self.__writer = BackgroundWriter(self.__writeOutput, self.__flushOutput, queueSize, overflowPolicy, name=self.__name)
+        
+    def setBlocking(self):
+        """
+        Write the lines in the calling thread (default); the lines still queued are written first
+        """
+        if self.__writer is not None:
+            writer, self.__writer = self.__writer, None
+            writer.close()
+            
+    @property
+    def nonBlocking(self) -> bool:
+        return self.__writer is not None
+    
+    @property
+    def dropped(self) -> int:
+        """
+        Number of lines dropped because the queue of this non-blocking target was full
+        """
+        return self.__writer.dropped if self.__writer is not None else 0
+    
+    def checkFormat(self, format : FORMATS) -> FORMATS:
+        """
+        Return the format if this target can use it: `FORMATS.BINARY` is reserved to the targets writing in a `BinarySink`, which only use it
+        """
+        if (format == FORMATS.BINARY) != isinstance(self.target, BinarySink):
+            raise ValueError(f"Only the targets writing in a BinarySink use the binary format (target {self.__name}, format {format.name.lower()})")
+        return format
         
     def __str__(self) -> str:
         return self.__name
@@ -412,6 +667,15 @@ class Target:
     
     def __setitem__(self, key: str, value: Any):
         self.properties[key] = value
+        if key == 'level' and Target.__levelListener is not None:
+            Target.__levelListener()
+            
+    @staticmethod
+    def setLevelListener(callback : Callable[[], None]|None):
+        """
+        Set the function called every time the level of a target is set (`target["level"] = LEVELS.DEBUG`)
+        """
+        Target.__levelListener = callback
         
     def __delitem__(self, key: str):
         del self.properties[key]
@@ -471,20 +735,68 @@ class Target:
         else:
             raise ValueError(f"Target {name} does not exist")
         
+    @staticmethod
+    def afterFork():
+        """
+        Called in the child process after `os.fork()`: the lock of a target may be held by a thread that only exists in the parent
+        """
+        for target in list(Target.__instances.values()):
+            target.__lock = threading.Lock()
+        
 
 class LoggerConfig:
     def __init__(self, sensitiveDatas : list[str] = [], targets : list[Target] = []):
+        self.__redactor = Redactor()
+        self.__version = 0 # bumped on each change of the sensitive datas
+        self.__redactorVersion = -1
         self.sensitiveDatas = sensitiveDatas
         self.targets = targets
         self.showThreadsName = False
         self.showProcessName = False
+        self.showThreadId = False
+        self.showProcessId = False
+        self.timePrecision = 0
+        
+    @property
+    def sensitiveDatas(self) -> tuple[str, ...]:
+        """
+        The sensitive datas, as a tuple: use `addSensitiveData` and `removeSensitiveData` (or set a new list) to change them
+        """
+        return self.__sensitiveDatas
+    
+    @sensitiveDatas.setter
+    def sensitiveDatas(self, value : list[str]|tuple[str, ...]):
+        self.__sensitiveDatas = tuple(value)
+        self.__version += 1
         
+    def addSensitiveData(self, data : str):
+        self.__sensitiveDatas += (data,)
+        self.__version += 1
+        
+    def removeSensitiveData(self, data : str):
+        if data not in self.__sensitiveDatas:
+            raise ValueError(f"Sensitive data {data!r} not found")
+        index = self.__sensitiveDatas.index(data)
+        self.__sensitiveDatas = self.__sensitiveDatas[:index] + self.__sensitiveDatas[index + 1:]
+        self.__version += 1
+        
+    def redact(self, message : str) -> str:
+        """
+        Hide the sensitive datas in the message; the redactor is compiled again only when the sensitive datas changed
+        """
+        if self.__redactorVersion != self.__version:
+            self.__redactor.update(self.__sensitiveDatas)
+            self.__redactorVersion = self.__version
+        return self.__redactor(message)
         
     def clear(self):
         self.sensitiveDatas = []
         self.targets = []
         self.showThreadsName = False
         self.showProcessName = False
+        self.showThreadId = False
+        self.showProcessId = False
+        self.timePrecision = 0
         
     @staticmethod
     def fromJson(fpathOrData : str|dict, filePath : str|None = None) -> 'LoggerConfig':
@@ -503,7 +815,8 @@ class LoggerConfig:
                     "name": "stdout",
                     "terminal": "stdout"
                 }
-            ]
+            ],
+            "timePrecision": 3  // optional: 0 (seconds), 3 (milliseconds) or 6 (microseconds)
         }
         """
         if isinstance(fpathOrData, str):
@@ -524,7 +837,10 @@ class LoggerConfig:
         if 'targets' in data:
             targets = [Target.fromJson(target) for target in data['targets']]
 
-        return LoggerConfig(sensitiveDatas, targets)
+        config = LoggerConfig(sensitiveDatas, targets)
+        if 'timePrecision' in data:
+            config.timePrecision = int(data['timePrecision'])
+        return config
     
     @staticmethod
     def fromXml(data : str|ElementTree.Element, filePath : str|None = None) -> 'LoggerConfig':
@@ -540,6 +856,7 @@ class LoggerConfig:
                 <target file='log.txt' level='info' sensitiveMode='hide'/>
                 <target terminal='stdout' name='stdout'/>
             </targets>
+            <timePrecision>3</timePrecision>
         </config>
         """
         if isinstance(data, str):
@@ -559,7 +876,10 @@ class LoggerConfig:
         if data.find('targets') is not None:
             targets = [Target.fromXml(target) for target in data.find('targets')] #type: ignore
         
-        return LoggerConfig(sensitiveDatas, targets)
+        config = LoggerConfig(sensitiveDatas, targets)
+        if data.find('timePrecision') is not None:
+            config.timePrecision = int(data.find('timePrecision').text) #type: ignore
+        return config
     
     @staticmethod
     def fromConfigFile(filePath : str) -> 'LoggerConfig':
@@ -594,7 +914,8 @@ class LoggerConfig:
         masterGroup.add_argument('--config', '-c', type=str, help='The path to the logger configuration file (json or xml)')
         
         masterGroup.add_argument('--sensitiveDatas', '-d', nargs='+', help='The list of sensitive datas to hide in the logs, separated by spaces')
-        masterGroup.add_argument('--addTarget', '-t', action="append", nargs='+', help='Add a target to the logger, the arguments are the target configuration (in order: target (stdout, stderr or filename), level (deep-debug, debug, info, warning, error, critical), sensitiveMode (hide, show), sensitiveDatas (list of sensitive datas to hide), name) All arguments are optional except the target')
+        masterGroup.add_argument('--addTarget', '-t', action="append", nargs='+', help='Add a target to the logger, the arguments are the target configuration (in order: target (stdout, stderr or filename), level (deep-debug, debug, info, warning, error, critical), sensitiveMode (hide, show), sensitiveDatas (list of sensitive datas to hide), name) All arguments are optional except the target. Targets also accept key=value options: format (text, jsonl or binary), template (layout of the lines, like "{time} [{level}] {message}"), rateLimit, burst, sampling, summaryInterval, dedup, dedupTimeout, and for files rotate, maxBytes, keep, compression, bufferSize, flushInterval, segmentSize')
+        masterGroup.add_argument('--timePrecision', type=int, choices=[0, 3, 6], help='The number of digits of the fraction of second in the time of the logs (0, 3 for milliseconds or 6 for microseconds)')
                 
         return masterGroup
     
@@ -603,26 +924,34 @@ class LoggerConfig:
             newConfig = LoggerConfig.fromConfigFile(args.config)
             self.sensitiveDatas = newConfig.sensitiveDatas
             self.targets = newConfig.targets
-            self.moduleMap = newConfig.moduleMap
+            self.timePrecision = newConfig.timePrecision
             
         if args.sensitiveDatas is not None:
             self.sensitiveDatas = args.sensitiveDatas
             
+        if args.timePrecision is not None:
+            self.timePrecision = args.timePrecision
+            
         if args.addTarget is not None:
             defaultParams = [None, 'info', 'hide', [], None]
             for targetArgs in args.addTarget:
+                options = dict(arg.split('=', 1) for arg in targetArgs[1:] if '=' in arg) # key=value options
+                targetArgs = [targetArgs[0]] + [arg for arg in targetArgs[1:] if '=' not in arg]
                 params = defaultParams.copy()
                 params[:len(targetArgs)] = targetArgs #merge the two lists
                 target = None
                 if params[0] in ('stdout', 'stderr'):
                     target = Target(TERMINAL_TARGETS.from_string(params[0]), params[4])
                 else:
-                    target = Target.fromFile(params[0])
+                    target = Target.fromFileOptions(params[0], options)
                     if params[4] is not None:
                         target.name = params[4]
                 target["level"] = LEVELS.from_string(params[1])
                 target["sensitiveMode"] = SENSITIVE_LEVELS.from_string(params[2])
                 target["sensitiveDatas"] = params[3]
+                target["format"] = target.checkFormat(FORMATS.from_string(options.get('format', 'text')))
+                target["template"] = LineTemplate(options['template']) if options.get('template') else None
+                target.filter = TargetFilter.fromOptions(options)
             
                 if target.name in [t.name for t in self.targets]:
                     self.targets[[t.name for t in self.targets].index(target.name)] = target
@@ -639,6 +968,12 @@ class LoggerConfig:
                 return self.showThreadsName
             case 'showProcessName':
                 return self.showProcessName
+            case 'showThreadId':
+                return self.showThreadId
+            case 'showProcessId':
+                return self.showProcessId
+            case 'timePrecision':
+                return self.timePrecision
             case _:
                 raise KeyError(f"Parameter {key} not found")
             
@@ -652,13 +987,19 @@ class LoggerConfig:
                 self.showThreadsName = value
             case 'showProcessName':
                 self.showProcessName = value
+            case 'showThreadId':
+                self.showThreadId = value
+            case 'showProcessId':
+                self.showProcessId = value
+            case 'timePrecision':
+                self.timePrecision = value
             case _:
                 raise KeyError(f"Parameter {key} not found")
             
     def __str__(self):
-        return f"LoggerConfig(sensitiveDatas={self.sensitiveDatas}, targets={list(map(str, self.targets))}, showThreadsName={self.showThreadsName}, showProcessName={self.showProcessName})"
-            
-            
+        return f"LoggerConfig(sensitiveDatas={self.sensitiveDatas}, targets={list(map(str, self.targets))}, showThreadsName={self.showThreadsName}, showProcessName={self.showProcessName}, showThreadId={self.showThreadId}, showProcessId={self.showProcessId}, timePrecision={self.timePrecision})"
+
+
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Logger configuration')
     LoggerConfig.configArgParse(parser)
@@ -0,0 +1,203 @@
+from time import monotonic
+from typing import Any, Callable, Hashable
+from random import random
+import threading
+import traceback
+import weakref
+
+
+class TargetFilter:
+    """
+    Decide which records a target writes, to survive message storms:
+    - rate limit: a token bucket per call site (file, function and level) lets `burst` lines through at once, then `rateLimit` lines per second
+    - sampling: only a fraction `sampling` of the DEBUG and INFO records is kept, picked at random
+    - deduplication: a record identical to the previous one is held back, the repeats are counted\n
+    A background thread hands the lines dropped by the rate limit (every `summaryInterval` seconds) and the repeats held back
+    for `dedupTimeout` seconds to the reporter (see `setReporter`), that writes a line summarizing them instead
+    """
+    __instances = weakref.WeakSet() #type: weakref.WeakSet[TargetFilter]
+    __reporter = None #type: threading.Thread|None
+    __reporterCallback = None #type: Callable[[TargetFilter, list[tuple[Any, str]]], None]|None
+    __reporterLock = threading.Lock()
+    __reporterWakeUp = threading.Event()
+
+    def __init__(self, rateLimit : float = 0, burst : int|None = None, sampling : float = 1.0, summaryInterval : float = 10.0, dedup : bool = False, dedupTimeout : float = 5.0):
+        self.sampled = 0 # number of records dropped by the sampling
+        self.__buckets = {} #type: dict[Hashable, list[float]] # key -> [tokens, last update]
+        self.__suppressed = {} #type: dict[Hashable, int]
+        self.__lastKey = None #type: Hashable|None
+        self.__lastSite = None #type: Hashable|None
+        self.__repeats = 0
+        self.__firstRepeat = 0.0
+        self.__lock = threading.Lock()
+        self.configure(rateLimit, burst, sampling, summaryInterval, dedup, dedupTimeout)
+        TargetFilter.__instances.add(self)
+
+    def configure(self, rateLimit : float = 0, burst : int|None = None, sampling : float = 1.0, summaryInterval : float = 10.0, dedup : bool = False, dedupTimeout : float = 5.0):
+        """
+        Change the settings of the filter (`rateLimit=0` disables the rate limit, `sampling=1` keeps every record)
+        """
+        if rateLimit < 0:
+            raise ValueError("The rate limit must be positive (0 to disable it)")
+        if not 0 <= sampling <= 1:
+            raise ValueError("The sampling rate must be between 0 and 1")
+        if summaryInterval <= 0 or dedupTimeout <= 0:
+            raise ValueError("The summary interval and the deduplication timeout must be greater than 0")
+        self.rateLimit = rateLimit
+        self.burst = burst if burst is not None else max(int(rateLimit), 1)
+        self.sampling = sampling
+        self.summaryInterval = summaryInterval
+        self.dedup = dedup
+        self.dedupTimeout = dedupTimeout
+        if rateLimit > 0 or dedup:
+            TargetFilter.__startReporter()
+
+    def allow(self, key : Hashable, sampled : bool = False) -> bool:
+        """
+        Return True if the record of the call site `key` must be written; `sampled` tells if the sampling applies to its level
+        """
+        if sampled and self.sampling < 1 and random() >= self.sampling:
+            self.sampled += 1
+            return False
+        if self.rateLimit <= 0:
+            return True
+        now = monotonic()
+        with self.__lock:
+            bucket = self.__buckets.get(key)
+            if bucket is None:
+                bucket = self.__buckets[key] = [float(self.burst), now]
+            else:
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rateLimit)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return True
+            self.__suppressed[key] = self.__suppressed.get(key, 0) + 1
+            return False
+
+    def deduplicate(self, key : Hashable, site : Hashable) -> tuple[Hashable, int]|None:
+        """
+        Compare the record identified by `key` with the previous one: return None if it repeats it (it is held back); otherwise return
+        the call site of the previous record and the number of its repeats that were not reported yet, to report before writing this one
+        """
+        with self.__lock:
+            if key == self.__lastKey:
+                if self.__repeats == 0:
+                    self.__firstRepeat = monotonic()
+                self.__repeats += 1
+                return None
+            previous = (self.__lastSite, self.__repeats)
+            self.__lastKey, self.__lastSite, self.__repeats = key, site, 0
+            return previous
+
+    def takeRepeated(self, force : bool = False) -> tuple[Hashable, int]|None:
+        """
+        Return the call site and the number of repeats of the last record held back for at least `dedupTimeout` seconds (or at all
+        with `force`), and reset this number; None if there is nothing to report
+        """
+        with self.__lock:
+            if self.__repeats == 0 or (not force and monotonic() - self.__firstRepeat < self.dedupTimeout):
+                return None
+            repeated = (self.__lastSite, self.__repeats)
+            self.__repeats = 0
+            return repeated
+
+    def takeSuppressed(self) -> dict[Hashable, int]:
+        """
+        Return the number of lines suppressed by call site since the last call, and reset them
+        """
+        with self.__lock:
+            suppressed, self.__suppressed = self.__suppressed, {}
+            return suppressed
+
+    def takeReports(self, force : bool = False) -> list[tuple[Hashable, str]]:
+        """
+        Return the summary lines to write, with their call site: suppressed lines, and repeats (see `takeRepeated`)
+        """
+        reports = [(site, f"{count} similar messages suppressed") for site, count in self.takeSuppressed().items()]
+        repeated = self.takeRepeated(force)
+        if repeated is not None:
+            reports.append((repeated[0], f"last message repeated {repeated[1]} times"))
+        return reports
+
+    @staticmethod
+    def fromOptions(options : dict[str, Any]) -> 'TargetFilter|None':
+        """
+        Create a filter from configuration options (json data, xml attributes or command line `key=value` arguments):
+        `rateLimit`, `burst`, `sampling`, `summaryInterval`, `dedup` and `dedupTimeout`; return None if none of them is enabled
+        """
+        dedup = str(options.get('dedup', False)).lower() == 'true'
+        if 'rateLimit' not in options and 'sampling' not in options and not dedup:
+            return None
+        return TargetFilter(
+            float(options.get('rateLimit', 0)),
+            int(options['burst']) if 'burst' in options else None,
+            float(options.get('sampling', 1.0)),
+            float(options.get('summaryInterval', 10.0)),
+            dedup,
+            float(options.get('dedupTimeout', 5.0))
+        )
+
+    def options(self) -> tuple[float, int, float, float, bool, float]:
+        """
+        The arguments to create the same filter
+        """
+        return self.rateLimit, self.burst, self.sampling, self.summaryInterval, self.dedup, self.dedupTimeout
+
+    @staticmethod
+    def setReporter(callback : Callable[['TargetFilter', list[tuple[Any, str]]], None]|None):
+        """
+        Set the function called with a filter and its summary lines (see `takeReports`), when there are some
+        """
+        TargetFilter.__reporterCallback = callback
+
+    @staticmethod
+    def reportAll(force : bool = False):
+        """
+        Hand the summary lines of every filter to the reporter now; with `force`, the repeats held back are reported even
+        if their timeout is not over
+        """
+        callback = TargetFilter.__reporterCallback
+        for instance in list(TargetFilter.__instances):
+            reports = instance.takeReports(force)
+            if reports and callback is not None:
+                try:
+                    callback(instance, reports)
+                except Exception:
+                    traceback.print_exc()
+
+    @staticmethod
+    def __startReporter():
+        with TargetFilter.__reporterLock:
+            if TargetFilter.__reporter is not None and TargetFilter.__reporter.is_alive():
+                TargetFilter.__reporterWakeUp.set() # take the interval of the new filter into account
+                return
+            TargetFilter.__reporter = threading.Thread(target=TargetFilter.__report, name="gamuLogger-filter", daemon=True)
+            TargetFilter.__reporter.start()
+
+    @staticmethod
+    def __report():
+        while True:
+            intervals = [instance.summaryInterval for instance in list(TargetFilter.__instances) if instance.rateLimit > 0]
+            intervals += [instance.dedupTimeout / 2 for instance in list(TargetFilter.__instances) if instance.dedup] # reported within 1.5 timeout
+            interval = min(intervals, default=10.0)
+            if TargetFilter.__reporterWakeUp.wait(interval):
+                TargetFilter.__reporterWakeUp.clear()
+                continue
+            TargetFilter.reportAll()
+
+    @staticmethod
+    def afterFork():
+        """
+        Called in the child process after `os.fork()`: the locks may be held by a thread that only exists in the parent,
+        and the suppressed counts are reported by the parent
+        """
+        TargetFilter.__reporterLock = threading.Lock()
+        TargetFilter.__reporterWakeUp = threading.Event()
+        TargetFilter.__reporter = None
+        for instance in list(TargetFilter.__instances):
+            instance.__lock = threading.Lock()
+            instance.__suppressed = {}
+            instance.__repeats = 0
+        if any(instance.rateLimit > 0 or instance.dedup for instance in list(TargetFilter.__instances)):
+            TargetFilter.__startReporter()
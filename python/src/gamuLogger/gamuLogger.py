@@ -1,121 +1,172 @@
-from datetime import datetime
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import timedelta
+from functools import wraps
+from time import perf_counter_ns, time_ns
 from typing import Any, Callable
 import argparse
-from json import dumps
-import threading
+import asyncio
+import atexit
+import os
+import traceback
+import warnings
 
-from .utils import getCallerInfo, getTime, replaceNewLine, centerString, strictTypeCheck, CustomJSONEncoder, splitLongString, colorize, getExecutableFormatted
-from .customTypes import COLORS, LEVELS, SENSITIVE_LEVELS, Target, TERMINAL_TARGETS, LoggerConfig, Module
+from .utils import getCallerInfo, strictTypeCheck, setStrictTypeCheck
+from .customTypes import COLORS, LEVELS, SENSITIVE_LEVELS, FORMATS, Target, TERMINAL_TARGETS, LoggerConfig, Module, OVERFLOW_POLICIES
+from .logRecord import LogRecord, SERIALIZER, isLazy
+from .hub import LogHub, HubClient
+from .chronoStats import ChronoStats
+from .filters import TargetFilter
+from .labels import ProcessLabel
+from .sinks import FileSink, RotatingFileSink, BackgroundWriter
+from .binarySink import BinarySink
+from .lineTemplate import LineTemplate
 
 
 class UnexpectedError(Exception): ...
 
+SAMPLED_LEVELS = (LEVELS.DEEP_DEBUG, LEVELS.DEBUG, LEVELS.INFO) # the levels affected by the sampling of a target
+
+DONE = Future() #type: Future # returned by `Logger.submit` for the records that no target prints
+DONE.set_result(None)
+
+def legacyCallerInfo(message : Any, args : tuple, stacklevel : int = 3) -> tuple[tuple, tuple[str, str]|None]:
+    """
+    Support the former signature `Logger.info(message, callerInfo)` (deprecated): a single argument that is a pair of strings, and
+    that the message does not consume as format argument, is taken as the caller info
+
+    Return the format arguments and the caller info (None if not given)
+    """
+    if len(args) != 1 or type(args[0]) is not tuple or len(args[0]) != 2 or not all(type(item) is str for item in args[0]):
+        return args, None
+    if isLazy(message):
+        return args, None
+    if isinstance(message, str):
+        try:
+            message % args
+            return args, None # a format argument that happens to be a pair of strings
+        except Exception:
+            pass
+    warnings.warn("Passing callerInfo as a positional argument is deprecated, use callerInfo=(file, function)", DeprecationWarning, stacklevel=stacklevel)
+    return (), args[0]
+
 class Logger:
 
     __instance = None # type: Logger|None
+    __hub = None # type: LogHub|None
+    __hubClient = None # type: HubClient|None
+    __minLevel = LEVELS.INFO.value # lowest level enabled in at least one target
+    __executor = None # type: ThreadPoolExecutor|None # writes the records given to `Logger.submit`, in order
     
     def __new__(cls):
         if cls.__instance is None:
-            cls.__instance = super(Logger, cls).__new__(cls) # this will call the __init__ method
+            cls.__instance = super(Logger, cls).__new__(cls)
+            cls.__instance.config = LoggerConfig()
             
             #configuring default target
             if len(cls.__instance.config["targets"]) == 0:
                 cls.__instance.config["targets"] = [Target(TERMINAL_TARGETS.STDOUT)]
                 Target.get("stdout")["level"] = LEVELS.INFO
                 Target.get("stdout")["sensitiveMode"] = SENSITIVE_LEVELS.HIDE
+            cls.__updateMinLevel()
+            TargetFilter.setReporter(cls.__report)
+            Target.setLevelListener(cls.__updateMinLevel) # the levels can also be set directly on the targets
         return cls.__instance
     
-    def __init__(self):
-        self.config = LoggerConfig()
-    
 #---------------------------------------- Internal methods ----------------------------------------
     
+    @staticmethod
+    def __updateMinLevel():
+        """
+        Recompute the lowest level enabled across all targets; must be called every time the targets or their levels change
+        """
+        levels = [target["level"].value for target in Logger().config['targets'] if "level" in target]
+        Logger.__minLevel = min(levels) if levels else LEVELS.CRITICAL.value + 1
+    
     @strictTypeCheck
-    def __print(self, level : LEVELS, message : Any, callerInfo : tuple[str, str]):
+    def __print(self, level : LEVELS, message : Any, callerInfo : tuple[str, str], args : tuple = ()):
+        record = LogRecord(level, message, callerInfo, self.config['showProcessName'], self.config['showThreadsName'], self.config['timePrecision'], args, self.config['showProcessId'], self.config['showThreadId'])
         for target in self.config['targets']:
-            self.__printInTarget(level, message, callerInfo, target)
+            self.__printInTarget(record, target)
+            
+    def __printRecord(self, record : LogRecord):
+        """
+        Write a record created by `Logger.submit`, in the writer thread
+        """
+        try:
+            for target in self.config['targets']:
+                self.__printInTarget(record, target)
+        except Exception:
+            traceback.print_exc() # the caller may not wait for the future
+            raise
+            
+    @staticmethod
+    def __writer() -> ThreadPoolExecutor:
+        executor = Logger.__executor
+        if executor is None:
+            executor = Logger.__executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gamuLogger-writer")
+        return executor
         
     @strictTypeCheck
-    def __printInTarget(self, level : LEVELS, message : Any, callerInfo : tuple[str, str], target : Target):
-        if not target["level"] <= level:
+    def __printInTarget(self, record : LogRecord, target : Target):
+        if not target["level"] <= record.level:
             return
-        result = ""
-        
-        # add the current time
-        result += self.__LogElementTime(target)
-        
-        # add the process name if needed
-        result += self.__LogElementProcessName(target)
-    
-        # add the thread name if needed
-        result += self.__LogElementThreadName(target)
-        
-        # add the level of the message
-        result += self.__LogElementLevel(level, target)
-        
-        # add the module name if needed
-        result += self.__LogElementModule(callerInfo, target)
-        
-        # add the message
-        result += self.__LogElementMessage(message, callerInfo)
-        
-        result = self.__parseSensitive(result, target)
-        target(result+"\n")
-    
-    def __LogElementTime(self, target):
-        if target.type == Target.Type.TERMINAL:
-            return f"[{COLORS.BLUE}{getTime()}{COLORS.RESET}]"
-        else:
-            # if the target is a file, we don't need to color the output
-            return f"[{getTime()}]"
+        targetFilter = target.filter
+        if targetFilter is not None:
+            site = (*record.callerInfo, record.level)
+            if not targetFilter.allow(site, record.level in SAMPLED_LEVELS):
+                return
+            if targetFilter.dedup:
+                previous = targetFilter.deduplicate((record.level, record.module, record.formattedMessage), site)
+                if previous is None:
+                    return # a repeat of the previous record
+                if previous[1] > 0:
+                    self.__writeReport(target, previous[0], f"last message repeated {previous[1]} times")
+        self.__writeInTarget(record, target)
         
-    def __LogElementProcessName(self, target):
-        if self.config['showProcessName']:
-            if target.type == Target.Type.TERMINAL:
-                return f" [{COLORS.CYAN}{centerString(getExecutableFormatted(), 20)}{COLORS.RESET}]"
-            else:
-                return f" [{centerString(getExecutableFormatted(), 20)}]" 
-        return ""
-    
-    def __LogElementThreadName(self, target):
-        if self.config['showThreadsName']:
-            name = centerString(threading.current_thread().name, 30)
-            if target.type == Target.Type.TERMINAL:
-                return f" [ {COLORS.CYAN}{name}{COLORS.RESET} ]"
+    @strictTypeCheck
+    def __writeInTarget(self, record : LogRecord, target : Target):
+        key = (target.type, target["format"], target["sensitiveMode"], target["template"]) # targets with the same type, format, sensitive mode and template share the same line
+        line = record.lines.get(key)
+        if line is None:
+            if target["format"] == FORMATS.BINARY:
+                timestamp, level, module, file, function, message = record.entry()
+                line = (timestamp, level, module, file, function, self.__parseSensitive(message, target))
+            elif target["format"] == FORMATS.JSONL:
+                line = record.renderJson(lambda value: self.__parseSensitive(value, target)) # before encoding, escaping would hide the sensitive datas from the redactor
             else:
-                return f" [ {name} ]"
-        return ""
-    
-    def __LogElementLevel(self, level, target):
-        if target.type == Target.Type.TERMINAL:
-            return f" [{level.color()}{level}{COLORS.RESET}]"
-        else:
-            return f" [{level}]"
-        
-    def __LogElementModule(self, callerInfo, target):
-        result = ""
-        if Module.exist(*callerInfo):
-            for module in Module.get(*callerInfo).getCompletePath():
-                if target.type == Target.Type.TERMINAL:
-                    result += f" [ {colorize(COLORS.BLUE, centerString(module, 15))} ]"
-                else:
-                    result += f" [ {centerString(module, 15)} ]"
-        return result
-    
-    def __LogElementMessage(self, message, callerInfo):
-        if type(message) in [int, float, bool]:
-            message = str(message)
-        elif type(message) == str:
-            message = splitLongString(message, 150)
-        else:
-            message = dumps(message, indent=4, cls=CustomJSONEncoder)
-
-        return f" {replaceNewLine(message, 33 + (20 if Module.exist(*callerInfo) else 0))}"
+                line = self.__parseSensitive(record.render(target.type, target["format"], target["template"]), target)
+            record.lines[key] = line
+        target(line)
+        if record.level.value >= LEVELS.ERROR.value and target["format"] != FORMATS.BINARY: # the records of a `BinarySink` are visible to the readers once written, its flush is a synchronous msync
+            target.flush(wait=False)
+            
+    def __writeReport(self, target : Target, site : tuple[str, str, LEVELS], message : str):
+        """
+        Write a summary line of a target filter, as if it was logged at the call site `site` (file, function and level)
+        """
+        file, function, level = site
+        record = LogRecord(level, message, (file, function), self.config['showProcessName'], self.config['showThreadsName'], self.config['timePrecision'], (), self.config['showProcessId'], self.config['showThreadId'])
+        self.__writeInTarget(record, target)
+            
+    @staticmethod
+    def __report(targetFilter : TargetFilter, reports : list[tuple[tuple[str, str, LEVELS], str]]):
+        """
+        Write the summary lines of a target filter (suppressed lines, repeats) in its target
+        """
+        logger = Logger()
+        for target in logger.config['targets']:
+            if target.filter is targetFilter:
+                for site, message in reports:
+                    logger.__writeReport(target, site, message)
             
     @strictTypeCheck
     def __printMessageInTarget(self, message : str, color : COLORS, target : Target):
         message = self.__parseSensitive(message, target)
-        if target.type == Target.Type.TERMINAL:
+        if target["format"] == FORMATS.JSONL:
+            target(SERIALIZER.compact({"message": message}, normalized=True) + "\n")
+        elif target["format"] == FORMATS.BINARY:
+            target((time_ns(), None, None, None, None, message))
+        elif target.type == Target.Type.TERMINAL:
             target(f"{color}{message}{COLORS.RESET}")
         else:
             target(message+"\n")
@@ -129,9 +180,7 @@ class Logger:
     def __parseSensitive(self, message : str, target : Target) -> str:
         match target["sensitiveMode"]:
             case SENSITIVE_LEVELS.HIDE:
-                for sensitive in self.config['sensitiveDatas']:
-                    message = message.replace(sensitive, "*" * len(sensitive)) 
-                return message          
+                return self.config.redact(message)
             case SENSITIVE_LEVELS.SHOW:
                 return message
             case _:
@@ -140,46 +189,105 @@ class Logger:
 #---------------------------------------- Logging methods -----------------------------------------
             
     @staticmethod
-    def deepDebug(message : Any, callerInfo = None):
+    def deepDebug(message : Any, *args : Any, callerInfo : tuple[str, str]|None = None):
+        if LEVELS.DEEP_DEBUG._value_ < Logger.__minLevel:
+            return
+        if args and callerInfo is None:
+            args, callerInfo = legacyCallerInfo(message, args)
         if callerInfo is None:
             callerInfo = getCallerInfo()
-        Logger().__print(LEVELS.DEEP_DEBUG, message, callerInfo)
+        Logger().__print(LEVELS.DEEP_DEBUG, message, callerInfo, args)
 
     @staticmethod
-    def debug(message : Any, callerInfo = None):
+    def debug(message : Any, *args : Any, callerInfo : tuple[str, str]|None = None):
+        if LEVELS.DEBUG._value_ < Logger.__minLevel:
+            return
+        if args and callerInfo is None:
+            args, callerInfo = legacyCallerInfo(message, args)
         if callerInfo is None:
             callerInfo = getCallerInfo()
-        Logger().__print(LEVELS.DEBUG, message, callerInfo)
+        Logger().__print(LEVELS.DEBUG, message, callerInfo, args)
     
     @staticmethod
-    def info(message : Any, callerInfo = None):
+    def info(message : Any, *args : Any, callerInfo : tuple[str, str]|None = None):
+        if LEVELS.INFO._value_ < Logger.__minLevel:
+            return
+        if args and callerInfo is None:
+            args, callerInfo = legacyCallerInfo(message, args)
         if callerInfo is None:
             callerInfo = getCallerInfo()
-        Logger().__print(LEVELS.INFO, message, callerInfo)
+        Logger().__print(LEVELS.INFO, message, callerInfo, args)
     
     @staticmethod
-    def warning(message : Any, callerInfo = None):
+    def warning(message : Any, *args : Any, callerInfo : tuple[str, str]|None = None):
+        if LEVELS.WARNING._value_ < Logger.__minLevel:
+            return
+        if args and callerInfo is None:
+            args, callerInfo = legacyCallerInfo(message, args)
         if callerInfo is None:
             callerInfo = getCallerInfo()
-        Logger().__print(LEVELS.WARNING, message, callerInfo)
+        Logger().__print(LEVELS.WARNING, message, callerInfo, args)
         
     @staticmethod
-    def error(message : Any, callerInfo = None):
+    def error(message : Any, *args : Any, callerInfo : tuple[str, str]|None = None):
+        if LEVELS.ERROR._value_ < Logger.__minLevel:
+            return
+        if args and callerInfo is None:
+            args, callerInfo = legacyCallerInfo(message, args)
         if callerInfo is None:
             callerInfo = getCallerInfo()
-        Logger().__print(LEVELS.ERROR, message, callerInfo)
+        Logger().__print(LEVELS.ERROR, message, callerInfo, args)
         
     @staticmethod
-    def critical(message : Any, callerInfo = None):
+    def critical(message : Any, *args : Any, callerInfo : tuple[str, str]|None = None):
+        if LEVELS.CRITICAL._value_ < Logger.__minLevel:
+            return
+        if args and callerInfo is None:
+            args, callerInfo = legacyCallerInfo(message, args)
         if callerInfo is None:
             callerInfo = getCallerInfo()
-        Logger().__print(LEVELS.CRITICAL, message, callerInfo)
+        Logger().__print(LEVELS.CRITICAL, message, callerInfo, args)
         
     @staticmethod
     @strictTypeCheck
     def message(message : Any, color : COLORS = COLORS.NONE):
         Logger().__printMessage(message, color)
         
+    @staticmethod
+    def submit(level : LEVELS, message : Any, *args : Any, callerInfo : tuple[str, str]|None = None) -> Future:
+        """
+        Log a record without waiting for the targets, for event loops: the record (time, caller, module, thread) is created here,
+        then formatted, filtered, rendered and written by a single writer thread, in order. The returned future is done once the line
+        is written; `await Logger.aflush()` waits for all of them, see `AsyncLogger` for the awaitable front end
+
+        Like lazy messages, objects are formatted later: do not modify them after the call
+        """
+        if level._value_ < Logger.__minLevel:
+            return DONE
+        if callerInfo is None:
+            callerInfo = getCallerInfo()
+        logger = Logger()
+        config = logger.config
+        record = LogRecord(level, message, callerInfo, config['showProcessName'], config['showThreadsName'], config['timePrecision'], args, config['showProcessId'], config['showThreadId'])
+        return Logger.__writer().submit(logger.__printRecord, record)
+        
+    @staticmethod
+    def isEnabledFor(level : LEVELS) -> bool:
+        """
+        Return True if a message of this level would be printed in at least one target\n
+        Use it to avoid building expensive messages that would be discarded:
+        ```python
+        if Logger.isEnabledFor(LEVELS.DEBUG):
+            debug(computeExpensiveState())
+        ```
+        The logging methods also defer the work themselves when given a function or a format and its arguments:
+        ```python
+        debug(computeExpensiveState)            # called only if a target prints DEBUG messages, at most once
+        debug("state: %s", bigObject)           # formatted only if a target prints DEBUG messages, at most once
+        ```
+        """
+        return level._value_ >= Logger.__minLevel # _value_ is a plain attribute, much cheaper than the value property
+        
 #---------------------------------------- Configuration methods -----------------------------------
         
     @staticmethod
@@ -188,6 +296,7 @@ class Logger:
         target = Target.get(targetName)
         if target in Logger().config['targets']:
             target["level"] = level
+            Logger.__updateMinLevel()
         else:
             raise ValueError("Target not found")
         
@@ -203,6 +312,83 @@ class Logger:
         if mode == SENSITIVE_LEVELS.SHOW:
             Logger().__printMessageInTarget("Sensitive mode was disable, this file may contain sensitive information, please do not share it with anyone", COLORS.YELLOW, target)
         
+    @staticmethod
+    @strictTypeCheck
+    def setFormat(targetName: str, format : FORMATS):
+        """
+        Choose how the records are written in this target: `FORMATS.TEXT` (aligned columns) or `FORMATS.JSONL` (one compact json object per line);
+        `FORMATS.BINARY` is reserved to the targets writing in a `BinarySink` (see `Target.fromBinaryFile`)
+        """
+        target = Target.get(targetName)
+        if target in Logger().config['targets']:
+            target["format"] = target.checkFormat(format)
+        else:
+            raise ValueError("Target not found")
+        
+    @staticmethod
+    @strictTypeCheck
+    def setTemplate(targetName : str, template : str|None):
+        """
+        Lay out the text lines of this target with a template, like `"{time} [{level}] {module} {message}"` (see `LineTemplate` for
+        the fields); `None` restores the default layout
+        """
+        target = Target.get(targetName)
+        if target in Logger().config['targets']:
+            target["template"] = LineTemplate(template) if template is not None else None
+        else:
+            raise ValueError("Target not found")
+        
+    @staticmethod
+    @strictTypeCheck
+    def setSerializer(maxDepth : int = 16, maxItems : int = 1000, maxLength : int = 10000, maxSize : int = 10000, backend : str = 'auto'):
+        """
+        Set the limits applied to the messages that are not strings (dicts, lists, objects...): nesting depth, items per container,
+        characters per string and values in total, beyond which they are truncated with a marker; and the json backend
+        (`auto` uses `orjson` if it is installed, else `json`)
+        """
+        SERIALIZER.configure(maxDepth, maxItems, maxLength, maxSize, backend)
+        
+    @staticmethod
+    @strictTypeCheck
+    def setRateLimit(targetName : str, rate : int|float, burst : int|None = None, summaryInterval : int|float = 10.0):
+        """
+        Let each call site (file, function and level) write at most `rate` lines per second in this target, after a burst of `burst` lines;
+        the dropped lines are replaced by a "N similar messages suppressed" line every `summaryInterval` seconds (`rate=0` disables the limit)
+        """
+        targetFilter = Logger.__getFilter(targetName)
+        _, _, sampling, _, dedup, dedupTimeout = targetFilter.options()
+        targetFilter.configure(rate, burst, sampling, summaryInterval, dedup, dedupTimeout)
+        
+    @staticmethod
+    @strictTypeCheck
+    def setSampling(targetName : str, rate : int|float):
+        """
+        Keep only a fraction `rate` (between 0 and 1) of the DEEP-DEBUG, DEBUG and INFO lines of this target, picked at random
+        """
+        targetFilter = Logger.__getFilter(targetName)
+        rateLimit, burst, _, summaryInterval, dedup, dedupTimeout = targetFilter.options()
+        targetFilter.configure(rateLimit, burst, rate, summaryInterval, dedup, dedupTimeout)
+        
+    @staticmethod
+    @strictTypeCheck
+    def setDedup(targetName : str, value : bool = True, timeout : int|float = 5.0):
+        """
+        Hold back the records identical to the previous one (same level, module and message) in this target; they are replaced by a
+        "last message repeated N times" line, written before the next different record or after `timeout` seconds
+        """
+        targetFilter = Logger.__getFilter(targetName)
+        rateLimit, burst, sampling, summaryInterval, _, _ = targetFilter.options()
+        targetFilter.configure(rateLimit, burst, sampling, summaryInterval, value, timeout)
+        
+    @staticmethod
+    def __getFilter(targetName : str) -> TargetFilter:
+        target = Target.get(targetName)
+        if target not in Logger().config['targets']:
+            raise ValueError("Target not found")
+        if target.filter is None:
+            target.filter = TargetFilter()
+        return target.filter
+        
     @staticmethod
     def setModule(name : str):
         callerInfo = getCallerInfo()
@@ -214,6 +400,195 @@ class Logger:
             Module.new(name, *callerInfo)
             
         
+    @staticmethod
+    @strictTypeCheck
+    def setNonBlocking(targetName : str, value : bool = True, queueSize : int = 10000, overflowPolicy : OVERFLOW_POLICIES = OVERFLOW_POLICIES.BLOCK):
+        """
+        Write the lines of this target from a dedicated thread, so logging never waits for a slow output\n
+        When the queue of `queueSize` lines is full, `overflowPolicy` decides whether the caller waits or a line is dropped;
+        use `Logger.flush()` to wait for the queued lines to be written
+        """
+        target = Target.get(targetName)
+        if target not in Logger().config['targets']:
+            raise ValueError("Target not found")
+        if value:
+            target.setNonBlocking(queueSize, overflowPolicy)
+        else:
+            target.setBlocking()
+            
+    @staticmethod
+    def flush():
+        """
+        Wait until every target has written and flushed the lines it received (queued, buffered or given to `Logger.submit`)
+        """
+        executor = Logger.__executor
+        if executor is not None:
+            try:
+                future = executor.submit(Logger.__flushTargets) # after the records submitted before
+            except RuntimeError:
+                pass # the interpreter is exiting: the writer has stopped, after writing its records
+            else:
+                return future.result()
+        Logger.__flushTargets()
+            
+    @staticmethod
+    async def aflush():
+        """
+        Like `Logger.flush()`, without blocking the event loop
+        """
+        await asyncio.wrap_future(Logger.__writer().submit(Logger.__flushTargets))
+            
+    @staticmethod
+    def __flushTargets():
+        TargetFilter.reportAll(force=True)
+        for target in Logger().config['targets']:
+            target.flush()
+        if Logger.__hubClient is not None:
+            Logger.__hubClient.flush()
+            
+#---------------------------------------- Timing statistics ---------------------------------------
+
+    @staticmethod
+    def chronoStats(reset : bool = False) -> dict[str, dict[str, Any]]:
+        """
+        Timing statistics of the functions decorated with `@chrono(stats=True)`, by qualified name, durations in seconds:
+        ```python
+        {"module.function": {"count": 3, "total": 0.3, "mean": 0.1, "min": 0.05, "max": 0.2, "p50": 0.05, "p95": 0.2, "p99": 0.2}}
+        ```
+        With `reset`, the statistics start again from zero
+        """
+        return ChronoStats.all(reset)
+    
+    @staticmethod
+    def chronoSummary(level : LEVELS = LEVELS.INFO, reset : bool = False):
+        """
+        Log the timing statistics (see `Logger.chronoStats()`) as one message of the given level
+        """
+        if not Logger.isEnabledFor(level):
+            return
+        stats = ChronoStats.all(reset)
+        if stats:
+            Logger().__print(level, {"chrono": stats}, getCallerInfo())
+    
+    @staticmethod
+    @strictTypeCheck
+    def setChronoSummaryInterval(interval : int|float, level : LEVELS = LEVELS.INFO, reset : bool = True):
+        """
+        Log the timing statistics every `interval` seconds, from a background thread (`0` stops it);
+        with `reset`, each summary only covers the calls since the previous one
+        """
+        ChronoStats.setReporter(interval, lambda: Logger.chronoSummary(level, reset))
+            
+#---------------------------------------- Multiprocessing -----------------------------------------
+
+    @staticmethod
+    def startHub(address : Any = None, authkey : bytes|None = None) -> tuple[Any, bytes]:
+        """
+        Make this process the only writer of the targets, for itself and its worker processes
+
+        Processes forked after this call send their lines to this process automatically; other processes (spawned workers,
+        other programs) call `Logger.connectHub(address, authkey)` with the returned address and authentication key
+        """
+        if Logger.__hub is None:
+            Logger.__hub = LogHub(Logger.__describe, address, authkey)
+        return Logger.__hub.address, Logger.__hub.authkey
+    
+    @staticmethod
+    def stopHub():
+        """
+        Stop accepting lines from the worker processes
+        """
+        if Logger.__hub is not None:
+            Logger.__hub.close()
+            Logger.__hub = None
+    
+    @staticmethod
+    def connectHub(address : Any, authkey : bytes|None = None):
+        """
+        Send the lines of this process to the hub started at `address` by `Logger.startHub()`
+
+        The targets and rendering settings of the hub replace the ones of this process; lines are still rendered here,
+        and sent to the hub by batches
+        """
+        client = HubClient(address, authkey)
+        config = client.config
+        targets = []
+        for description in config['targets']:
+            output = client.output(description['name'])
+            if Target.exist(description['name']):
+                target = Target.get(description['name'])
+                target.close()
+            elif description['type'] == Target.Type.TERMINAL:
+                target = Target(TERMINAL_TARGETS.STDOUT, description['name']) # keeps the colors, the hub chooses the stream
+            else:
+                target = Target(output, description['name'])
+            target.target = output
+            target["level"] = description['level']
+            target["sensitiveMode"] = description['sensitiveMode']
+            target["format"] = description['format']
+            target["template"] = LineTemplate(description['template']) if description['template'] is not None else None
+            target.filter = TargetFilter(*description['filter']) if description['filter'] is not None else None # each worker has its own limits
+            targets.append(target)
+        
+        Logger().config['targets'] = targets
+        Logger().config['sensitiveDatas'] = config['sensitiveDatas']
+        Logger().config['showThreadsName'] = config['showThreadsName']
+        Logger().config['showProcessName'] = config['showProcessName']
+        Logger().config['showThreadId'] = config['showThreadId']
+        Logger().config['showProcessId'] = config['showProcessId']
+        Logger().config['timePrecision'] = config['timePrecision']
+        SERIALIZER.configure(*config['serializer'])
+        Logger.__hubClient = client
+        Logger.__updateMinLevel()
+        
+    @staticmethod
+    def __describe() -> dict[str, Any]:
+        """
+        Configuration sent by the hub to the workers
+        """
+        config = Logger().config
+        return {
+            'targets': [
+                {
+                    'name': target.name,
+                    'type': target.type,
+                    'level': target["level"],
+                    'sensitiveMode': target["sensitiveMode"],
+                    'format': target["format"],
+                    'template': target["template"].source if target["template"] is not None else None,
+                    'filter': target.filter.options() if target.filter is not None else None
+                }
+                for target in config['targets']
+            ],
+            'sensitiveDatas': config['sensitiveDatas'],
+            'showThreadsName': config['showThreadsName'],
+            'showProcessName': config['showProcessName'],
+            'showThreadId': config['showThreadId'],
+            'showProcessId': config['showProcessId'],
+            'timePrecision': config['timePrecision'],
+            'serializer': SERIALIZER.options()
+        }
+        
+    @staticmethod
+    def afterFork():
+        """
+        Called in the child process after `os.fork()`: a worker of a hub (or of a worker) connects to the same hub
+        """
+        Logger.__executor = None # its thread only exists in the parent
+        if Logger.__hub is not None:
+            address, authkey = Logger.__hub.address, Logger.__hub.authkey
+        elif Logger.__hubClient is not None:
+            address, authkey = Logger.__hubClient.address, Logger.__hubClient.authkey
+            Logger.__hubClient.detach()
+        else:
+            return
+        Logger.__hub = None # the hub threads only exist in the parent
+        Logger.__hubClient = None
+        try:
+            Logger.connectHub(address, authkey)
+        except Exception:
+            traceback.print_exc() # keep logging in the targets of the parent
+        
     @staticmethod
     @strictTypeCheck
     def showThreadsName(value : bool = True):
@@ -223,14 +598,48 @@ class Logger:
     @strictTypeCheck
     def showProcessName(value : bool = True):
         Logger().config['showProcessName'] = value
+        
+    @staticmethod
+    @strictTypeCheck
+    def showThreadId(value : bool = True):
+        """
+        Show the native id of the thread (as listed by `top -H` or `perf`) in the lines, after its name if it is shown
+        """
+        Logger().config['showThreadId'] = value
+        
+    @staticmethod
+    @strictTypeCheck
+    def showProcessId(value : bool = True):
+        """
+        Show the id of the process in the lines, after its name if it is shown
+        """
+        Logger().config['showProcessId'] = value
+        
+    @staticmethod
+    @strictTypeCheck
+    def setTimePrecision(precision : int = 3):
+        """
+        Set the number of digits of the fraction of second shown in the time of the logs: 0 (default), 3 (milliseconds) or 6 (microseconds)
+        """
+        if precision not in (0, 3, 6):
+            raise ValueError("The time precision must be 0, 3 or 6")
+        Logger().config['timePrecision'] = precision
             
         
     @staticmethod
     @strictTypeCheck
-    def addTarget(targetFunc : Callable[[str], None] | str | Target | TERMINAL_TARGETS, level : LEVELS = LEVELS.INFO, sensitiveMode : SENSITIVE_LEVELS = SENSITIVE_LEVELS.HIDE) -> str:
+    def addTarget(targetFunc : Callable[[str], None] | str | Target | TERMINAL_TARGETS, level : LEVELS = LEVELS.INFO, sensitiveMode : SENSITIVE_LEVELS = SENSITIVE_LEVELS.HIDE, rotate : int | float | str | None = None, maxBytes : int | str | None = None, keep : int = 5, compression : str = 'gzip') -> str:
+        """
+        Add a target: a file path, a function receiving the lines, a `Target` or a terminal\n
+        For a file path, `rotate` (interval: `"hourly"`, `"daily"`, `"weekly"` or seconds) and/or `maxBytes` (`"10M"` is accepted)
+        make the file rotating, keeping the `keep` last files compressed with `compression` (gzip, zstd or none)
+        """
         target = None #type: Target|None
         if isinstance(targetFunc, str):
-            target = Target.fromFile(targetFunc)
+            if rotate is None and maxBytes is None:
+                target = Target.fromFile(targetFunc)
+            else:
+                target = Target.fromRotatingFile(targetFunc, maxBytes or 0, rotate or 0, keep, compression)
         elif isinstance(targetFunc, Target):
             target = targetFunc
         else:
@@ -243,22 +652,42 @@ class Logger:
     @staticmethod
     @strictTypeCheck
     def removeTarget(targetName : str):
+        Target.get(targetName).close()
         Logger().config.deleteTarget(targetName)
         Target.unregister(targetName)
+        Logger.__updateMinLevel()
     
     @staticmethod
     @strictTypeCheck
     def addSensitiveData(data : Any):
-        Logger().config['sensitiveDatas'].append(data)
+        Logger().config.addSensitiveData(data)
+        
+    @staticmethod
+    @strictTypeCheck
+    def removeSensitiveData(data : Any):
+        Logger().config.removeSensitiveData(data)
         
     @staticmethod
     @strictTypeCheck
     def setConfigFile(configFile : str):
         Logger().config = LoggerConfig.fromConfigFile(configFile)
+        Logger.__updateMinLevel()
         
     @staticmethod
     @strictTypeCheck
     def reset():
+        if Logger.__executor is not None:
+            Logger.__executor.shutdown() # writes the records already submitted
+            Logger.__executor = None
+        Logger.stopHub()
+        ChronoStats.setReporter(0, None)
+        SERIALIZER.configure()
+        if Logger.__hubClient is not None:
+            Logger.__hubClient.close()
+            Logger.__hubClient = None
+        for target in Logger().config['targets']:
+            target.setBlocking()
+            target.flush()
         Target.clear()
         Logger().config.clear()
         
@@ -269,6 +698,15 @@ class Logger:
         Logger.__instance.config["targets"] = [Target(TERMINAL_TARGETS.STDOUT)]
         Target.get("stdout")["level"] = LEVELS.INFO
         Target.get("stdout")["sensitiveMode"] = SENSITIVE_LEVELS.HIDE
+        Logger.__updateMinLevel()
+        
+    @staticmethod
+    def setStrictTypeCheck(value : bool = True):
+        """
+        Enable or disable the type checks of the arguments of the logger methods (enabled by default)\n
+        Disabling them is recommended in production; set `GAMULOGGER_STRICT_TYPECHECK=0` in the environment to remove them entirely
+        """
+        setStrictTypeCheck(value)
         
     @staticmethod
     @strictTypeCheck
@@ -281,25 +719,32 @@ class Logger:
         if not Logger.__instance:
             raise UnexpectedError("Logger instance does not exist")
         Logger.__instance.config.parseArgs(args)
+        Logger.__updateMinLevel()
         
             
-def deepDebug(message : Any):
-    Logger.deepDebug(message, getCallerInfo())
+def deepDebug(message : Any, *args : Any):
+    if Logger.isEnabledFor(LEVELS.DEEP_DEBUG):
+        Logger.deepDebug(message, *args, callerInfo=getCallerInfo())
         
-def debug(message : Any):
-    Logger.debug(message, getCallerInfo())
+def debug(message : Any, *args : Any):
+    if Logger.isEnabledFor(LEVELS.DEBUG):
+        Logger.debug(message, *args, callerInfo=getCallerInfo())
 
-def info(message : Any):
-    Logger.info(message, getCallerInfo())
+def info(message : Any, *args : Any):
+    if Logger.isEnabledFor(LEVELS.INFO):
+        Logger.info(message, *args, callerInfo=getCallerInfo())
 
-def warning(message : Any):
-    Logger.warning(message, getCallerInfo())
+def warning(message : Any, *args : Any):
+    if Logger.isEnabledFor(LEVELS.WARNING):
+        Logger.warning(message, *args, callerInfo=getCallerInfo())
     
-def error(message : Any):
-    Logger.error(message, getCallerInfo())
+def error(message : Any, *args : Any):
+    if Logger.isEnabledFor(LEVELS.ERROR):
+        Logger.error(message, *args, callerInfo=getCallerInfo())
 
-def critical(message : Any):
-    Logger.critical(message, getCallerInfo())
+def critical(message : Any, *args : Any):
+    if Logger.isEnabledFor(LEVELS.CRITICAL):
+        Logger.critical(message, *args, callerInfo=getCallerInfo())
     
 @strictTypeCheck
 def message(message : Any, color : COLORS = COLORS.NONE):
@@ -328,22 +773,25 @@ def deepDebugFunc(chrono : bool = False):
     [datetime] [   DEBUG   ] Function my_function returned "value1value2"
     ```
     
-    note: this decorator does nothing if the Logger level is not set to deep debug
+    note: this decorator does nothing if the Logger level is not set to deep debug: the function is then called directly
     """
-    @strictTypeCheck
     def pre_wrapper(func : Callable):
-        @strictTypeCheck
+        name = func.__name__
+        isEnabledFor, level = Logger.isEnabledFor, LEVELS.DEEP_DEBUG # looked up once, the enabled level is still read at every call
+        
+        @wraps(func)
         def wrapper(*args, **kwargs):
-            deepDebug(f"Calling {func.__name__} with\nargs: {args}\nkwargs: {kwargs}")
+            if not isEnabledFor(level):
+                return func(*args, **kwargs)
+            deepDebug("Calling %s with\nargs: %s\nkwargs: %s", name, args, kwargs)
             if chrono:
-                start = datetime.now()
+                start = perf_counter_ns()
             result = func(*args, **kwargs)
             if chrono:
-                end = datetime.now()
-                tDelta = str(end-start).split(".")[0]
-                deepDebug(f"Function {func.__name__} took {tDelta} to execute and returned \"{result}\"")
+                tDelta = str(timedelta(microseconds=(perf_counter_ns() - start) // 1000)).split(".")[0]
+                deepDebug("Function %s took %s to execute and returned \"%s\"", name, tDelta, result)
             else:
-                deepDebug(f"Function {func.__name__} returned \"{result}\"")
+                deepDebug("Function %s returned \"%s\"", name, result)
             return result
         return wrapper
     return pre_wrapper
@@ -366,31 +814,36 @@ def debugFunc(chrono : bool = False):
     [datetime] [   DEBUG   ] Function my_function returned "value1value2"
     ```
     
-    note: this decorator does nothing if the Logger level is not set to debug or deep debug
+    note: this decorator does nothing if the Logger level is not set to debug or deep debug: the function is then called directly
+    (the exceptions it raises are still logged as errors)
     """
-    @strictTypeCheck
     def pre_wrapper(func : Callable):
-        @strictTypeCheck
+        name = func.__name__
+        isEnabledFor, level = Logger.isEnabledFor, LEVELS.DEBUG # looked up once, the enabled level is still read at every call
+        
+        @wraps(func)
         def wrapper(*args, **kwargs):
-            debug(f"Calling {func.__name__} with\nargs: {args}\nkwargs: {kwargs}")
-            if chrono:
-                start = datetime.now()
+            enabled = isEnabledFor(level)
+            if enabled:
+                debug("Calling %s with\nargs: %s\nkwargs: %s", name, args, kwargs)
+                if chrono:
+                    start = perf_counter_ns()
             try:
                 result = func(*args, **kwargs)
             except Exception as e:
-                error(f"An error occurred in function {func.__name__}: {e.__class__.__name__} - {e}")
+                error("An error occurred in function %s: %s - %s", name, e.__class__.__name__, e)
                 raise e
-            if chrono:
-                end = datetime.now()
-                debug(f"Function {func.__name__} took {end-start} to execute and returned \"{result}\"")
-            else:
-                debug(f"Function {func.__name__} returned \"{result}\"")
+            if enabled:
+                if chrono:
+                    debug("Function %s took %s to execute and returned \"%s\"", name, timedelta(microseconds=(perf_counter_ns() - start) // 1000), result)
+                else:
+                    debug("Function %s returned \"%s\"", name, result)
             return result
         return wrapper
     return pre_wrapper
 
 @strictTypeCheck
-def chrono(func : Callable):
+def chrono(func : Callable|None = None, stats : bool = False):
     """
     Decorator to print the execution time of a function
     usage:
@@ -405,19 +858,67 @@ def chrono(func : Callable):
     ```log
     [datetime] [   DEBUG   ] Function my_function took 0.0001s to execute
     ```
+    
+    note: the function is called directly, without being timed, if the Logger level is not set to debug or deep debug\n
+    With `@chrono(stats=True)`, nothing is printed for each call: every call is timed and aggregated (count, total, min, max, p50, p95, p99),
+    see `Logger.chronoStats()`, `Logger.chronoSummary()` and `Logger.setChronoSummaryInterval()`
     """
-    @strictTypeCheck
+    if func is None:
+        return lambda func: chrono(func, stats)
+    
+    if stats:
+        record = ChronoStats.get(f"{func.__module__}.{func.__qualname__}").add
+        
+        @wraps(func)
+        def statsWrapper(*args, **kwargs):
+            start = perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(perf_counter_ns() - start)
+        return statsWrapper
+    
+    name = func.__name__
+    isEnabledFor, level = Logger.isEnabledFor, LEVELS.DEBUG
+    
+    @wraps(func)
     def wrapper(*args, **kwargs):
-        start = datetime.now()
+        if not isEnabledFor(level):
+            return func(*args, **kwargs)
+        start = perf_counter_ns()
         result = func(*args, **kwargs)
-        end = datetime.now()
-        debug(f"Function {func.__name__} took {end-start} to execute")
+        debug("Function %s took %s to execute", name, timedelta(microseconds=(perf_counter_ns() - start) // 1000))
         return result
     return wrapper
 
 # create the instance of the logger
 Logger()
 
+# the atexit hooks run in reverse order: this one runs before the ones of the sinks, imported above, so the repeats held back and
+# the suppressed lines are reported while the targets can still write them
+atexit.register(Logger.flush)
+
+def afterFork():
+    """
+    Make the package usable in the child process after `os.fork()`; this is its only fork hook, so the pieces are reset in this
+    order whatever the import order: the labels first (the next lines show the child), then the locks and the buffers of the
+    targets and sinks, before the threads are started again (non-blocking writers, filter and statistics reporters), and the
+    connection to the hub, which may already write lines, last
+    """
+    ProcessLabel.afterFork()
+    Target.afterFork()
+    FileSink.afterFork()
+    RotatingFileSink.afterFork()
+    BinarySink.afterFork()
+    BackgroundWriter.afterFork()
+    TargetFilter.afterFork()
+    ChronoStats.afterFork()
+    Logger.afterFork()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=afterFork)
+
+
 if __name__ == '__main__':
     from time import sleep
     
@@ -0,0 +1,221 @@
+from multiprocessing.connection import Listener, Client, Connection
+from typing import Any, Callable
+import os
+import threading
+import traceback
+import atexit
+import multiprocessing.util
+
+from .customTypes import Target
+from .sinks import BackgroundWriter
+
+
+NO_FLUSH = 0
+FLUSH = 1
+FLUSH_AND_WAIT = 2 # the hub answers once the lines are written and flushed
+
+
+class LogHub:
+    """
+    Write in the targets of this process the lines sent by other processes (see `HubClient`), so a single process writes each file\n
+    Every connection is read by its own thread and every message is a batch of complete lines, written in one call per target:
+    the lines of different processes never interleave, and a worker that crashes only loses the lines it had not sent yet\n
+    `describe` returns the configuration sent to the workers when they connect (targets and rendering settings)
+    """
+    def __init__(self, describe : Callable[[], dict[str, Any]], address : Any = None, authkey : bytes|None = None):
+        self.describe = describe
+        self.authkey = authkey if authkey is not None else os.urandom(32)
+        self.__listener = Listener(address, authkey=self.authkey)
+        self.address = self.__listener.address
+        self.__closed = False
+        self.__connections = set() #type: set[Connection]
+        self.__lock = threading.Lock()
+        self.__thread = threading.Thread(target=self.__accept, name="gamuLogger-hub", daemon=True)
+        self.__thread.start()
+
+    def __accept(self):
+        while not self.__closed:
+            try:
+                connection = self.__listener.accept()
+            except (OSError, EOFError, multiprocessing.AuthenticationError):
+                continue # a client that failed to connect
+            if self.__closed:
+                connection.close()
+                return
+            with self.__lock:
+                self.__connections.add(connection)
+            threading.Thread(target=self.__read, args=(connection,), name="gamuLogger-hub-reader", daemon=True).start()
+
+    def __read(self, connection : Connection):
+        try:
+            connection.send(self.describe())
+            while not self.__closed:
+                lines, flush = connection.recv() #type: list[tuple[str, str]], int
+                self.__write(lines, flush)
+                if flush == FLUSH_AND_WAIT:
+                    connection.send(True)
+        except (EOFError, OSError):
+            pass # the worker exited or crashed
+        except Exception:
+            traceback.print_exc()
+        finally:
+            with self.__lock:
+                self.__connections.discard(connection)
+            connection.close()
+
+    def __write(self, lines : list[tuple[str, str]], flush : int):
+        byTarget = {} #type: dict[str, list[str]]
+        for name, line in lines:
+            if name in byTarget:
+                byTarget[name].append(line)
+            else:
+                byTarget[name] = [line]
+        for name, targetLines in byTarget.items():
+            if not Target.exist(name):
+                continue # the target was removed from the hub
+            target = Target.get(name)
+            if isinstance(targetLines[0], str):
+                target(''.join(targetLines))
+            else: # entries of a binary target
+                for entry in targetLines:
+                    target(entry)
+            if flush != NO_FLUSH:
+                target.flush(wait=flush == FLUSH_AND_WAIT)
+
+    @property
+    def connections(self) -> int:
+        """
+        Number of connected workers
+        """
+        with self.__lock:
+            return len(self.__connections)
+
+    def close(self):
+        """
+        Stop accepting workers; the workers already connected are disconnected
+        """
+        if self.__closed:
+            return
+        self.__closed = True
+        try:
+            Client(self.address, authkey=self.authkey).close() # wake up the accepting thread
+        except Exception:
+            pass
+        self.__thread.join(1)
+        self.__listener.close()
+        with self.__lock:
+            for connection in self.__connections:
+                connection.close()
+            self.__connections.clear()
+
+
+class HubClient:
+    """
+    Send the lines of this process to a `LogHub`\n
+    Lines are sent by batches: when `batchSize` lines are waiting, every `flushInterval` seconds, on `flush()` and when the process exits;
+    if the hub is unreachable, the lines are dropped and counted in `dropped`
+    """
+    def __init__(self, address : Any, authkey : bytes|None = None, batchSize : int = 256, flushInterval : float = 0.05):
+        self.address = address
+        self.authkey = authkey
+        self.batchSize = batchSize
+        self.flushInterval = flushInterval
+        self.dropped = 0
+        self.__connection = Client(address, authkey=authkey)
+        self.config = self.__connection.recv() #type: dict[str, Any]
+        self.__batch = [] #type: list[tuple[str, str]]
+        self.__lock = threading.Lock()
+        self.__closed = False
+        self.__wakeUp = threading.Event()
+        self.__thread = threading.Thread(target=self.__flushLoop, name="gamuLogger-hub-client", daemon=True)
+        self.__thread.start()
+
+        # multiprocessing workers exit without running atexit, but run their finalizers; the finalizers registered while forking
+        # are discarded by multiprocessing, so a client created by the fork hook registers it again once the worker started
+        atexit.register(self.close)
+        HubClient.__finalizeAtExit(self)
+        multiprocessing.util.register_after_fork(self, HubClient.__finalizeAtExit)
+
+    @staticmethod
+    def __finalizeAtExit(client : 'HubClient'):
+        multiprocessing.util.Finalize(client, client.close, exitpriority=100)
+
+    def send(self, name : str, line : str):
+        with self.__lock:
+            self.__batch.append((name, line))
+            if len(self.__batch) >= self.batchSize:
+                self.__send(NO_FLUSH)
+
+    def flush(self, wait : bool = True):
+        """
+        Send the waiting lines and ask the hub to flush the targets; with `wait`, return once they are written
+        """
+        with self.__lock:
+            self.__send(FLUSH_AND_WAIT if wait else FLUSH)
+
+    def __send(self, flush : int):
+        if self.__closed or (not self.__batch and flush == NO_FLUSH):
+            return
+        batch, self.__batch = self.__batch, []
+        try:
+            self.__connection.send((batch, flush))
+            if flush == FLUSH_AND_WAIT:
+                self.__connection.recv()
+        except (EOFError, OSError):
+            self.dropped += len(batch)
+
+    def __flushLoop(self):
+        while not self.__closed:
+            self.__wakeUp.wait(self.flushInterval)
+            with self.__lock:
+                self.__send(NO_FLUSH)
+
+    def output(self, name : str) -> 'HubOutput':
+        """
+        The output of a worker target, sending its lines to the hub target named `name`
+        """
+        return HubOutput(self, name)
+
+    def close(self):
+        """
+        Send the remaining lines and disconnect
+        """
+        if self.__closed:
+            return
+        BackgroundWriter.flushAll(1) # non-blocking targets may still hold lines for the hub
+        with self.__lock:
+            self.__send(FLUSH_AND_WAIT)
+            self.__closed = True
+            self.__connection.close()
+        self.__wakeUp.set()
+
+    def detach(self):
+        """
+        Called in the child process after `os.fork()`: the connection belongs to the parent, so the child must never use it
+        """
+        self.__lock = threading.Lock()
+        self.__batch = []
+        self.__closed = True
+
+    @property
+    def closed(self) -> bool:
+        return self.__closed
+
+
+class HubOutput:
+    """
+    Output of a target of a worker process: the lines are written by the hub, in the target with the same name
+    """
+    def __init__(self, client : HubClient, name : str):
+        self.client = client
+        self.name = name
+
+    @property
+    def __name__(self) -> str:
+        return self.name
+
+    def __call__(self, string : str):
+        self.client.send(self.name, string)
+
+    def flush(self):
+        self.client.flush(wait=False)
@@ -0,0 +1,92 @@
+import os
+import threading
+
+from .utils import centerString, getExecutableFormatted
+from .customTypes import COLORS, Target
+
+
+TERMINAL = Target.Type.TERMINAL # looked up once, enum members are slow to reach
+
+
+class ProcessLabel:
+    """
+    The process as it appears in the lines: its name (`python3 main.py`) and/or its id, centered on 20 characters\n
+    Computed once per process, and again in the child after `os.fork()`; the plain and colored renderings are built once
+    """
+    __current = None #type: ProcessLabel|None
+
+    def __init__(self):
+        self.name = getExecutableFormatted()
+        self.pid = os.getpid()
+        self.__plain = [None] * 4 #type: list[str|None] # by showName + 2 * showId
+        self.__colored = [None] * 4 #type: list[str|None]
+
+    def render(self, targetType : Target.Type, showName : bool = True, showId : bool = False) -> str:
+        renderings = self.__colored if targetType is TERMINAL else self.__plain
+        rendering = renderings[showName + 2 * showId]
+        if rendering is None:
+            text = centerString(f"{self.name}:{self.pid}" if showName and showId else self.name if showName else str(self.pid), 20)
+            if targetType is TERMINAL:
+                rendering = f" [{COLORS.CYAN}{text}{COLORS.RESET}]"
+            else:
+                rendering = f" [{text}]"
+            renderings[showName + 2 * showId] = rendering
+        return rendering
+
+    @staticmethod
+    def current() -> 'ProcessLabel':
+        label = ProcessLabel.__current
+        if label is None:
+            label = ProcessLabel.__current = ProcessLabel()
+        return label
+
+    @staticmethod
+    def afterFork():
+        """
+        Called in the child process after `os.fork()`: the child has its own id, and the threads ids change
+        """
+        ProcessLabel.__current = None
+        ThreadLabel.invalidateAll()
+
+
+class ThreadLabel:
+    """
+    The thread as it appears in the lines: its name and/or its native id (as shown by `top -H` or `perf`), centered on 30 characters\n
+    Cached per thread, and computed again when the thread is renamed; the plain and colored renderings are built once
+    """
+    __local = threading.local()
+    __generation = 0 # incremented to invalidate the labels of every thread
+
+    def __init__(self, thread : threading.Thread):
+        self.thread = thread
+        self.name = thread.name
+        self.nativeId = threading.get_native_id()
+        self.generation = ThreadLabel.__generation
+        self.__plain = [None] * 4 #type: list[str|None] # by showName + 2 * showId
+        self.__colored = [None] * 4 #type: list[str|None]
+
+    def render(self, targetType : Target.Type, showName : bool = True, showId : bool = False) -> str:
+        renderings = self.__colored if targetType is TERMINAL else self.__plain
+        rendering = renderings[showName + 2 * showId]
+        if rendering is None:
+            text = centerString(f"{self.name}:{self.nativeId}" if showName and showId else self.name if showName else str(self.nativeId), 30)
+            if targetType is TERMINAL:
+                rendering = f" [ {COLORS.CYAN}{text}{COLORS.RESET} ]"
+            else:
+                rendering = f" [ {text} ]"
+            renderings[showName + 2 * showId] = rendering
+        return rendering
+
+    @staticmethod
+    def current() -> 'ThreadLabel':
+        """
+        The label of the calling thread
+        """
+        label = getattr(ThreadLabel.__local, 'label', None) #type: ThreadLabel|None
+        if label is None or label.generation != ThreadLabel.__generation or label.thread.name != label.name:
+            label = ThreadLabel.__local.label = ThreadLabel(threading.current_thread())
+        return label
+
+    @staticmethod
+    def invalidateAll():
+        ThreadLabel.__generation += 1
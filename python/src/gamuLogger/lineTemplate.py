@@ -0,0 +1,82 @@
+from string import Formatter
+from typing import Any, Callable
+
+
+FIELDS = ('time', 'level', 'levelName', 'module', 'file', 'function', 'process', 'pid', 'thread', 'tid', 'message')
+
+
+class LineTemplate:
+    """
+    The layout of the text lines of a target, like `"{time} [{level}] {module} {message}"`\n
+    Fields: time, level (centered like in the default lines), levelName, module (complete name), file, function, process, pid,
+    thread, tid and message; they accept a format spec (`{module:<20}`), except the message, whose continuation lines line up with
+    its first line. Write `{{` and `}}` for literal braces\n
+    The template is parsed once; its render functions are compiled on first use for plain and colored targets, with the constant
+    parts pre-joined, and only compute the fields the template contains
+    """
+    __slots__ = ('source', 'segments', 'tail', 'fields', '__renderers')
+
+    def __init__(self, source : str):
+        self.source = source
+        self.segments = [] #type: list[tuple[str, str, str]] # constant text before the field, field name and format spec
+        literal = ''
+        try:
+            parsed = list(Formatter().parse(source))
+        except ValueError as e:
+            raise ValueError(f"Invalid template {source!r}: {e}") from None
+        for text, name, spec, conversion in parsed:
+            literal += text
+            if name is None:
+                continue
+            if name not in FIELDS:
+                raise ValueError(f"Invalid template {source!r}: unknown field {{{name}}}, expected one of {', '.join(FIELDS)}")
+            if conversion is not None or (spec and (name == 'message' or '{' in spec)):
+                raise ValueError(f"Invalid template {source!r}: unsupported format of field {{{name}}}")
+            self.segments.append((literal, name, spec or ''))
+            literal = ''
+        self.tail = literal + "\n"
+        self.fields = frozenset(name for _, name, _ in self.segments)
+        self.__renderers = [None, None] #type: list[Callable[[Any], str]|None] # plain, colored
+
+    def __repr__(self) -> str:
+        return f"LineTemplate({self.source!r})"
+
+    def compile(self, fields : dict[str, tuple[Callable, Callable[[Any, str], str]|None]], colored : bool) -> Callable[[Any], str]:
+        """
+        The render function of the template, built once for plain and once for colored targets\n
+        `fields` gives, for each field, the function computing its text from a record (from a record and the width of the line before
+        it for the message), and the one coloring this text (or None)
+        """
+        renderer = self.__renderers[colored]
+        if renderer is None:
+            renderer = self.__renderers[colored] = self.__compile(fields, colored)
+        return renderer
+
+    def __compile(self, fields : dict[str, tuple[Callable, Callable[[Any, str], str]|None]], colored : bool) -> Callable[[Any], str]:
+        steps = [] #type: list[tuple[str, int, Callable, str, Callable|None, bool]]
+        for literal, name, spec in self.segments:
+            getter, color = fields[name]
+            steps.append((literal, len(literal), getter, spec, color if colored else None, name == 'message'))
+        tail = self.tail
+
+        if not steps:
+            return lambda record: tail
+
+        def render(record : Any) -> str:
+            parts = []
+            width = 0 # the message is indented to the visible width of what precedes it
+            for literal, literalWidth, getter, spec, color, isMessage in steps:
+                if literalWidth:
+                    parts.append(literal)
+                    width += literalWidth
+                if isMessage:
+                    parts.append(getter(record, width))
+                    continue
+                text = getter(record)
+                if spec:
+                    text = format(text, spec)
+                width += len(text)
+                parts.append(text if color is None else color(record, text))
+            parts.append(tail)
+            return ''.join(parts)
+        return render
@@ -0,0 +1,276 @@
+from typing import Any, Callable, Mapping
+from types import FunctionType, MethodType, BuiltinFunctionType
+from functools import partial
+from time import time_ns
+import threading
+
+from .utils import getTime, replaceNewLine, splitLongString
+from .customTypes import COLORS, LEVELS, SENSITIVE_LEVELS, FORMATS, Target, Module
+from .serializer import MessageSerializer
+from .labels import ProcessLabel, ThreadLabel
+from .lineTemplate import LineTemplate
+
+
+SERIALIZER = MessageSerializer() # converts the messages that are not strings, see `Logger.setSerializer`
+
+TERMINAL = Target.Type.TERMINAL
+FILE = Target.Type.FILE
+BLUE, CYAN, RESET = str(COLORS.BLUE), str(COLORS.CYAN), str(COLORS.RESET)
+
+
+LAZY_TYPES = (FunctionType, MethodType, BuiltinFunctionType, partial) # other callables (classes, objects with `__call__`...) are logged as they are
+
+
+def isLazy(message : Any) -> bool:
+    """
+    Return True if the message is a function computing the message: a function, a lambda, a method (of a class or of a builtin type) or a `functools.partial`
+    """
+    return isinstance(message, LAZY_TYPES)
+
+def resolveMessage(message : Any, args : tuple) -> Any:
+    """
+    Compute the message of a record:
+    - `message(*args)` if the message is a function
+    - `message % args` if arguments are given (a single mapping is used for `%(name)s` placeholders, like `logging` does); when
+      they do not match the format, a line describing the error, the format and the arguments
+    - the message itself otherwise
+    """
+    if isLazy(message):
+        return message(*args)
+    if args:
+        if len(args) == 1 and isinstance(args[0], Mapping) and args[0]:
+            args = args[0] #type: ignore
+        try:
+            return message % args
+        except Exception as e: # a wrong log statement must not break the program, like with `logging`
+            return f"<format error: {type(e).__name__}: {e}> {message} {args}"
+    return message
+
+
+class LogRecord:
+    """
+    A message to log, with everything that does not depend on the target computed once\n
+    The line is rendered at most once per target type (colored for terminals, plain for files), and then shared by all the targets of this type
+    """
+    def __init__(self, level : LEVELS, message : Any, callerInfo : tuple[str, str], showProcessName : bool = False, showThreadsName : bool = False, timePrecision : int = 0, args : tuple = (), showProcessId : bool = False, showThreadId : bool = False):
+        self.level = level
+        self.__message = message
+        self.__args = args
+        self.__resolved = not args and not isLazy(message)
+        self.callerInfo = callerInfo
+        self.timestamp = time_ns()
+        self.__time = None #type: str|None
+        self.__timePrecision = timePrecision
+        self.processLabel = ProcessLabel.current() if showProcessName or showProcessId else None #type: ProcessLabel|None
+        self.threadLabel = ThreadLabel.current() if showThreadsName or showThreadId else None #type: ThreadLabel|None
+        self.thread = self.threadLabel.name if self.threadLabel is not None else threading.current_thread().name
+        self.threadId = self.threadLabel.nativeId if self.threadLabel is not None else threading.get_native_id() # the record may be rendered by another thread (see `Logger.submit`)
+        self.__labelOptions = (showProcessName, showProcessId, showThreadsName, showThreadId)
+        self.module = Module.find(*callerInfo)
+        self.__modulePath = None #type: list[str]|None # module of a restored record, that may not exist in this process
+
+        self.__formattedMessage = None #type: str|None
+        self.__renderings = {} #type: dict[Target.Type, str]
+        self.__json = None #type: str|None
+        self.lines = {} #type: dict[tuple[Target.Type, FORMATS, SENSITIVE_LEVELS], str|tuple] # lines (entries for binary targets) ready to be written, once the sensitive datas are processed
+
+    @property
+    def time(self) -> str:
+        """
+        The time as it appears in the lines, computed on first access
+        """
+        if self.__time is None:
+            self.__time = getTime(self.timestamp, self.__timePrecision)
+        return self.__time
+
+    @property
+    def moduleName(self) -> str|None:
+        """
+        The complete name of the module of the record (`api.auth`), or None
+        """
+        if self.module is not None:
+            return self.module.getCompleteName()
+        if self.__modulePath is not None:
+            return '.'.join(self.__modulePath)
+        return None
+
+    @property
+    def message(self) -> Any:
+        """
+        The message, computed on first access when it is a function or a format with its arguments (see `resolveMessage`)
+        """
+        if not self.__resolved:
+            self.__message = resolveMessage(self.__message, self.__args)
+            self.__resolved = True
+        return self.__message
+
+    @property
+    def formattedMessage(self) -> str:
+        """
+        The message as it appears in the line (without the continuation indentation), computed on first access
+        """
+        if self.__formattedMessage is None:
+            message = self.message
+            if type(message) in [int, float, bool]:
+                message = str(message)
+            elif type(message) == str:
+                message = splitLongString(message, 150)
+            else:
+                message = SERIALIZER.pretty(message)
+            self.__formattedMessage = message
+        return self.__formattedMessage
+
+    @staticmethod
+    def restore(level : LEVELS, formattedMessage : str, callerInfo : tuple[str, str], timestamp : int, module : str|None, timePrecision : int = 0) -> 'LogRecord':
+        """
+        Rebuild a record read back from a log (see `binaryReader`), with its time, its module (by complete name) and its message as they were written
+        """
+        record = LogRecord(level, formattedMessage, callerInfo, timePrecision=timePrecision)
+        record.timestamp = timestamp
+        record.module = None
+        record.__modulePath = module.split('.') if module else None
+        record.__formattedMessage = formattedMessage
+        return record
+
+    def entry(self) -> tuple[int, int, str|None, str, str, str]:
+        """
+        Return the record as written by a `BinarySink`: timestamp, level value, module, file, function and formatted message
+        """
+        return self.timestamp, self.level.value, self.moduleName, self.callerInfo[0], self.callerInfo[1], self.formattedMessage
+
+    def render(self, targetType : Target.Type, format : FORMATS = FORMATS.TEXT, template : LineTemplate|None = None) -> str:
+        """
+        Return the complete line (ending with a new line) for a target of the given type and format, laid out by `template` if given
+        """
+        if format == FORMATS.JSONL:
+            return self.renderJson()
+        if template is not None:
+            return template.compile(TEMPLATE_FIELDS, targetType is TERMINAL)(self)
+        if targetType not in self.__renderings:
+            prefix = self.__prefix(targetType)
+            self.__renderings[targetType] = prefix + self.__elementMessage(prefix if targetType is not TERMINAL else None) + "\n"
+        return self.__renderings[targetType]
+
+    def __prefix(self, targetType : Target.Type) -> str:
+        """
+        The part of the line before the message: time, process, thread, level and module
+        """
+        return self.__elementTime(targetType) \
+            + self.__elementProcessName(targetType) \
+            + self.__elementThreadName(targetType) \
+            + self.__elementLevel(targetType) \
+            + self.__elementModule(targetType)
+
+    def renderJson(self, redact : Callable[[str], str]|None = None) -> str:
+        """
+        Return the record as one compact json object (ending with a new line), the message being kept as native json;
+        there is no padding nor coloring, so the line is the same for all the targets\n
+        `redact` hides the sensitive datas in the values (and in the keys of the message) before they are encoded
+        """
+        if redact is not None:
+            data = {key: redactJson(value, redact) for key, value in self.__jsonData().items()} # the field names are kept
+            return SERIALIZER.compact(data, normalized=True) + "\n"
+        if self.__json is None:
+            self.__json = SERIALIZER.compact(self.__jsonData(), normalized=True) + "\n"
+        return self.__json
+
+    def __jsonData(self) -> dict[str, Any]:
+        """
+        The fields of the json line, as json values
+        """
+        message = self.message
+        process = ProcessLabel.current()
+        data = {
+            "time": self.time,
+            "level": self.level.name,
+            "module": self.moduleName,
+            "file": self.callerInfo[0],
+            "function": self.callerInfo[1],
+            "thread": self.thread,
+            "process": process.name,
+            "message": message if type(message) is str else SERIALIZER.normalize(message)
+        }
+        if self.__labelOptions[1]:
+            data["pid"] = process.pid
+        if self.__labelOptions[3]:
+            data["tid"] = self.threadId
+        return data
+
+    def __elementTime(self, targetType : Target.Type) -> str:
+        if targetType == Target.Type.TERMINAL:
+            return f"[{COLORS.BLUE}{self.time}{COLORS.RESET}]"
+        else:
+            # if the target is a file, we don't need to color the output
+            return f"[{self.time}]"
+
+    def __elementProcessName(self, targetType : Target.Type) -> str:
+        if self.processLabel is not None:
+            return self.processLabel.render(targetType, self.__labelOptions[0], self.__labelOptions[1])
+        return ""
+
+    def __elementThreadName(self, targetType : Target.Type) -> str:
+        if self.threadLabel is not None:
+            return self.threadLabel.render(targetType, self.__labelOptions[2], self.__labelOptions[3])
+        return ""
+
+    def __elementLevel(self, targetType : Target.Type) -> str:
+        if targetType == Target.Type.TERMINAL:
+            return f" [{self.level.color()}{self.level}{COLORS.RESET}]"
+        else:
+            return f" [{self.level}]"
+
+    def __elementModule(self, targetType : Target.Type) -> str:
+        if self.module is not None:
+            return self.module.render(targetType)
+        if self.__modulePath is not None:
+            return Module.renderPath(self.__modulePath, targetType)
+        return ""
+
+    def __elementMessage(self, prefix : str|None) -> str:
+        """
+        The message, its next lines starting with `| ` under its first character; `prefix` is the plain part of the line before the
+        message (None for colored lines, whose width is the one of the plain line)
+        """
+        message = self.formattedMessage
+        if '\n' in message:
+            if prefix is None:
+                prefix = self.__prefix(FILE)
+            message = replaceNewLine(message, len(prefix) - 1) # the prefix is followed by a space, the `| ` ends under it
+        return f" {message}"
+
+
+def colorBlue(record : LogRecord, text : str) -> str:
+    return BLUE + text + RESET
+
+def colorCyan(record : LogRecord, text : str) -> str:
+    return CYAN + text + RESET
+
+def colorLevel(record : LogRecord, text : str) -> str:
+    return str(record.level.color()) + text + RESET
+
+def redactJson(data : Any, redact : Callable[[str], str]) -> Any:
+    """
+    Hide the sensitive datas in the strings of json values (dicts, lists...), keys included
+    """
+    if type(data) is str:
+        return redact(data)
+    if type(data) is list:
+        return [redactJson(item, redact) for item in data]
+    if type(data) is dict:
+        return {redact(key): redactJson(value, redact) for key, value in data.items()}
+    return data
+
+
+TEMPLATE_FIELDS = {
+    'time': (lambda record: record.time, colorBlue),
+    'level': (lambda record: str(record.level), colorLevel),
+    'levelName': (lambda record: record.level.name, colorLevel),
+    'module': (lambda record: record.moduleName or '', colorBlue),
+    'file': (lambda record: record.callerInfo[0], None),
+    'function': (lambda record: record.callerInfo[1], None),
+    'process': (lambda record: ProcessLabel.current().name, colorCyan),
+    'pid': (lambda record: str(ProcessLabel.current().pid), colorCyan),
+    'thread': (lambda record: record.thread, colorCyan),
+    'tid': (lambda record: str(record.threadId), colorCyan),
+    'message': (lambda record, width: replaceNewLine(record.formattedMessage, max(width - 2, 0)), None) # the text of the continuation lines ("| text") lines up with the first line
+} #type: dict[str, tuple[Callable, Callable[[LogRecord, str], str]|None]] # how the fields of a `LineTemplate` are computed and colored
@@ -0,0 +1,336 @@
+from typing import BinaryIO, Iterator
+import argparse
+import json
+import os
+import re
+import sys
+
+from .customTypes import LEVELS
+
+
+# the line of a record, as rendered by `LogRecord.render` for a file target:
+# [time] [process]? [ thread ]? [level] [ module ]* message
+HEADER = re.compile(
+    rb"\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(?:\.\d+)?)\]"
+    rb"(?: \[[^\]]*\]){0,2}?" # process and thread names
+    rb" \[(  DEBUG   |   INFO   | WARNING  |  ERROR   | CRITICAL )\]"
+    rb"((?: \[ [^\]]*? \])*)"
+)
+MODULE = re.compile(rb" \[ ([^\]]*?) \]")
+CONTINUATION = re.compile(rb" +\| ") # the next lines of a multi-line message
+LEVEL_NAMES = {str(level).strip(): level for level in (LEVELS.DEBUG, LEVELS.INFO, LEVELS.WARNING, LEVELS.ERROR, LEVELS.CRITICAL)}
+RAW_BIT = 1 << 6 # level bit of the lines written by `Logger.message`, that have no time nor level
+
+INDEX_VERSION = 1
+
+
+class TextRecord:
+    """
+    A record read from a text log: its position, its time, level and module, and its lines as written\n
+    DEEP-DEBUG records are written like DEBUG ones, so they are read as DEBUG; lines written by `Logger.message` have no time nor level
+    """
+    __slots__ = ('offset', 'time', 'level', 'module', 'lines')
+
+    def __init__(self, offset : int, time : str|None, level : LEVELS|None, module : str|None, lines : list[bytes]):
+        self.offset = offset
+        self.time = time
+        self.level = level
+        self.module = module
+        self.lines = lines
+
+    @property
+    def text(self) -> str:
+        """
+        The record as written in the file
+        """
+        return b''.join(self.lines).decode('utf-8', 'replace')
+
+    @property
+    def message(self) -> str:
+        """
+        The message, without the header nor the continuation indentation
+        """
+        first = self.lines[0].rstrip(b"\n")
+        match = HEADER.match(first)
+        parts = [first[match.end() + 1:] if match is not None else first]
+        for line in self.lines[1:]:
+            continuation = CONTINUATION.match(line)
+            parts.append(line[continuation.end():].rstrip(b"\n") if continuation is not None else line.rstrip(b"\n"))
+        return b"\n".join(parts).decode('utf-8', 'replace')
+
+    def __repr__(self) -> str:
+        return f"TextRecord({self.offset}, {self.time!r}, {self.level}, {self.module!r})"
+
+
+def parseHeader(line : bytes) -> tuple[str, LEVELS, str|None]|None:
+    """
+    Return the time, level and module (complete name) of the first line of a record, or None if the line does not start a record
+    """
+    match = HEADER.match(line)
+    if match is None:
+        return None
+    modules = MODULE.findall(match.group(3))
+    module = '.'.join(name.strip().decode('utf-8', 'replace') for name in modules) if modules else None
+    return match.group(1).decode('ascii'), LEVEL_NAMES[match.group(2).strip().decode('ascii')], module
+
+
+def readRecords(file : BinaryIO, start : int = 0, end : int|None = None) -> Iterator[TextRecord]:
+    """
+    Read the records of a text log opened in binary mode, from the record starting at the offset `start` to the one starting before `end`;
+    an incomplete last line (still being written) is ignored
+    """
+    file.seek(start)
+    offset = start
+    record = None #type: TextRecord|None
+    for line in file:
+        if not line.endswith(b"\n"):
+            break
+        if record is not None and CONTINUATION.match(line):
+            record.lines.append(line)
+        else:
+            if record is not None:
+                yield record
+            if end is not None and offset >= end:
+                return
+            header = parseHeader(line)
+            if header is None:
+                record = TextRecord(offset, None, None, None, [line])
+            else:
+                record = TextRecord(offset, header[0], header[1], header[2], [line])
+        offset += len(line)
+    if record is not None:
+        yield record
+
+
+class LogIndex:
+    """
+    Sidecar index of a text log (`<file>.idx`): the file is cut into blocks of `blockSize` records, and for each block the index keeps
+    its offsets, its time range and bitmaps of the levels and modules of its records, so a query only reads the blocks that may match\n
+    The index is updated incrementally when the log grows, and rebuilt if the log was replaced
+    """
+    def __init__(self, filepath : str, blockSize : int = 1024):
+        self.filepath = filepath
+        self.blockSize = blockSize
+        self.size = 0 # indexed size of the log, in bytes
+        self.head = "" # first bytes of the log, to detect a replaced file
+        self.modules = [] #type: list[str]
+        self.blocks = [] #type: list[list] # [start, end, min time, max time, level bitmap, module bitmap, record count]
+        self.__moduleIds = {} #type: dict[str, int]
+
+    @property
+    def indexPath(self) -> str:
+        return self.filepath + ".idx"
+
+    @staticmethod
+    def open(filepath : str, blockSize : int = 1024, save : bool = True) -> 'LogIndex':
+        """
+        Load the index of a log, brought up to date with the log (and saved if it changed, when the directory is writable)
+        """
+        index = LogIndex.load(filepath)
+        if index is None:
+            index = LogIndex(filepath, blockSize)
+        if index.update() and save:
+            try:
+                index.save()
+            except OSError:
+                pass # read-only directory (/var/log...): the index is only used for this query
+        return index
+
+    @staticmethod
+    def load(filepath : str) -> 'LogIndex|None':
+        """
+        Load the index of a log as it was saved, or None if there is none (or if it is not readable)
+        """
+        try:
+            with open(filepath + ".idx", 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('version') != INDEX_VERSION:
+            return None
+        index = LogIndex(filepath, data['blockSize'])
+        index.size = data['size']
+        index.head = data['head']
+        index.modules = data['modules']
+        index.blocks = data['blocks']
+        index.__moduleIds = {name: i for i, name in enumerate(index.modules)}
+        return index
+
+    def save(self):
+        with open(self.indexPath, 'w') as f:
+            json.dump({
+                'version': INDEX_VERSION,
+                'blockSize': self.blockSize,
+                'size': self.size,
+                'head': self.head,
+                'modules': self.modules,
+                'blocks': self.blocks
+            }, f, separators=(',', ':'))
+
+    def update(self) -> bool:
+        """
+        Index the part of the log written since the last update (everything if the log was replaced); return True if the index changed
+        """
+        size = os.path.getsize(self.filepath)
+        with open(self.filepath, 'rb') as file:
+            head = file.read(64).hex()
+            if size < self.size or head[:len(self.head)] != self.head:
+                self.__reset() # the log was replaced
+            if size == self.size and head == self.head:
+                return False
+            self.head = head
+            start = 0
+            if self.blocks:
+                start = self.blocks.pop()[0] # the last block may be incomplete, it is read again
+            self.__index(file, start)
+        return True
+
+    def __reset(self):
+        self.size = 0
+        self.head = ""
+        self.modules = []
+        self.blocks = []
+        self.__moduleIds = {}
+
+    def __moduleBit(self, module : str) -> int:
+        moduleId = self.__moduleIds.get(module)
+        if moduleId is None:
+            moduleId = self.__moduleIds[module] = len(self.modules)
+            self.modules.append(module)
+        return 1 << moduleId
+
+    def __index(self, file : BinaryIO, start : int):
+        block = None #type: list|None
+        end = start
+        for record in readRecords(file, start):
+            if block is None or block[6] >= self.blockSize:
+                if block is not None:
+                    self.blocks.append(block)
+                block = [record.offset, record.offset, None, None, 0, 0, 0]
+            end = record.offset + sum(len(line) for line in record.lines)
+            block[1] = end
+            if record.time is not None:
+                if block[2] is None or record.time < block[2]:
+                    block[2] = record.time
+                if block[3] is None or record.time > block[3]:
+                    block[3] = record.time
+            block[4] |= RAW_BIT if record.level is None else 1 << record.level.value
+            if record.module is not None:
+                block[5] |= self.__moduleBit(record.module)
+            block[6] += 1
+        if block is not None:
+            self.blocks.append(block)
+        self.size = end
+
+    def moduleMask(self, modules : list[str]) -> int:
+        """
+        Bitmap of the indexed modules matching one of `modules`, submodules included
+        """
+        return sum(1 << i for i, name in enumerate(self.modules) if matchModule(name, modules))
+
+    def candidates(self, since : str|None = None, until : str|None = None, levels : list[LEVELS]|None = None, modules : list[str]|None = None) -> list[tuple[int, int]]:
+        """
+        The (start, end) offsets of the blocks that may contain matching records
+        """
+        levelMask = sum(1 << level.value for level in set(levels)) if levels is not None else 0
+        moduleMask = self.moduleMask(modules) if modules is not None else 0
+        result = []
+        for start, end, minTime, maxTime, levelBits, moduleBits, _ in self.blocks:
+            if (levels is not None and not levelBits & levelMask) or (modules is not None and not moduleBits & moduleMask):
+                continue
+            if since is not None and (maxTime is None or maxTime < since):
+                continue
+            if until is not None and (minTime is None or minTime[:len(until)] > until):
+                continue
+            result.append((start, end))
+        return result
+
+
+def matchModule(name : str|None, modules : list[str]) -> bool:
+    """
+    Return True if the module `name` is one of `modules` or one of their submodules
+    """
+    return name is not None and any(name == module or name.startswith(module + '.') for module in modules)
+
+
+def normalizeTime(time : str|None) -> str|None:
+    """
+    Accept `2024-05-01T10:00` as well as `2024-05-01 10:00`; any prefix of a time is valid (`2024-05` is the whole month)
+    """
+    return time.replace('T', ' ') if time is not None else None
+
+
+def query(filepath : str, since : str|None = None, until : str|None = None, levels : list[LEVELS]|None = None, modules : list[str]|None = None, useIndex : bool = True) -> Iterator[TextRecord]:
+    """
+    The records of a text log written between `since` and `until` (inclusive, compared as time prefixes), at one of the
+    `levels` and from one of the `modules` (submodules included); None means no condition. DEEP-DEBUG records are written like
+    DEBUG ones, so `LEVELS.DEEP_DEBUG` selects the DEBUG records\n
+    With `useIndex`, the sidecar index is created or updated (or only kept in memory if it cannot be written), and only the
+    blocks that may match are read
+    """
+    since, until = normalizeTime(since), normalizeTime(until)
+    if levels is not None and LEVELS.DEEP_DEBUG in levels and LEVELS.DEBUG not in levels:
+        levels = [*levels, LEVELS.DEBUG] # written the same way, read back as DEBUG
+    def matches(record : TextRecord) -> bool:
+        if (since is not None or until is not None) and record.time is None:
+            return False
+        if since is not None and record.time < since: #type: ignore
+            return False
+        if until is not None and record.time[:len(until)] > until: #type: ignore
+            return False
+        if levels is not None and record.level not in levels:
+            return False
+        if modules is not None and not matchModule(record.module, modules):
+            return False
+        return True
+
+    with open(filepath, 'rb') as file:
+        if useIndex:
+            index = LogIndex.open(filepath)
+            ranges = index.candidates(since, until, levels, modules) #type: list[tuple[int, int|None]]
+        else:
+            ranges = [(0, None)]
+        for start, end in ranges:
+            for record in readRecords(file, start, end):
+                if matches(record):
+                    yield record
+
+
+def main(argv : list[str]|None = None):
+    parser = argparse.ArgumentParser(prog="python -m gamuLogger.query", description="Print the records of a gamuLogger text log matching a query")
+    parser.add_argument('file', help='log file written by a text target')
+    parser.add_argument('--since', '-s', help='first time, or prefix of a time (2024-05-01 10:00)')
+    parser.add_argument('--until', '-u', help='last time, or prefix of a time (inclusive: 2024-05-01 is the whole day)')
+    parser.add_argument('--level', '-l', action='append', help='level of the records (debug, info, warning, error, critical), can be repeated')
+    parser.add_argument('--minLevel', '-m', help='lowest level of the records')
+    parser.add_argument('--module', '-M', action='append', help='module of the records, submodules included, can be repeated')
+    parser.add_argument('--count', '-c', action='store_true', help='print the number of records instead of the records')
+    parser.add_argument('--noIndex', action='store_true', help='scan the whole file instead of using (and updating) the index')
+    parser.add_argument('--reindex', action='store_true', help='rebuild the index before querying')
+    args = parser.parse_args(argv)
+
+    levels = None #type: list[LEVELS]|None
+    if args.level is not None:
+        levels = [LEVELS.from_string(level) for level in args.level]
+    if args.minLevel is not None:
+        minLevel = LEVELS.from_string(args.minLevel)
+        levels = [level for level in (levels if levels is not None else LEVELS) if minLevel <= level]
+
+    if args.reindex and os.path.exists(args.file + ".idx"):
+        os.remove(args.file + ".idx")
+
+    count = 0
+    try:
+        for record in query(args.file, args.since, args.until, levels, args.module, not args.noIndex):
+            if args.count:
+                count += 1
+            else:
+                sys.stdout.write(record.text)
+        if args.count:
+            print(count)
+    except BrokenPipeError:
+        pass # piped to head or less
+
+
+if __name__ == '__main__':
+    main()
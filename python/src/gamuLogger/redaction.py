@@ -0,0 +1,35 @@
+import re
+from json import JSONEncoder
+
+
+ESCAPER = JSONEncoder(ensure_ascii=False)
+
+
+class Redactor:
+    """
+    Hide a set of sensitive strings in messages, scanning each message only once\n
+    The strings are compiled into a single alternation, longest first so that a secret containing another one is hidden entirely;
+    every occurrence is replaced by as many `*` as it has characters. The strings are also hidden in their json-escaped form (quotes,
+    backslashes and control characters), as written in the text lines of the messages that are dicts or lists
+    """
+    def __init__(self, sensitiveDatas : list[str] = []):
+        self.__pattern = None #type: re.Pattern|None
+        self.update(sensitiveDatas)
+
+    def update(self, sensitiveDatas : list[str]|tuple[str, ...]):
+        """
+        Compile a new set of sensitive strings
+        """
+        datas = {str(data) for data in sensitiveDatas if data is not None and str(data)}
+        datas |= {ESCAPER.encode(data)[1:-1] for data in datas} # as written in the messages encoded as json (dicts, lists...)
+        datas = sorted(datas, key=len, reverse=True)
+        self.__pattern = re.compile('|'.join(map(re.escape, datas))) if datas else None
+
+    def __call__(self, message : str) -> str:
+        if self.__pattern is None:
+            return message
+        return self.__pattern.sub(Redactor.__mask, message)
+
+    @staticmethod
+    def __mask(match : re.Match) -> str:
+        return '*' * (match.end() - match.start())
@@ -0,0 +1,231 @@
+from collections.abc import Mapping, Sequence, Set
+from dataclasses import fields, is_dataclass
+from enum import Enum
+from json import JSONEncoder
+from math import isfinite
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+KIND_VALUE = 0      # json value, written as it is
+KIND_STRING = 1
+KIND_INT = 2        # subclass of int (IntEnum...), written as its value like json does
+KIND_FLOAT = 3
+KIND_ENUM = 4       # written as its name
+KIND_MAPPING = 5
+KIND_SEQUENCE = 6   # list, tuple, set...
+KIND_DATACLASS = 7  # its fields
+KIND_OBJECT = 8     # its attributes (`__dict__`)
+KIND_TEXT = 9       # anything else, written as `str(o)`
+
+PRETTY_ENCODER = JSONEncoder(indent=4, ensure_ascii=False) # the C accelerator is used for indented output from Python 3.13
+COMPACT_ENCODER = JSONEncoder(separators=(',', ':'), ensure_ascii=False) # always uses the C accelerator
+
+
+class MessageSerializer:
+    """
+    Convert the messages that are not strings (dicts, lists, dataclasses, objects...) to json\n
+    The message is first reduced to json values, the way to convert each class being looked up once and cached; the size of the
+    result is bounded: containers deeper than `maxDepth` are replaced by a marker, containers keep their first `maxItems` items,
+    strings their first `maxLength` characters, and at most `maxSize` values are converted in total (the rest being replaced by a
+    marker counting the dropped items). The result is then encoded by `orjson` if it is installed, else by the `json` module
+    """
+    __kinds = {str: KIND_STRING, int: KIND_VALUE, bool: KIND_VALUE, float: KIND_FLOAT, type(None): KIND_VALUE, dict: KIND_MAPPING, list: KIND_SEQUENCE, tuple: KIND_SEQUENCE} #type: dict[type, int]
+
+    def __init__(self, maxDepth : int = 16, maxItems : int = 1000, maxLength : int = 10000, maxSize : int = 10000, backend : str = 'auto'):
+        self.configure(maxDepth, maxItems, maxLength, maxSize, backend)
+
+    def configure(self, maxDepth : int = 16, maxItems : int = 1000, maxLength : int = 10000, maxSize : int = 10000, backend : str = 'auto'):
+        """
+        Change the limits and the backend (`auto`, `orjson` or `json`)
+        """
+        if min(maxDepth, maxItems, maxLength, maxSize) <= 0:
+            raise ValueError("The limits must be greater than 0")
+        match backend:
+            case 'auto':
+                self.backend = 'orjson' if orjson is not None else 'json'
+            case 'orjson':
+                if orjson is None:
+                    raise ValueError("orjson is not installed")
+                self.backend = backend
+            case 'json':
+                self.backend = backend
+            case _:
+                raise ValueError(f"Invalid backend: {backend}")
+        self.requestedBackend = backend
+        self.maxDepth = maxDepth
+        self.maxItems = maxItems
+        self.maxLength = maxLength
+        self.maxSize = maxSize
+
+    def options(self) -> tuple[int, int, int, int, str]:
+        """
+        The arguments to create the same serializer
+        """
+        return self.maxDepth, self.maxItems, self.maxLength, self.maxSize, self.requestedBackend
+
+    @staticmethod
+    def kindOf(cls : type) -> int:
+        """
+        How the instances of a class are converted, computed once per class
+        """
+        kind = MessageSerializer.__kinds.get(cls)
+        if kind is None:
+            if issubclass(cls, int): # enums with values of these types are written as values, like json does
+                kind = KIND_INT
+            elif issubclass(cls, float):
+                kind = KIND_FLOAT
+            elif issubclass(cls, str):
+                kind = KIND_STRING
+            elif issubclass(cls, Enum):
+                kind = KIND_ENUM
+            elif issubclass(cls, Mapping):
+                kind = KIND_MAPPING
+            elif issubclass(cls, (Sequence, Set)) and not issubclass(cls, (bytes, bytearray)):
+                kind = KIND_SEQUENCE
+            elif is_dataclass(cls):
+                kind = KIND_DATACLASS
+            elif '__dict__' in dir(cls): # the instances have attributes
+                kind = KIND_OBJECT
+            else:
+                kind = KIND_TEXT
+            MessageSerializer.__kinds[cls] = kind
+        return kind
+
+    def normalize(self, message : Any) -> Any:
+        """
+        Reduce a message to json values (dicts with string keys, lists, strings, numbers, booleans and None), within the limits
+        """
+        return self.__normalize(message)[0]
+
+    def __normalize(self, message : Any) -> tuple[Any, int]:
+        """
+        The message reduced to json values, and the number of nested containers in it
+        """
+        maxDepth, maxItems, maxLength = self.maxDepth, self.maxItems, self.maxLength
+        kinds = MessageSerializer.__kinds
+        remaining = self.maxSize
+        ancestors = set() #type: set[int]
+        deepest = 0
+
+        def string(value : str) -> str:
+            if len(value) > maxLength:
+                return f"{value[:maxLength]}...<{len(value) - maxLength} more characters>"
+            return value
+
+        def walk(o : Any, depth : int) -> Any:
+            nonlocal remaining, deepest
+            remaining -= 1
+            kind = kinds.get(type(o))
+            if kind is None:
+                kind = MessageSerializer.kindOf(type(o))
+            match kind:
+                case 0: # KIND_VALUE
+                    return o
+                case 1: # KIND_STRING
+                    return string(o if type(o) is str else str.__str__(o))
+                case 2: # KIND_INT
+                    return int(o)
+                case 3: # KIND_FLOAT
+                    return float(o) if isfinite(o) else str(float(o))
+                case 4: # KIND_ENUM
+                    return o.name
+                case 9: # KIND_TEXT
+                    return string(str(o))
+            if depth >= maxDepth:
+                return f"<{type(o).__name__}: maximum depth reached>"
+            if id(o) in ancestors:
+                return f"<{type(o).__name__}: circular reference>"
+            ancestors.add(id(o))
+            if depth >= deepest:
+                deepest = depth + 1
+            try:
+                if kind == KIND_SEQUENCE:
+                    result = []
+                    count = len(o)
+                    for item in o:
+                        if len(result) >= maxItems or remaining <= 0:
+                            result.append(f"<{count - len(result)} more items>")
+                            break
+                        if kinds.get(type(item)) == KIND_VALUE: # most items are, skip the call
+                            remaining -= 1
+                            result.append(item)
+                        else:
+                            result.append(walk(item, depth + 1))
+                    return result
+                match kind:
+                    case 5: # KIND_MAPPING
+                        items, count = o.items(), len(o)
+                    case 7: # KIND_DATACLASS
+                        names = [field.name for field in fields(o)]
+                        items, count = ((name, getattr(o, name)) for name in names), len(names)
+                    case _: # KIND_OBJECT
+                        items, count = vars(o).items(), len(vars(o))
+                result = {}
+                for key, value in items:
+                    if len(result) >= maxItems or remaining <= 0:
+                        result["<truncated>"] = f"<{count - len(result)} more items>"
+                        break
+                    if type(key) is not str:
+                        key = MessageSerializer.__key(key)
+                    if kinds.get(type(value)) == KIND_VALUE:
+                        remaining -= 1
+                        result[key] = value
+                    else:
+                        result[key] = walk(value, depth + 1)
+                return result
+            finally:
+                ancestors.discard(id(o))
+
+        result = walk(message, 0)
+        return result, deepest
+
+    @staticmethod
+    def __key(key : Any) -> str:
+        """
+        Convert a key like json does (`True` -> `"true"`, `1` -> `"1"`...), any other key with `str`
+        """
+        if key is None or isinstance(key, (bool, int, float)) and not isinstance(key, Enum):
+            return COMPACT_ENCODER.encode(key)
+        if isinstance(key, Enum):
+            return key.name
+        return str(key)
+
+    def pretty(self, message : Any) -> str:
+        """
+        The message as indented json (4 spaces), as written in text lines
+        """
+        data, depth = self.__normalize(message)
+        if self.backend == 'orjson':
+            try:
+                return MessageSerializer.__reindent(orjson.dumps(data, option=orjson.OPT_INDENT_2).decode('utf-8'), depth) #type: ignore
+            except TypeError:
+                pass # integers that do not fit in 64 bits
+        return PRETTY_ENCODER.encode(data)
+
+    @staticmethod
+    def __reindent(text : str, depth : int) -> str:
+        """
+        Turn an indentation of 2 spaces into 4 spaces: the deepest lines are marked first, with a character that json escapes in
+        strings, so a line is never indented twice
+        """
+        for level in range(depth, 0, -1):
+            text = text.replace("\n" + "  " * level, "\n" + "\x01" * level)
+        return text.replace("\x01", "    ")
+
+    def compact(self, data : Any, normalized : bool = False) -> str:
+        """
+        The data as compact json, on a single line; `normalized` tells that it only contains json values already
+        """
+        if not normalized:
+            data = self.normalize(data)
+        if self.backend == 'orjson':
+            try:
+                return orjson.dumps(data).decode('utf-8') #type: ignore
+            except TypeError:
+                pass
+        return COMPACT_ENCODER.encode(data)
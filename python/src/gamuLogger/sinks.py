@@ -0,0 +1,502 @@
+from collections import deque
+from enum import Enum
+from time import monotonic, time, time_ns, localtime
+from typing import BinaryIO, Callable
+import os
+import gzip
+import queue
+import shutil
+import threading
+import traceback
+import weakref
+import atexit
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class OVERFLOW_POLICIES(Enum):
+    """
+    What a non-blocking target does when its queue is full:
+    - BLOCK:        the caller waits until the writer thread makes room
+    - DROP_OLDEST:  the oldest queued line is discarded to make room for the new one
+    - DROP_NEWEST:  the new line is discarded
+    """
+    BLOCK = 40
+    DROP_OLDEST = 41
+    DROP_NEWEST = 42
+    
+    @staticmethod
+    def from_string(policy : str) -> 'OVERFLOW_POLICIES':
+        match policy.lower().replace('_', '').replace('-', ''):
+            case 'block':
+                return OVERFLOW_POLICIES.BLOCK
+            case 'dropoldest':
+                return OVERFLOW_POLICIES.DROP_OLDEST
+            case 'dropnewest':
+                return OVERFLOW_POLICIES.DROP_NEWEST
+            case _:
+                raise ValueError(f"Invalid overflow policy: {policy}")
+
+
+class FileSink:
+    """
+    Write the logs to a file that stays open for the whole life of the target\n
+    Lines are kept in memory until `bufferSize` characters are buffered or `flushInterval` seconds elapsed since the last flush;
+    the buffer is also flushed by `flush()`, after ERROR and CRITICAL messages and at exit\n
+    With `bufferSize=0` (default), every line is written immediately
+    """
+    __instances = weakref.WeakSet() #type: weakref.WeakSet[FileSink]
+    __flusher = None #type: threading.Thread|None
+    __flusherLock = threading.Lock()
+    __flusherWakeUp = threading.Event() # set when a sink is added, to take its interval into account
+
+    def __init__(self, filepath : str, bufferSize : int = 0, flushInterval : float = 1.0, truncate : bool = True):
+        self.filepath = filepath
+        self.bufferSize = bufferSize
+        self.flushInterval = flushInterval
+        self.lock = threading.RLock()
+        self.size = 0 # size of the file, in bytes
+        self.__buffer = [] #type: list[str]
+        self.__bufferLength = 0
+        self.__lastFlush = monotonic()
+        self.__file = None #type: BinaryIO|None
+        self.reopen(truncate)
+
+        FileSink.__instances.add(self)
+        if bufferSize > 0:
+            FileSink.__startFlusher()
+
+    @property
+    def __name__(self) -> str:
+        return self.filepath
+
+    def __call__(self, string : str):
+        with self.lock:
+            self.__buffer.append(string)
+            self.__bufferLength += len(string)
+            if self.__bufferLength >= self.bufferSize or monotonic() - self.__lastFlush >= self.flushInterval:
+                self.flush()
+
+    def flush(self):
+        """
+        Write the buffered lines to the file
+        """
+        with self.lock:
+            self.__lastFlush = monotonic()
+            if not self.__buffer:
+                return
+            if self.__file is None or self.__file.closed:
+                self.reopen(False)
+            data = ''.join(self.__buffer).encode('utf-8')
+            self.__file.write(data) #type: ignore
+            self.__file.flush() #type: ignore
+            self.size += len(data)
+            self.__buffer = []
+            self.__bufferLength = 0
+            
+    def reopen(self, truncate : bool = False):
+        """
+        Close the file (without flushing the buffer) and open it again, cleared if `truncate` is True; it is always kept open in
+        append mode, so the lines go to the end of the file even after it was truncated by another process (logrotate's copytruncate)
+        """
+        with self.lock:
+            if self.__file is not None and not self.__file.closed:
+                self.__file.close()
+            if truncate:
+                open(self.filepath, 'wb').close()
+            self.__file = open(self.filepath, 'ab')
+            self.size = os.fstat(self.__file.fileno()).st_size
+
+    def close(self):
+        """
+        Flush the buffer and close the file; the file is opened again (in append mode) if the sink is used after being closed
+        """
+        with self.lock:
+            self.flush()
+            if self.__file is not None:
+                self.__file.close()
+
+    @property
+    def closed(self) -> bool:
+        return self.__file is None or self.__file.closed
+
+    def __flushIfExpired(self, now : float):
+        if self.__buffer and now - self.__lastFlush >= self.flushInterval:
+            self.flush()
+
+    @staticmethod
+    def flushAll():
+        for sink in list(FileSink.__instances):
+            sink.flush()
+            
+    @staticmethod
+    def afterFork():
+        """
+        Called in the child process after `os.fork()`: the locks may be held by a thread that only exists in the parent,
+        and the buffered lines are dropped, as the parent writes them
+        """
+        FileSink.__flusherLock = threading.Lock()
+        FileSink.__flusherWakeUp = threading.Event()
+        FileSink.__flusher = None
+        for sink in list(FileSink.__instances):
+            sink.lock = threading.RLock()
+            sink.__buffer = []
+            sink.__bufferLength = 0
+        if any(sink.bufferSize > 0 for sink in list(FileSink.__instances)):
+            FileSink.__startFlusher()
+
+    @staticmethod
+    def __startFlusher():
+        with FileSink.__flusherLock:
+            if FileSink.__flusher is not None and FileSink.__flusher.is_alive():
+                FileSink.__flusherWakeUp.set()
+                return
+            FileSink.__flusher = threading.Thread(target=FileSink.__flushLoop, name="gamuLogger-flusher", daemon=True)
+            FileSink.__flusher.start()
+
+    @staticmethod
+    def __flushLoop():
+        while True:
+            interval = min((sink.flushInterval for sink in list(FileSink.__instances) if sink.bufferSize > 0), default=1.0)
+            FileSink.__flusherWakeUp.wait(max(interval, 0.01))
+            FileSink.__flusherWakeUp.clear()
+            now = monotonic()
+            for sink in list(FileSink.__instances):
+                sink.__flushIfExpired(now)
+
+
+def parseSize(size : int|str) -> int:
+    """
+    Convert a size such as `1048576`, `"512K"`, `"10M"` or `"1G"` to bytes
+    """
+    if isinstance(size, int):
+        return size
+    size = size.strip().upper().removesuffix('B')
+    for suffix, factor in (('K', 1024), ('M', 1024**2), ('G', 1024**3)):
+        if size.endswith(suffix):
+            return int(float(size[:-1]) * factor)
+    return int(size)
+
+def parseInterval(interval : int|float|str) -> float:
+    """
+    Convert an interval such as `3600`, `"30s"`, `"15m"`, `"6h"`, `"1d"`, `"1w"`, `"hourly"`, `"daily"` or `"weekly"` to seconds
+    """
+    if isinstance(interval, (int, float)):
+        return float(interval)
+    interval = interval.strip().lower()
+    match interval:
+        case 'minutely':
+            return 60.0
+        case 'hourly':
+            return 3600.0
+        case 'daily':
+            return 86400.0
+        case 'weekly':
+            return 604800.0
+    for suffix, factor in (('s', 1), ('m', 60), ('h', 3600), ('d', 86400), ('w', 604800)):
+        if interval.endswith(suffix):
+            return float(interval[:-1]) * factor
+    return float(interval)
+
+
+class RotatingFileSink(FileSink):
+    """
+    A `FileSink` that starts a new file when the current one reaches `maxBytes` bytes and/or at every `interval` seconds
+    of wall-clock time (aligned on local time, so a daily rotation happens at midnight)\n
+    The rotated files are named `<file>.1`, `<file>.2`, ... (the highest number being the oldest), only the `keep` most recent
+    are kept; they are compressed with `compression` (`gzip`, `zstd` or `none`) by a background thread, so logging never waits for it\n
+    Unlike `FileSink`, the existing file is not cleared at startup
+    """
+    __jobs = None #type: queue.Queue|None
+    __worker = None #type: threading.Thread|None
+    __workerLock = threading.Lock()
+    
+    def __init__(self, filepath : str, maxBytes : int = 0, interval : float = 0, keep : int = 5, compression : str = 'gzip', bufferSize : int = 0, flushInterval : float = 1.0):
+        if maxBytes <= 0 and interval <= 0:
+            raise ValueError("A rotating file needs a maximum size, an interval, or both")
+        if keep < 1:
+            raise ValueError("At least one rotated file must be kept")
+        compression = compression.lower()
+        if compression not in ('gzip', 'zstd', 'none'):
+            raise ValueError(f"Invalid compression: {compression} (expected gzip, zstd or none)")
+        if compression == 'zstd' and zstandard is None:
+            raise ValueError("The zstd compression requires the 'zstandard' package")
+        self.maxBytes = maxBytes
+        self.interval = interval
+        self.keep = keep
+        self.compression = compression
+        self.__nextRotation = RotatingFileSink.__nextBoundary(time(), interval) if interval > 0 else None
+        self.__rotating = False
+        super().__init__(filepath, bufferSize, flushInterval, truncate=False)
+        
+    def __call__(self, string : str):
+        if self.__nextRotation is not None and time() >= self.__nextRotation:
+            with self.lock:
+                if time() >= self.__nextRotation: # another thread may have rotated the file meanwhile
+                    self.rotate()
+        super().__call__(string)
+        
+    def flush(self):
+        with self.lock:
+            super().flush()
+            if self.maxBytes > 0 and self.size >= self.maxBytes and not self.__rotating:
+                self.rotate()
+                
+    def rotate(self):
+        """
+        Start a new file now; the current one is renamed immediately, then shifted and compressed by the background thread
+        """
+        with self.lock:
+            if self.__rotating:
+                return
+            self.__rotating = True
+            try:
+                super().flush()
+                if self.interval > 0:
+                    self.__nextRotation = RotatingFileSink.__nextBoundary(time(), self.interval)
+                if self.size == 0:
+                    return
+                pending = f"{self.filepath}.{time_ns()}.rotating"
+                self.close()
+                os.replace(self.filepath, pending)
+                self.reopen(truncate=True)
+                RotatingFileSink.__submit(self.__archive, pending)
+            finally:
+                self.__rotating = False
+            
+    def __extension(self) -> str:
+        match self.compression:
+            case 'gzip':
+                return '.gz'
+            case 'zstd':
+                return '.zst'
+            case _:
+                return ''
+            
+    def generation(self, index : int) -> str:
+        """
+        Path of the `index`-th most recent rotated file (starting at 1)
+        """
+        return f"{self.filepath}.{index}{self.__extension()}"
+            
+    def __archive(self, pending : str):
+        """
+        Run by the background thread: shift the generations, then compress the rotated file as generation 1
+        """
+        oldest = self.generation(self.keep)
+        if os.path.exists(oldest):
+            os.remove(oldest)
+        for index in range(self.keep - 1, 0, -1):
+            if os.path.exists(self.generation(index)):
+                os.replace(self.generation(index), self.generation(index + 1))
+        
+        destination = self.generation(1)
+        match self.compression:
+            case 'gzip':
+                with open(pending, 'rb') as source, gzip.open(destination + '.tmp', 'wb') as target:
+                    shutil.copyfileobj(source, target)
+            case 'zstd':
+                with open(pending, 'rb') as source, open(destination + '.tmp', 'wb') as target:
+                    zstandard.ZstdCompressor().copy_stream(source, target) #type: ignore
+            case _:
+                os.replace(pending, destination)
+                return
+        os.replace(destination + '.tmp', destination)
+        os.remove(pending)
+        
+    @staticmethod
+    def __nextBoundary(now : float, interval : float) -> float:
+        offset = localtime(now).tm_gmtoff
+        return ((now + offset) // interval + 1) * interval - offset
+    
+    @staticmethod
+    def __submit(job : Callable[[str], None], pending : str):
+        with RotatingFileSink.__workerLock:
+            if RotatingFileSink.__jobs is None:
+                RotatingFileSink.__jobs = queue.Queue()
+            if RotatingFileSink.__worker is None or not RotatingFileSink.__worker.is_alive():
+                RotatingFileSink.__worker = threading.Thread(target=RotatingFileSink.__work, name="gamuLogger-compressor", daemon=True)
+                RotatingFileSink.__worker.start()
+        RotatingFileSink.__jobs.put((job, pending))
+        
+    @staticmethod
+    def __work():
+        jobs = RotatingFileSink.__jobs
+        while True:
+            job, pending = jobs.get() #type: ignore
+            try:
+                job(pending)
+            except Exception:
+                traceback.print_exc()
+            finally:
+                jobs.task_done() #type: ignore
+                
+    @staticmethod
+    def waitArchives():
+        """
+        Wait until every rotated file is shifted and compressed
+        """
+        if RotatingFileSink.__jobs is not None:
+            RotatingFileSink.__jobs.join()
+            
+    @staticmethod
+    def afterFork():
+        """
+        Called in the child process after `os.fork()`: the compressor thread does not exist in the child, the files rotated
+        by the parent are compressed by the parent
+        """
+        RotatingFileSink.__workerLock = threading.Lock()
+        RotatingFileSink.__jobs = None
+        RotatingFileSink.__worker = None
+
+
+class BackgroundWriter:
+    """
+    Deliver lines to `output` from a dedicated thread; the callers only append to a bounded queue\n
+    The writer thread drains the queue by batches of at most `batchSize` lines; when the queue holds `queueSize` lines,
+    `overflowPolicy` decides whether the caller waits or a line is dropped (dropped lines are counted in `dropped`)
+    """
+    __instances = weakref.WeakSet() #type: weakref.WeakSet[BackgroundWriter]
+    __FLUSH = object() # marker asking the writer thread to flush the output
+    
+    def __init__(self, output : Callable[[str], None], flush : Callable[[], None]|None = None, queueSize : int = 10000, overflowPolicy : OVERFLOW_POLICIES = OVERFLOW_POLICIES.BLOCK, batchSize : int = 256, name : str = "output"):
+        if queueSize <= 0:
+            raise ValueError("The queue size must be greater than 0")
+        self.output = output
+        self.outputFlush = flush
+        self.queueSize = queueSize
+        self.overflowPolicy = overflowPolicy
+        self.batchSize = batchSize
+        self.dropped = 0
+        self.name = name
+        self.__queue = deque() #type: deque[object]
+        self.__closing = False
+        self.__start()
+        BackgroundWriter.__instances.add(self)
+        
+    def __start(self):
+        self.__queue.clear()
+        self.__queuedLines = 0
+        self.__inProgress = 0
+        self.__condition = threading.Condition()
+        self.__thread = threading.Thread(target=self.__run, name=f"gamuLogger-writer-{self.name}", daemon=True)
+        self.__thread.start()
+        
+    def __call__(self, string : str):
+        with self.__condition:
+            if self.__closing:
+                raise ValueError("The writer is closed")
+            if self.__queuedLines >= self.queueSize:
+                match self.overflowPolicy:
+                    case OVERFLOW_POLICIES.BLOCK:
+                        self.__condition.wait_for(lambda: self.__queuedLines < self.queueSize or self.__closing)
+                    case OVERFLOW_POLICIES.DROP_OLDEST:
+                        self.__dropOldest()
+                    case OVERFLOW_POLICIES.DROP_NEWEST:
+                        self.dropped += 1
+                        return
+            self.__queue.append(string)
+            self.__queuedLines += 1
+            self.__condition.notify_all()
+            
+    def __dropOldest(self):
+        queue = self.__queue
+        for i, item in enumerate(queue):
+            if item is not BackgroundWriter.__FLUSH:
+                del queue[i]
+                self.__queuedLines -= 1
+                self.dropped += 1
+                break
+        while len(queue) > 1 and queue[0] is BackgroundWriter.__FLUSH and queue[1] is BackgroundWriter.__FLUSH:
+            queue.popleft() # the line between the two flush requests was dropped, one is enough
+            
+    def requestFlush(self):
+        """
+        Ask the writer thread to flush the output once the lines queued so far are written, without waiting\n
+        Consecutive requests are merged, so the queue holds at most one flush marker per queued line
+        """
+        with self.__condition:
+            if self.__queue and self.__queue[-1] is BackgroundWriter.__FLUSH:
+                return
+            self.__queue.append(BackgroundWriter.__FLUSH)
+            self.__condition.notify_all()
+            
+    def flush(self, timeout : float|None = None) -> bool:
+        """
+        Wait until every queued line is written and the output is flushed\n
+        Return False if the timeout expired before
+        """
+        self.requestFlush()
+        with self.__condition:
+            return self.__condition.wait_for(lambda: not self.__queue and self.__inProgress == 0, timeout)
+        
+    def close(self, timeout : float|None = None):
+        """
+        Write the remaining lines and stop the writer thread
+        """
+        self.flush(timeout)
+        with self.__condition:
+            self.__closing = True
+            self.__condition.notify_all()
+        if self.__thread is not threading.current_thread():
+            self.__thread.join(timeout)
+            
+    @property
+    def pending(self) -> int:
+        """
+        Number of lines waiting to be written
+        """
+        return self.__queuedLines
+        
+    def __run(self):
+        while True:
+            with self.__condition:
+                self.__condition.wait_for(lambda: self.__queue or self.__closing)
+                if not self.__queue:
+                    return
+                batch = [self.__queue.popleft() for _ in range(min(len(self.__queue), self.batchSize))]
+                self.__inProgress = len(batch)
+                self.__queuedLines -= sum(1 for item in batch if item is not BackgroundWriter.__FLUSH)
+                self.__condition.notify_all() # wake up the callers waiting for room in the queue
+            for item in batch:
+                try:
+                    if item is BackgroundWriter.__FLUSH:
+                        if self.outputFlush is not None:
+                            self.outputFlush()
+                    else:
+                        self.output(item) #type: ignore
+                except Exception:
+                    traceback.print_exc()
+            with self.__condition:
+                self.__inProgress = 0
+                self.__condition.notify_all()
+                
+    @staticmethod
+    def flushAll(timeout : float|None = None):
+        for writer in list(BackgroundWriter.__instances):
+            writer.flush(timeout)
+            
+    @staticmethod
+    def afterFork():
+        """
+        Called in the child process after `os.fork()`: only the forking thread survives, so every writer gets a new thread;
+        the lines queued by the parent are dropped, as the parent writes them
+        """
+        for writer in list(BackgroundWriter.__instances):
+            if not writer.__closing:
+                writer.__start()
+
+
+def flushAll():
+    """
+    Deliver everything that is still queued or buffered; called at exit
+    """
+    BackgroundWriter.flushAll()
+    FileSink.flushAll()
+    RotatingFileSink.waitArchives()
+
+
+atexit.register(flushAll)
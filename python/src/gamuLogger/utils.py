@@ -1,34 +1,56 @@
 import os
+import ast
 import inspect
 import sys
-from datetime import datetime
+from bisect import bisect_right
+from time import time_ns, strftime, localtime
+from functools import lru_cache, wraps
+from types import FrameType
 from typing import Any
 from json import JSONEncoder
 
 from .customTypes import COLORS
 
 
-def getCallerFilePath(stack = inspect.stack()) -> str:
+def getCallerFrame(depth : int = 2) -> FrameType:
+    """
+    Returns the frame `depth` levels above the function calling this one, walking `f_back` (O(depth))\n
+    If the stack is not deep enough, the outermost frame is returned
+    """
+    frame = sys._getframe(1)
+    for _ in range(depth):
+        if frame.f_back is None:
+            break
+        frame = frame.f_back
+    return frame
+
+@lru_cache(maxsize=None)
+def getAbsolutePath(filename : str) -> str:
+    return os.path.abspath(filename)
+
+def getCallerFilePath(frame : FrameType|None = None) -> str:
     """
     Returns the absolute filepath of the caller of the parent function
     """
-    # return os.path.abspath(stack[2][1])
-    if len(stack) < 3:
-        return os.path.abspath(stack[-1].filename)
-    return os.path.abspath(stack[2].filename)
+    if frame is None:
+        frame = getCallerFrame(2)
+    return getAbsolutePath(frame.f_code.co_filename)
 
-def getCallerFunctionName(stack = inspect.stack()) -> str:
+def getCallerFunctionName(frame : FrameType|None = None) -> str:
     """
     Returns the name of the function that called this one, including the class name if the function is a method
     """
-    if len(stack) < 3:
-        return "<module>"
-    caller = stack[2]
-    caller_name = caller.function
-    if caller_name == "<module>":
+    if frame is None:
+        frame = getCallerFrame(2)
+    code = frame.f_code
+    caller_name = code.co_name
+    if caller_name == "<module>" or frame.f_back is None:
         return "<module>"
 
-    parents = getAllParents(caller.filename, caller.lineno)[::-1]
+    if hasattr(code, 'co_qualname'): # python 3.11+
+        return code.co_qualname.replace('.<locals>', '')
+
+    parents = getAllParents(frame.f_code.co_filename, frame.f_lineno)[::-1]
     if len(parents) <= 0:
         return caller_name
     if caller_name == parents[-1]:
@@ -38,15 +60,47 @@ def getCallerFunctionName(stack = inspect.stack()) -> str:
     
 
 def getCallerInfo():
-    stack = inspect.stack()
-    return getCallerFilePath(stack), getCallerFunctionName(stack)
+    frame = getCallerFrame(2)
+    return getCallerFilePath(frame), getCallerFunctionName(frame)
 
-def getTime():
-    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+class CachedClock:
+    """
+    Render timestamps as `YYYY-MM-DD HH:MM:SS`, optionally followed by milliseconds (precision 3) or microseconds (precision 6)\n
+    `strftime` only runs when the second changes, the fraction is formatted from integers
+    """
+    __cache = (-1, "") #type: tuple[int, str]
+    
+    @staticmethod
+    def format(timestamp : int, precision : int = 0) -> str:
+        """
+        `timestamp` is in nanoseconds since the epoch, as returned by `time.time_ns()`
+        """
+        second, fraction = divmod(timestamp, 1_000_000_000)
+        cache = CachedClock.__cache # read once, another thread may replace it
+        if cache[0] != second:
+            cache = (second, strftime("%Y-%m-%d %H:%M:%S", localtime(second)))
+            CachedClock.__cache = cache
+        match precision:
+            case 0:
+                return cache[1]
+            case 3:
+                return f"{cache[1]}.{fraction // 1_000_000:03d}"
+            case 6:
+                return f"{cache[1]}.{fraction // 1_000:06d}"
+            case _:
+                raise ValueError(f"Invalid time precision: {precision} (expected 0, 3 or 6)")
 
+def getTime(timestamp : int|None = None, precision : int = 0) -> str:
+    return CachedClock.format(time_ns() if timestamp is None else timestamp, precision)
+
+
+CONTINUATION_PREFIXES = {} #type: dict[int, str] # by indentation, built once
 
 def replaceNewLine(string : str, indent : int = 33):
-    return string.replace('\n', '\n' + (' ' * indent) + '| ')
+    prefix = CONTINUATION_PREFIXES.get(indent)
+    if prefix is None:
+        prefix = CONTINUATION_PREFIXES[indent] = '\n' + (' ' * indent) + '| '
+    return string.replace('\n', prefix) if '\n' in string else string
 
 
 def centerString(string : str, length : int):
@@ -71,7 +125,7 @@ def string2type(string : str):
         case 'set':
             return set
         case 'none':
-            return None
+            return type(None)
         case _:
             return Any
         
@@ -79,43 +133,79 @@ def type2string(t : Any):
     match t:
         case None:
             return 'None'
+        case t if t is type(None):
+            return 'None'
         case _:
             return t.__name__
 
+def getParameterTypes(parameter : inspect.Parameter) -> list[type]:
+    parameter = str(parameter)
+    parameter = parameter.split('=')[0]
+    parameter = parameter.split(':', 1)
+    if len(parameter) == 1:
+        return [Any]
+    return [string2type(t) for t in parameter[1].split('|')]
+
 def getFunctionArguments(func) -> dict[str, list[type]]:
-    signature =  str(inspect.signature(func))
-    signature = signature[1:-1] # Remove parenthesis
-    signature = signature.split(',')
-    
-    result = {}
-    for arg in signature:
-        arg = arg.strip()
-        arg = arg.split('=')[0]
-        arg = arg.split(':')
-        arg = [elem.strip() for elem in arg]
-        if len(arg) == 1:
-            result[arg[0]] = [Any]
-            continue
-        types = arg[1]
-        result[arg[0]] = [string2type(t) for t in types.split('|')]
-        
-    return result
+    return {
+        name: getParameterTypes(parameter)
+        for name, parameter in inspect.signature(func).parameters.items()
+    }
+
+
+STRICT_TYPE_CHECK_ENV = "GAMULOGGER_STRICT_TYPECHECK"
+STRICT_TYPE_CHECK_AVAILABLE = os.environ.get(STRICT_TYPE_CHECK_ENV, "1").strip().lower() not in ("0", "false", "no", "off")
+STRICT_TYPE_CHECK = STRICT_TYPE_CHECK_AVAILABLE
+
+def setStrictTypeCheck(enabled : bool):
+    """
+    Enable or disable the argument checks of the functions decorated with `strictTypeCheck`\n
+    To remove the checks entirely (the decorator then returns the function unchanged), set the environment variable
+    `GAMULOGGER_STRICT_TYPECHECK=0` before importing the package
+    """
+    global STRICT_TYPE_CHECK
+    STRICT_TYPE_CHECK = enabled
+
+def isStrictTypeCheckEnabled() -> bool:
+    return STRICT_TYPE_CHECK
+
+def compileTypeChecker(func) -> tuple[list[tuple[type, ...]|None], dict[str, tuple[type, ...]|None]]:
+    """
+    Read the signature of `func` once and return the accepted types of each argument, by position and by name\n
+    `None` means that the argument accepts any type
+    """
+    positional = [] #type: list[tuple[type, ...]|None]
+    named = {} #type: dict[str, tuple[type, ...]|None]
+    for name, parameter in inspect.signature(func).parameters.items():
+        types = getParameterTypes(parameter)
+        accepted = None if Any in types else tuple(types)
+        match parameter.kind:
+            case inspect.Parameter.POSITIONAL_ONLY:
+                positional.append(accepted)
+            case inspect.Parameter.POSITIONAL_OR_KEYWORD:
+                positional.append(accepted)
+                named[name] = accepted
+            case inspect.Parameter.KEYWORD_ONLY:
+                named[name] = accepted
+    return positional, named
 
 def strictTypeCheck(func):
+    if not STRICT_TYPE_CHECK_AVAILABLE:
+        return func
+    
+    positional, named = compileTypeChecker(func)
+    
+    @wraps(func)
     def wrapper(*args, **kwargs):
-        # Get the function arguments
-        func_args = getFunctionArguments(func)
-
-        # Check the arguments
-        for i, arg in enumerate(args):
-            types = func_args[list(func_args.keys())[i]]
-            if type(arg) not in types and Any not in types:
-                raise TypeError(f"Argument {i} of function {func.__name__} must be of type ("+", ".join(map(type2string, types)) + ")")
+        if STRICT_TYPE_CHECK:
+            for i, (types, arg) in enumerate(zip(positional, args)):
+                if types is not None and type(arg) not in types:
+                    raise TypeError(f"Argument {i} of function {func.__name__} must be of type ("+", ".join(map(type2string, types)) + ")")
 
-        for key, value in kwargs.items():
-            types = func_args[key]
-            if type(value) not in types and Any not in types:
-                raise TypeError(f"Argument {key} of function {func.__name__} must be of type ("+", ".join(map(type2string, types)) + ")")
+            for key, value in kwargs.items():
+                types = named.get(key)
+                if types is not None and type(value) not in types:
+                    raise TypeError(f"Argument {key} of function {func.__name__} must be of type ("+", ".join(map(type2string, types)) + ")")
 
         return func(*args, **kwargs)
 
@@ -126,24 +216,34 @@ def countLinesLength(string : str) -> list[int]:
     return [len(line) for line in lines]
 
 def splitLongString(string : str, length : int = 100) -> str:
-    """Split a long string into multiple lines, on spaces"""
-    result = []
+    """
+    Split a long string into multiple lines, on spaces; a word longer than `length` is cut into pieces of `length` characters\n
+    The lines are slices of the string, delimited while walking through the words once, so the time is linear in the length of the string
+    """
     if len(string) <= length:
         return string
     
-    lines = [line.split(' ') for line in string.split('\n')]
-    
-    for line in lines:
-        current_line = []
-        for word in line:
-            if len(word) > length:
-                raise ValueError("A word is longer than the maximum length")
-            if len(' '.join(current_line)) + len(word) > length:
-                result.append(' '.join(current_line))
-                current_line = [word]
-            else:
-                current_line.append(word)
-        result.append(' '.join(current_line))
+    result = []
+    for line in string.split('\n'):
+        start = -1 # start of the current line in `line`, -1 when it is empty
+        end = 0 # end of the current line
+        position = 0 # start of the word
+        for word in line.split(' '):
+            size = len(word)
+            if size > length:
+                if start >= 0:
+                    result.append(line[start:end])
+                last = position + (size - 1) // length * length # start of the last piece, that begins the next line
+                result.extend(line[i:i+length] for i in range(position, last, length))
+                start = last
+            elif start >= 0 and end - start + size > length: # the separating space is not counted, as before
+                result.append(line[start:end])
+                start = position
+            elif start < 0:
+                start = position
+            position += size + 1
+            end = position - 1
+        result.append(line[max(start, 0):end])
     return '\n'.join(result)
 
 class CustomJSONEncoder(JSONEncoder):
@@ -162,33 +262,74 @@ class CustomJSONEncoder(JSONEncoder):
 
 
 
+class QualnameIndex:
+    """
+    Layout of the classes and functions defined in a source file, built once with `ast`\n
+    Each entry marks the line where the innermost enclosing scope changes, so a lookup is a bisection (O(log n))
+    """
+    __cache = {} #type: dict[str, tuple[float, QualnameIndex]]
+
+    def __init__(self, source : str):
+        self.__lines = [] #type: list[int]
+        self.__scopes = [] #type: list[tuple[str, ...]]
+        try:
+            tree = ast.parse(source)
+        except (SyntaxError, ValueError):
+            return
+        self.__visit(tree, ())
+
+    def __visit(self, node : ast.AST, scope : tuple[str, ...]):
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+                childScope = scope + (child.name,)
+                self.__lines.append(child.lineno)
+                self.__scopes.append(childScope)
+                self.__visit(child, childScope)
+                self.__lines.append(child.end_lineno + 1) #type: ignore
+                self.__scopes.append(scope)
+            else:
+                self.__visit(child, scope)
+
+    def get(self, lineno : int) -> tuple[str, ...]:
+        """
+        Returns the names of the scopes containing the line, from the outermost to the innermost
+        """
+        index = bisect_right(self.__lines, lineno) - 1
+        if index < 0:
+            return ()
+        return self.__scopes[index]
+
+    @staticmethod
+    def fromFile(filepath : str) -> 'QualnameIndex':
+        """
+        Returns the index of a file, rebuilding it only if the file was modified since the last call
+        """
+        try:
+            mtime = os.stat(filepath).st_mtime
+        except OSError:
+            mtime = -1
+        cached = QualnameIndex.__cache.get(filepath)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        try:
+            with open(filepath, 'r') as f:
+                source = f.read()
+        except (OSError, UnicodeDecodeError):
+            source = ''
+        index = QualnameIndex(source)
+        QualnameIndex.__cache[filepath] = (mtime, index)
+        return index
+
+    @staticmethod
+    def clearCache():
+        QualnameIndex.__cache = {}
+
+
 def getAllParents(filepath, lineno):
     """
-    Get all parent classes of a class or method, based on indentation in the file
+    Get all parent classes and functions of a line, from the innermost to the outermost
     """
-    
-    # Read
-    with open(filepath, 'r') as f:
-        lines = f.readlines()
-    
-    # Get the line
-    line = lines[lineno-1]
-    
-    # Get the indentation
-    indentation = len(line) - len(line.lstrip())
-    
-    # Get the parent classes
-    parents = []
-    for i in range(lineno-1, 0, -1):
-        line = lines[i]
-        if len(line) - len(line.lstrip()) < indentation:
-            indentation = len(line) - len(line.lstrip())
-            if "class" in line:
-                parents.append(line.strip()[:-1].split(' ')[1]) # Remove the ':'
-            elif "def" in line:
-                parents.append(line.strip()[:-1].split(' ')[1].split('(')[0])
-    
-    return parents
+    return list(QualnameIndex.fromFile(filepath).get(lineno))[::-1]
 
 def colorize(color : COLORS, string : str):
     return f"{color}{string}{COLORS.RESET}"
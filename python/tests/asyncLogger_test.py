@@ -0,0 +1,149 @@
+import pytest
+
+import os
+import time
+import asyncio
+import tempfile
+import threading
+
+from gamuLogger import AsyncLogger #type: ignore
+from gamuLogger.gamuLogger import Logger, LEVELS, Module, info #type: ignore
+
+
+def collect(level : LEVELS = LEVELS.INFO) -> list[str]:
+    Logger.reset()
+    Module.clear()
+    Logger.removeTarget("stdout")
+    lines = []
+    def target(line):
+        lines.append(line)
+    Logger.addTarget(target, level)
+    return lines
+
+
+class Test_AsyncLogger:
+    def test_levels(self):
+        lines = collect(LEVELS.DEBUG)
+        async def main():
+            await AsyncLogger.deepDebug("hidden")
+            await AsyncLogger.debug("debug %s", 1)
+            await AsyncLogger.info("info")
+            await AsyncLogger.warning("warning")
+            await AsyncLogger.error("error")
+            await AsyncLogger.critical("critical")
+        asyncio.run(main())
+        assert len(lines) == 5
+        assert lines[0].endswith(f"[{LEVELS.DEBUG}] debug 1\n")
+        assert lines[4].endswith(f"[{LEVELS.CRITICAL}] critical\n")
+        Logger.reset()
+
+    def test_modulesAcrossCoroutines(self):
+        lines = collect()
+        async def handler(name : str):
+            Logger.setModule(name)
+            for _ in range(3):
+                await AsyncLogger.info(name)
+                await asyncio.sleep(0)
+        async def other(name : str):
+            Logger.setModule(name)
+            for _ in range(3):
+                await AsyncLogger.info(name)
+                await asyncio.sleep(0)
+        async def main():
+            await asyncio.gather(handler("first"), other("second"))
+        asyncio.run(main())
+        assert len(lines) == 6
+        for line in lines:
+            name = line.split()[-1]
+            assert f"[ {'first'.center(15)} ]" in line if name == "first" else f"[ {'second'.center(15)} ]" in line
+        Module.clear()
+        Logger.reset()
+
+    def test_threadOfTheCaller(self):
+        lines = collect()
+        Logger.showThreadsName()
+        async def main():
+            await AsyncLogger.info("message")
+        asyncio.run(main())
+        assert threading.current_thread().name in lines[0]
+        Logger.reset()
+
+    def test_legacyCallerInfo(self):
+        lines = collect()
+        Logger.setTemplate("target", "{file}:{function} {message}")
+        async def main():
+            with pytest.deprecated_call():
+                await AsyncLogger.info("message", ("file.py", "function"))
+        asyncio.run(main())
+        assert lines == ["file.py:function message\n"]
+        Logger.reset()
+
+
+class Test_Submit:
+    def test_doesNotWait(self):
+        lines = collect()
+        release = threading.Event()
+        def slow(line):
+            release.wait(5) # a stalled output
+            lines.append(line)
+        Logger.addTarget(slow)
+        async def main():
+            for i in range(5):
+                Logger.submit(LEVELS.INFO, "line %d", i)
+            written = len(lines) # the callers did not wait for the output
+            release.set()
+            await Logger.aflush()
+            return written
+        assert asyncio.run(main()) <= 1
+        assert len(lines) == 10
+        assert [line.split()[-1] for line in lines[::2]] == ["0", "1", "2", "3", "4"] # in order
+        Logger.reset()
+
+    def test_threadIdOfTheCaller(self):
+        lines = collect()
+        Logger.setTemplate("target", "{thread} {tid} {message}")
+        Logger.submit(LEVELS.INFO, "message").result() # written by the writer thread
+        assert lines == [f"{threading.current_thread().name} {threading.get_native_id()} message\n"]
+        Logger.reset()
+
+    def test_flushWaits(self):
+        lines = collect()
+        def slow(line):
+            time.sleep(0.01)
+            lines.append(line)
+        Logger.addTarget(slow)
+        for i in range(3):
+            Logger.submit(LEVELS.INFO, "line %d", i)
+        Logger.flush()
+        assert len(lines) == 6
+        Logger.reset()
+
+    def test_disabled(self):
+        lines = collect()
+        future = Logger.submit(LEVELS.DEBUG, "hidden")
+        assert future.done()
+        Logger.submit(LEVELS.INFO, "shown").result()
+        assert len(lines) == 1
+        Logger.reset()
+
+    def test_error(self, capsys):
+        collect()
+        def broken(line):
+            raise RuntimeError("broken target")
+        Logger.addTarget(broken)
+        future = Logger.submit(LEVELS.INFO, "message")
+        pytest.raises(RuntimeError, future.result)
+        assert "broken target" in capsys.readouterr().err
+        Logger.reset()
+
+    def test_resetWritesPending(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = os.path.join(tmpdirname, "test.log")
+            Logger.reset()
+            Logger.addTarget(filepath)
+            for i in range(100):
+                Logger.submit(LEVELS.INFO, "line %d", i)
+            info("last")
+            Logger.reset()
+            with open(filepath, 'r') as f:
+                assert len(f.readlines()) == 101
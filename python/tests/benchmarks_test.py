@@ -0,0 +1,251 @@
+import pytest
+
+import os
+import re
+import inspect
+import tempfile
+import multiprocessing
+from typing import Any
+from time import perf_counter
+from datetime import datetime
+
+from gamuLogger.utils import getCallerInfo, strictTypeCheck, setStrictTypeCheck, getFunctionArguments, splitLongString #type: ignore
+from gamuLogger.utils import CustomJSONEncoder, getExecutableFormatted, centerString #type: ignore
+from gamuLogger.labels import ProcessLabel, ThreadLabel #type: ignore
+from gamuLogger.serializer import MessageSerializer, orjson #type: ignore
+from gamuLogger.lineTemplate import LineTemplate #type: ignore
+from gamuLogger.logRecord import LogRecord #type: ignore
+from gamuLogger.customTypes import LEVELS #type: ignore
+from gamuLogger.gamuLogger import Logger, info, debug, Module, Target, debugFunc, deepDebugFunc, chrono #type: ignore
+
+
+BENCHMARK = os.environ.get("GAMULOGGER_BENCHMARK", "0") == "1" # the timings depend on the load of the machine, compare them on demand
+
+
+def assertFaster(new : float, old : float):
+    """Check that `new` is shorter than `old`, only when `GAMULOGGER_BENCHMARK=1` is set (the timings are always printed)"""
+    if BENCHMARK:
+        assert new < old, f"{new*1e9:.0f}ns is not faster than {old*1e9:.0f}ns"
+
+def timeit(func, repeat : int) -> float:
+    """Return the mean duration of `func()` in seconds"""
+    start = perf_counter()
+    for _ in range(repeat):
+        func()
+    return (perf_counter() - start) / repeat
+
+def atDepth(depth : int, func):
+    """Call `func` with `depth` extra frames on the stack"""
+    if depth <= 0:
+        return func()
+    return atDepth(depth - 1, func)
+
+
+class Test_CallerInfo:
+    @pytest.mark.parametrize("depth", [10, 50, 200])
+    def test_frameWalkingVsInspectStack(self, depth):
+        def legacy():
+            stack = inspect.stack()
+            return stack[1].filename, stack[1].function
+
+        old = atDepth(depth, lambda: timeit(legacy, 20))
+        new = atDepth(depth, lambda: timeit(getCallerInfo, 20))
+        print(f"depth {depth}: inspect.stack() {old*1e6:.1f}us, frame walking {new*1e6:.1f}us ({old/new:.0f}x)")
+        assertFaster(new, old)
+
+
+class Test_StrictTypeCheck:
+    def test_callsPerSecond(self):
+        def legacyStrictTypeCheck(func):
+            def wrapper(*args, **kwargs):
+                func_args = getFunctionArguments(func)
+                for i, arg in enumerate(args):
+                    types = func_args[list(func_args.keys())[i]]
+                    if type(arg) not in types and Any not in types:
+                        raise TypeError()
+                return func(*args, **kwargs)
+            return wrapper
+        
+        def func(a : int, b : str, c : float|None = None):
+            pass
+        
+        legacy = legacyStrictTypeCheck(func)
+        checked = strictTypeCheck(func)
+        
+        old = timeit(lambda: legacy(1, "2", 3.0), 2000)
+        new = timeit(lambda: checked(1, "2", 3.0), 2000)
+        setStrictTypeCheck(False)
+        try:
+            disabled = timeit(lambda: checked(1, "2", 3.0), 2000)
+        finally:
+            setStrictTypeCheck(True)
+        print(f"strictTypeCheck: legacy {1/old:.0f} calls/s, compiled {1/new:.0f} calls/s, disabled {1/disabled:.0f} calls/s")
+        assertFaster(new, old)
+        assertFaster(disabled, new)
+
+
+class Test_Decorators:
+    def test_disabledOverhead(self):
+        def legacyDebugFunc(func):
+            @strictTypeCheck
+            def wrapper(*args, **kwargs):
+                debug(f"Calling {func.__name__} with\nargs: {args}\nkwargs: {kwargs}")
+                start = datetime.now()
+                result = func(*args, **kwargs)
+                end = datetime.now()
+                debug(f"Function {func.__name__} took {end-start} to execute and returned \"{result}\"")
+                return result
+            return wrapper
+        
+        def func(a, b=None):
+            return a
+        
+        Logger.reset()
+        Module.clear()
+        bare = timeit(lambda: func(1, b=2), 20000)
+        results = {}
+        for name, decorated in [
+            ("legacy", legacyDebugFunc(func)),
+            ("debugFunc", debugFunc(True)(func)),
+            ("deepDebugFunc", deepDebugFunc(True)(func)),
+            ("chrono", chrono(func))
+        ]:
+            results[name] = timeit(lambda: decorated(1, b=2), 20000) - bare
+        print(", ".join(f"{name}: +{overhead*1e9:.0f}ns" for name, overhead in results.items()), "per call when disabled")
+        for name in ("debugFunc", "deepDebugFunc", "chrono"):
+            assertFaster(results[name], results["legacy"])
+
+
+class Test_SplitLongString:
+    @pytest.mark.parametrize("size", [10_000, 1_000_000])
+    def test_wrapping(self, size):
+        def legacySplitLongString(string : str, length : int = 100) -> str:
+            result = []
+            if len(string) <= length:
+                return string
+            lines = [line.split(' ') for line in string.split('\n')]
+            for line in lines:
+                current_line = []
+                for word in line:
+                    if len(word) > length:
+                        raise ValueError("A word is longer than the maximum length")
+                    if len(' '.join(current_line)) + len(word) > length:
+                        result.append(' '.join(current_line))
+                        current_line = [word]
+                    else:
+                        current_line.append(word)
+                result.append(' '.join(current_line))
+            return '\n'.join(result)
+
+        words = ("lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing", "elit")
+        message = ' '.join(words[i % len(words)] for i in range(size // 6))[:size]
+        repeat = 20 if size < 100_000 else 2
+        assert splitLongString(message, 150) == legacySplitLongString(message, 150)
+        old = timeit(lambda: legacySplitLongString(message, 150), repeat)
+        new = timeit(lambda: splitLongString(message, 150), repeat)
+        blob = "QUJD" * (size // 4) # a base64 blob without spaces, that the legacy version rejects
+        hardSplit = timeit(lambda: splitLongString(blob, 150), repeat)
+        print(f"{size} characters: legacy {old*1e3:.2f}ms, linear {new*1e3:.2f}ms ({old/new:.1f}x), single {size} characters word {hardSplit*1e3:.2f}ms")
+        assertFaster(new, old)
+
+
+class Test_Serializer:
+    def test_largePayload(self):
+        from json import dumps
+        payload = {"items": [{"id": i, "name": f"item {i}", "tags": ["a", "b"], "price": i * 1.5} for i in range(10_000)]}
+        old = timeit(lambda: dumps(payload, indent=4, cls=CustomJSONEncoder), 3)
+        results = {}
+        for backend in ['json', 'orjson'] if orjson is not None else ['json']:
+            limited = MessageSerializer(backend=backend)
+            unlimited = MessageSerializer(maxItems=10**9, maxSize=10**9, backend=backend)
+            results[backend] = timeit(lambda: limited.pretty(payload), 3)
+            results[backend + " unlimited"] = timeit(lambda: unlimited.pretty(payload), 3)
+        print(f"10k elements payload: dumps(indent=4, cls=CustomJSONEncoder) {old*1e3:.1f}ms, " + ", ".join(f"{name} {duration*1e3:.1f}ms" for name, duration in results.items()))
+        assertFaster(results['json'], old)
+
+
+class Test_Labels:
+    def test_processAndThread(self):
+        import threading
+        def legacy():
+            process = f" [{centerString(getExecutableFormatted(), 20)}]"
+            thread = f" [ {centerString(threading.current_thread().name, 30)} ]"
+            return process + thread
+        FILE = Target.Type.FILE # the records receive the target type
+        def cached():
+            return ProcessLabel.current().render(FILE) + ThreadLabel.current().render(FILE)
+        assert legacy() == cached()
+        old = timeit(legacy, 20000)
+        new = timeit(cached, 20000)
+        print(f"process and thread labels: legacy {old*1e9:.0f}ns, cached {new*1e9:.0f}ns ({old/new:.1f}x)")
+        assertFaster(new, old)
+
+
+class Test_LineTemplate:
+    def test_droppedFields(self):
+        FILE = Target.Type.FILE
+        template = LineTemplate("{levelName} {message}")
+        def default():
+            return LogRecord(LEVELS.INFO, "message", ("file.py", "func")).render(FILE)
+        def templated():
+            return LogRecord(LEVELS.INFO, "message", ("file.py", "func")).render(FILE, template=template)
+        assert templated() == "INFO message\n"
+        old = timeit(default, 20000)
+        new = timeit(templated, 20000)
+        print(f"record rendering: default layout {old*1e9:.0f}ns, template without time {new*1e9:.0f}ns ({old/new:.1f}x)")
+        assertFaster(new, old)
+
+
+class Test_Submit:
+    def test_eventLoopStall(self):
+        import time
+        Logger.reset()
+        Module.clear()
+        Logger.removeTarget("stdout")
+        def slow(line):
+            time.sleep(0.001) # an output waiting for the disk or the network
+        Logger.addTarget(slow)
+        def blocking():
+            info("message")
+        def submitted():
+            Logger.submit(LEVELS.INFO, "message")
+        old = timeit(blocking, 100)
+        new = timeit(submitted, 100)
+        Logger.flush()
+        Logger.reset()
+        print(f"event loop stall per line: info {old*1e6:.0f}us, Logger.submit {new*1e6:.0f}us ({old/new:.1f}x)")
+        assertFaster(new, old)
+
+
+def produce(worker : int, count : int):
+    for i in range(count):
+        info(f"worker {worker} line {i}")
+
+class Test_Hub:
+    @pytest.mark.parametrize("producers", [1, 2, 4, 8, 16, 32])
+    def test_throughput(self, producers):
+        count = 1000
+        Logger.reset()
+        Module.clear()
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = tmpdirname + "/test.log"
+            Logger.removeTarget("stdout")
+            Logger.addTarget(filepath)
+            Logger.startHub()
+            
+            context = multiprocessing.get_context('fork')
+            processes = [context.Process(target=produce, args=(worker, count)) for worker in range(producers)]
+            start = perf_counter()
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+            Logger.flush()
+            duration = perf_counter() - start
+            
+            with open(filepath, 'r') as f:
+                lines = f.read().splitlines()
+            Logger.reset()
+        print(f"{producers} producers: {len(lines)/duration:.0f} lines/s")
+        assert len(lines) == producers * count
+        assert all(re.match(r"\[.*\] \[   INFO   \] worker \d+ line \d+$", line) for line in lines)
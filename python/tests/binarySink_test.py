@@ -0,0 +1,165 @@
+import pytest
+
+import os
+import tempfile
+
+from gamuLogger.binarySink import BinarySink, readSegment, readLog, MAGIC #type: ignore
+from gamuLogger.binaryReader import render, renderEntry, main #type: ignore
+from gamuLogger.gamuLogger import Logger, info, error, message, LEVELS, FORMATS, Target, Module #type: ignore
+
+
+class Test_BinarySink:
+    def test_roundTrip(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = os.path.join(tmpdirname, "test.bin")
+            sink = BinarySink(filepath, 4096)
+            entries = [
+                (1, LEVELS.INFO.value, "module.sub", "file.py", "func", "héllo"),
+                (2, LEVELS.ERROR.value, "module.sub", "file.py", "func", "line1\nline2"),
+                (3, LEVELS.DEBUG.value, None, "other.py", "func2", ""),
+                (4, None, None, None, None, "raw message")
+            ]
+            for entry in entries:
+                sink(entry)
+            sink.flush()
+            assert list(readLog(filepath)) == entries # readable before the segment is closed
+            sink.close()
+            assert os.path.getsize(filepath + ".000001") < 4096 # cut to its used size
+            assert list(readLog(filepath)) == entries
+
+    def test_roll(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = os.path.join(tmpdirname, "test.bin")
+            sink = BinarySink(filepath, 256)
+            entries = [(i, LEVELS.INFO.value, "module", "file.py", "func", f"message {i}") for i in range(50)]
+            for entry in entries:
+                sink(entry)
+            sink.close()
+            segments = BinarySink.segments(filepath)
+            assert len(segments) > 1
+            for segment in segments:
+                assert os.path.getsize(segment) <= 256
+                assert next(readSegment(segment))[2] == "module" # every segment defines its modules and call sites
+            assert list(readLog(filepath)) == entries
+
+    def test_largeRecord(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = os.path.join(tmpdirname, "test.bin")
+            sink = BinarySink(filepath, 256)
+            entries = [(1, LEVELS.INFO.value, None, "file.py", "func", "small"), (2, LEVELS.INFO.value, None, "file.py", "func", "x" * 1000)]
+            for entry in entries:
+                sink(entry)
+            sink.close()
+            assert list(readLog(filepath)) == entries
+
+    def test_newSegmentOnRestart(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = os.path.join(tmpdirname, "test.bin")
+            sink = BinarySink(filepath, 4096)
+            sink((1, LEVELS.INFO.value, None, "file.py", "func", "first run"))
+            sink.close()
+            sink = BinarySink(filepath, 4096)
+            sink((2, LEVELS.INFO.value, None, "file.py", "func", "second run"))
+            sink.close()
+            assert [os.path.basename(path) for path in BinarySink.segments(filepath)] == ["test.bin.000001", "test.bin.000002"]
+            assert [entry[5] for entry in readLog(filepath)] == ["first run", "second run"]
+
+    def test_unclosedSegment(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = os.path.join(tmpdirname, "test.bin")
+            sink = BinarySink(filepath, 4096)
+            sink((1, LEVELS.INFO.value, None, "file.py", "func", "message"))
+            sink.flush()
+            # as left by a crash: the segment keeps its allocated size, the end is zeroed
+            assert os.path.getsize(filepath + ".000001") == 4096
+            assert [entry[5] for entry in readLog(filepath)] == ["message"]
+            sink.close()
+
+    def test_invalidSegment(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = os.path.join(tmpdirname, "test.bin.000001")
+            with open(filepath, 'wb') as f:
+                f.write(b"not a log")
+            with pytest.raises(ValueError):
+                list(readSegment(filepath))
+        assert MAGIC.startswith(b"GAMULOG")
+
+
+class Test_BinaryReader:
+    def test_sameAsText(self):
+        Logger.reset()
+        Module.clear()
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = os.path.join(tmpdirname, "test.bin")
+            lines = []
+            def textTarget(line):
+                lines.append(line)
+            Logger.addTarget(textTarget, LEVELS.DEBUG)
+            Logger.addTarget(Target.fromBinaryFile(filepath, "1M"), LEVELS.DEBUG)
+            Logger.addSensitiveData("secret")
+            Module.new("binary", __file__, "Test_BinaryReader.test_sameAsText")
+            info("first line\nsecond line with a secret")
+            error({"key": "value"})
+            message("raw message")
+            Module.clear()
+            info("without module")
+            Logger.reset()
+
+            rendered = list(render(filepath))
+            assert rendered[:2] + rendered[3:] == lines[:2] + lines[3:]
+            assert rendered[2] == "raw message\n"
+            assert "secret" not in ''.join(rendered)
+            assert rendered[0].startswith(lines[0][:21]) # same time
+
+    def test_main(self, capsys):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = os.path.join(tmpdirname, "test.bin")
+            sink = BinarySink(filepath, 4096)
+            sink((0, LEVELS.WARNING.value, "module", "file.py", "func", "message"))
+            sink.close()
+            main([filepath])
+            output = capsys.readouterr().out
+            assert output == renderEntry((0, LEVELS.WARNING.value, "module", "file.py", "func", "message"))
+            assert output.endswith(f"[ WARNING  ] [ {'module'.center(15)} ] message\n")
+
+    def test_config(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = os.path.join(tmpdirname, "test.bin")
+            target = Target.fromJson({"file": filepath, "format": "binary", "segmentSize": "64K", "name": "binaryJson"})
+            assert target["format"] == FORMATS.BINARY
+            assert isinstance(target.target, BinarySink)
+            assert target.target.segmentSize == 64 * 1024
+            target.close()
+            Target.unregister("binaryJson")
+
+    def test_configInvalidFormat(self):
+        import argparse
+        from xml.etree import ElementTree
+        Logger.reset()
+        pytest.raises(ValueError, Target.fromJson, {"terminal": "stdout", "format": "binary"})
+        pytest.raises(ValueError, Target.fromXml, ElementTree.fromstring('<target terminal="stdout" format="binary"/>'))
+        parser = argparse.ArgumentParser()
+        Logger.configArgParse(parser)
+        pytest.raises(ValueError, Logger.parseArgs, parser.parse_args(["--addTarget", "stdout", "info", "format=binary"]))
+        Logger.reset()
+
+    def test_noSyncPerError(self, monkeypatch):
+        Logger.reset()
+        calls = []
+        monkeypatch.setattr(BinarySink, "flush", lambda self: calls.append(self))
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = os.path.join(tmpdirname, "test.bin")
+            Logger.addTarget(Target.fromBinaryFile(filepath, "1M"))
+            for i in range(10):
+                error("failure %d", i)
+            assert calls == [] # no msync per ERROR record
+            Logger.flush()
+            assert len(calls) == 1
+            Logger.reset()
+            assert len(list(readLog(filepath))) == 10
+        
+    def test_setFormat(self):
+        Logger.reset()
+        Logger.addTarget(lambda line: None)
+        pytest.raises(ValueError, Logger.setFormat, "<lambda>", FORMATS.BINARY)
+        Logger.reset()
@@ -0,0 +1,83 @@
+import pytest
+
+import random
+import threading
+
+from gamuLogger.chronoStats import ChronoStats #type: ignore
+
+
+class Test_ChronoStats:
+    def test_empty(self):
+        stats = ChronoStats("empty")
+        assert stats.count == 0
+        assert stats.quantile(0.5) == 0
+        assert stats.toDict() == {"count": 0, "total": 0.0, "mean": 0.0, "min": 0.0, "max": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0}
+        
+    def test_add(self):
+        stats = ChronoStats("add")
+        for duration in (3000, 1000, 2000):
+            stats.add(duration)
+        assert stats.count == 3
+        assert stats.total == 6000
+        assert stats.min == 1000
+        assert stats.max == 3000
+        result = stats.toDict()
+        assert result["mean"] == pytest.approx(2e-6)
+        assert result["min"] == pytest.approx(1e-6)
+        
+    def test_smallValuesAreExact(self):
+        stats = ChronoStats("small")
+        for duration in range(10):
+            stats.add(duration)
+        assert stats.quantile(0.5) == 4
+        assert stats.quantile(1) == 9
+        
+    @pytest.mark.parametrize("q", [0.5, 0.9, 0.95, 0.99])
+    def test_quantileAccuracy(self, q):
+        rng = random.Random(42)
+        durations = [int(rng.lognormvariate(12, 1.5)) for _ in range(20000)]
+        stats = ChronoStats("accuracy")
+        for duration in durations:
+            stats.add(duration)
+        expected = sorted(durations)[int(q * len(durations)) - 1]
+        assert abs(stats.quantile(q) - expected) / expected < 1 / 16
+        
+    def test_reset(self):
+        stats = ChronoStats("reset")
+        stats.add(100)
+        stats.reset()
+        assert stats.count == 0
+        assert stats.quantile(0.99) == 0
+        
+    def test_threads(self):
+        stats = ChronoStats("threads")
+        def work():
+            for i in range(1000):
+                stats.add(i)
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert stats.count == 8000
+        assert stats.total == 8 * sum(range(1000))
+        
+    def test_registry(self):
+        ChronoStats.clear()
+        stats = ChronoStats.get("registry.function")
+        assert ChronoStats.get("registry.function") is stats
+        assert "registry.function" not in ChronoStats.all() # never called
+        stats.add(10)
+        assert ChronoStats.all(reset=True)["registry.function"]["count"] == 1
+        assert "registry.function" not in ChronoStats.all()
+        stats.add(10)
+        ChronoStats.clear()
+        assert ChronoStats.get("registry.function") is stats
+        assert stats.count == 0
+        
+    def test_reporter(self):
+        calls = threading.Semaphore(0)
+        ChronoStats.setReporter(0.01, calls.release)
+        assert calls.acquire(timeout=2)
+        assert calls.acquire(timeout=2)
+        ChronoStats.setReporter(0, None)
@@ -5,7 +5,7 @@ import tempfile
 
 from xml.etree import ElementTree as ET
 
-from gamuLogger.customTypes import COLORS, LEVELS, SENSITIVE_LEVELS, TERMINAL_TARGETS, Target, LoggerConfig #type: ignore
+from gamuLogger.customTypes import COLORS, LEVELS, SENSITIVE_LEVELS, FORMATS, TERMINAL_TARGETS, Target, LoggerConfig, Module #type: ignore
 
 class TempFile:
     def __enter__(self):
@@ -68,6 +68,16 @@ class Test_SENSITIVE_LEVELS:
         assert SENSITIVE_LEVELS.from_bool(True) == SENSITIVE_LEVELS.SHOW
         assert SENSITIVE_LEVELS.from_bool(False) == SENSITIVE_LEVELS.HIDE
         
+class Test_FORMATS:
+    def test_str(self):
+        assert str(FORMATS.TEXT) == 'text'
+        assert str(FORMATS.JSONL) == 'jsonl'
+        
+    def test_from_string(self):
+        assert FORMATS.from_string('text') == FORMATS.TEXT
+        assert FORMATS.from_string('JSONL') == FORMATS.JSONL
+        pytest.raises(ValueError, FORMATS.from_string, 'invalid')
+        
 class Test_TERMINAL_TARGETS:
     def test_str(self):
         assert str(TERMINAL_TARGETS.STDOUT) == 'stdout'
@@ -79,6 +89,55 @@ class Test_TERMINAL_TARGETS:
         pytest.raises(ValueError, TERMINAL_TARGETS.from_string, 'invalid')
         
         
+class Test_Module:
+    def test_new(self):
+        Module.clear()
+        module = Module.new("app", "file.py", "func")
+        sub = Module.new("app.sub", "file.py", "func.inner")
+        
+        assert Module.get("file.py", "func") is module
+        assert Module.getByName("app.sub") is sub
+        assert Module.existByName("app")
+        assert not Module.existByName("sub")
+        assert sub.getCompleteName() == "app.sub"
+        assert sub.getCompletePath() == ["app", "sub"]
+        assert Module.new("app", "file.py", "func") is module
+        pytest.raises(ValueError, Module.new, "app", "other.py", "func")
+        pytest.raises(ValueError, Module.new, "missing.sub", "other.py", "func")
+        Module.clear()
+        
+    def test_delete(self):
+        Module.clear()
+        Module.new("app", "file.py", "func")
+        Module.delete("file.py", "func")
+        assert not Module.exist("file.py", "func")
+        assert not Module.existByName("app")
+        pytest.raises(ValueError, Module.delete, "file.py", "func")
+        
+        Module.new("app", "file.py", "func")
+        Module.deleteByName("app")
+        assert not Module.exist("file.py", "func")
+        assert Module.find("file.py", "func") is None
+        pytest.raises(ValueError, Module.deleteByName, "app")
+        
+    def test_replace(self):
+        Module.clear()
+        Module.new("old", "file.py", "func")
+        Module.new("new", "file.py", "func")
+        assert not Module.existByName("old")
+        assert Module.get("file.py", "func").name == "new"
+        Module.clear()
+        assert not Module.existByName("new")
+        
+    def test_render(self):
+        Module.clear()
+        Module.new("app", "file.py", "func")
+        sub = Module.new("app.sub", "file.py", "func.inner")
+        assert sub.render(Target.Type.FILE) == f" [ {'app'.center(15)} ] [ {'sub'.center(15)} ]"
+        assert sub.render(Target.Type.TERMINAL) == f" [ {COLORS.BLUE}{'app'.center(15)}{COLORS.RESET} ] [ {COLORS.BLUE}{'sub'.center(15)}{COLORS.RESET} ]"
+        Module.clear()
+
+
 class Test_Target:    
     class Test_Type:
         def test_str(self):
@@ -136,6 +195,14 @@ class Test_Target:
         
         pytest.raises(ValueError, Target.fromJson, {"name": "noTarget"})
         
+    def test_fromJson_buffered(self):
+        with TempFile() as filepath:
+            target = Target.fromJson({"file": filepath, "bufferSize": 1024, "flushInterval": 0.5})
+            assert target.target.bufferSize == 1024
+            assert target.target.flushInterval == 0.5
+            target.close()
+            Target.clear()
+        
     def test_fromXml(self):
         with TempFile() as filepath:
             target = Target.fromXml(ET.fromstring(f"<target file='{filepath}'/>"))
@@ -148,6 +215,44 @@ class Test_Target:
         
         pytest.raises(ValueError, Target.fromXml, ET.fromstring("<target name='noTarget'/>"))
         
+    def test_fromJson_nonBlocking(self):
+        with TempFile() as filepath:
+            target = Target.fromJson({"file": filepath, "nonBlocking": True, "queueSize": 10, "overflowPolicy": "dropNewest"})
+            assert target.nonBlocking
+            target.close()
+            assert not target.nonBlocking
+            Target.clear()
+
+    def test_format(self):
+        with TempFile() as filepath:
+            target = Target.fromJson({"file": filepath})
+            assert target["format"] == FORMATS.TEXT
+            target = Target.fromJson({"file": filepath, "format": "jsonl"})
+            assert target["format"] == FORMATS.JSONL
+            target = Target.fromXml(ET.fromstring(f"<target file='{filepath}' format='jsonl'/>"))
+            assert target["format"] == FORMATS.JSONL
+            target.close()
+            Target.clear()
+
+    def test_filter(self):
+        target = Target.fromJson({"terminal": "stdout", "rateLimit": 10, "burst": 50})
+        assert target.filter.rateLimit == 10
+        assert target.filter.burst == 50
+        target = Target.fromXml(ET.fromstring("<target terminal='stdout' sampling='0.25'/>"))
+        assert target.filter.sampling == 0.25
+        assert target.filter.rateLimit == 0
+        target = Target.fromJson({"terminal": "stdout"})
+        assert target.filter is None
+        Target.clear()
+        
+    def test_fromXml_buffered(self):
+        with TempFile() as filepath:
+            target = Target.fromXml(ET.fromstring(f"<target file='{filepath}' bufferSize='1024' flushInterval='0.5'/>"))
+            assert target.target.bufferSize == 1024
+            assert target.target.flushInterval == 0.5
+            target.close()
+            Target.clear()
+        
 
 class Test_LoggerConfig:
     def test_fromJson(self):
@@ -167,7 +272,7 @@ class Test_LoggerConfig:
                 ],
             }, "config.json")
             
-            assert config.sensitiveDatas == ["password", "token"]
+            assert config.sensitiveDatas == ("password", "token")
             
             assert len(config.targets) == 2
             
@@ -197,7 +302,7 @@ class Test_LoggerConfig:
             </config>
             """), "config.xml")
             
-            assert config.sensitiveDatas == ["password", "token"]
+            assert config.sensitiveDatas == ("password", "token")
             
             assert len(config.targets) == 2
             
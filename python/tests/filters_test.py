@@ -0,0 +1,80 @@
+import pytest
+
+from time import sleep
+
+from gamuLogger.filters import TargetFilter #type: ignore
+
+
+class Test_TargetFilter:
+    def test_invalid(self):
+        pytest.raises(ValueError, TargetFilter, -1)
+        pytest.raises(ValueError, TargetFilter, sampling=1.5)
+        pytest.raises(ValueError, TargetFilter, 10, summaryInterval=0)
+        pytest.raises(ValueError, TargetFilter, dedup=True, dedupTimeout=0)
+        
+    def test_noLimit(self):
+        targetFilter = TargetFilter()
+        assert all(targetFilter.allow(("file.py", "func", 0), True) for _ in range(1000))
+        assert targetFilter.takeSuppressed() == {}
+        
+    def test_rateLimit(self):
+        targetFilter = TargetFilter(rateLimit=10, burst=5)
+        key = ("file.py", "func", 0)
+        results = [targetFilter.allow(key) for _ in range(100)]
+        assert results[:5] == [True] * 5
+        assert results.count(True) <= 6
+        suppressed = targetFilter.takeSuppressed()
+        assert suppressed[key] == 100 - results.count(True)
+        assert targetFilter.takeSuppressed() == {}
+        
+        sleep(0.25) # 2 tokens are back
+        assert targetFilter.allow(key)
+        assert targetFilter.allow(key)
+        
+    def test_rateLimitIsPerCallSite(self):
+        targetFilter = TargetFilter(rateLimit=1, burst=1)
+        assert targetFilter.allow(("file.py", "func1", 0))
+        assert not targetFilter.allow(("file.py", "func1", 0))
+        assert targetFilter.allow(("file.py", "func2", 0))
+        assert targetFilter.allow(("file.py", "func1", 1))
+        
+    def test_sampling(self):
+        targetFilter = TargetFilter(sampling=0.1)
+        kept = sum(targetFilter.allow(("file.py", "func", 0), True) for _ in range(10000))
+        assert 700 < kept < 1300
+        assert targetFilter.sampled == 10000 - kept
+        assert all(targetFilter.allow(("file.py", "func", 0), False) for _ in range(100)) # not sampled
+        assert targetFilter.takeSuppressed() == {} # the sampled lines are not reported
+        
+    def test_fromOptions(self):
+        assert TargetFilter.fromOptions({"file": "log.txt"}) is None
+        targetFilter = TargetFilter.fromOptions({"rateLimit": "5", "burst": "20", "sampling": "0.5", "summaryInterval": "1"})
+        assert targetFilter.rateLimit == 5
+        assert targetFilter.burst == 20
+        assert targetFilter.sampling == 0.5
+        assert targetFilter.summaryInterval == 1
+        assert TargetFilter.fromOptions({"rateLimit": 3}).burst == 3
+        assert TargetFilter.fromOptions({"dedup": "false"}) is None
+        targetFilter = TargetFilter.fromOptions({"dedup": True, "dedupTimeout": "2"})
+        assert targetFilter.dedup and targetFilter.dedupTimeout == 2
+        assert targetFilter.rateLimit == 0
+        
+    def test_deduplicate(self):
+        targetFilter = TargetFilter(dedup=True)
+        assert targetFilter.deduplicate("a", "siteA") == (None, 0)
+        assert targetFilter.deduplicate("a", "siteA") is None
+        assert targetFilter.deduplicate("a", "siteA") is None
+        assert targetFilter.deduplicate("b", "siteB") == ("siteA", 2)
+        assert targetFilter.deduplicate("a", "siteA") == ("siteB", 0)
+        
+    def test_takeRepeated(self):
+        targetFilter = TargetFilter(dedup=True, dedupTimeout=60)
+        targetFilter.deduplicate("a", "siteA")
+        assert targetFilter.takeRepeated() is None
+        targetFilter.deduplicate("a", "siteA")
+        targetFilter.deduplicate("a", "siteA")
+        assert targetFilter.takeRepeated() is None # the timeout is not over
+        assert targetFilter.takeReports(force=True) == [("siteA", "last message repeated 2 times")]
+        targetFilter.deduplicate("a", "siteA")
+        assert targetFilter.takeRepeated(force=True) == ("siteA", 1)
+        assert targetFilter.deduplicate("b", "siteB") == ("siteA", 0) # already reported
@@ -4,10 +4,24 @@ import sys
 import os
 import re
 import tempfile
+import json
+import subprocess
 from time import sleep
 
 from gamuLogger.gamuLogger import Logger, deepDebug, debug, info, warning, error, critical, message, deepDebugFunc
-from gamuLogger.gamuLogger import debugFunc, chrono, LEVELS, TERMINAL_TARGETS, SENSITIVE_LEVELS, Module #type: ignore
+from gamuLogger.gamuLogger import debugFunc, chrono, LEVELS, TERMINAL_TARGETS, SENSITIVE_LEVELS, FORMATS, Module, Target #type: ignore
+import gamuLogger
+
+
+def runUntilExit(script : str, logpath : str) -> list[str]:
+    """
+    Run the script in a new interpreter, and return the lines it left in `logpath` once exited
+    """
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(gamuLogger.__file__)))
+    subprocess.run([sys.executable, "-c", script, logpath], env=env, check=True, capture_output=True, timeout=30)
+    with open(logpath, 'r') as f:
+        return f.readlines()
+
 
 class Test_Logger:
     def test_deepDebug(self, capsys):
@@ -291,4 +305,474 @@ class Test_Logger:
         
         args = parser.parse_args([])
         Logger.parseArgs(args)
-        
\ No newline at end of file
+                
+    def test_isEnabledFor(self):
+        Logger.reset()
+        Module.clear()
+        
+        assert Logger.isEnabledFor(LEVELS.INFO)
+        assert not Logger.isEnabledFor(LEVELS.DEBUG)
+        
+        out = []
+        def debugTarget(message):
+            out.append(message)
+            
+        Logger.addTarget(debugTarget, LEVELS.DEBUG)
+        assert Logger.isEnabledFor(LEVELS.DEBUG)
+        assert not Logger.isEnabledFor(LEVELS.DEEP_DEBUG)
+        
+        Logger.setLevel("stdout", LEVELS.DEEP_DEBUG)
+        assert Logger.isEnabledFor(LEVELS.DEEP_DEBUG)
+        
+        Logger.setLevel("stdout", LEVELS.ERROR)
+        Logger.removeTarget("debugTarget")
+        assert not Logger.isEnabledFor(LEVELS.WARNING)
+        assert Logger.isEnabledFor(LEVELS.ERROR)
+        
+        Logger.reset()
+        assert Logger.isEnabledFor(LEVELS.INFO)
+        assert not Logger.isEnabledFor(LEVELS.DEBUG)
+        
+    def test_levelSetOnTarget(self):
+        Logger.reset()
+        Module.clear()
+        
+        out = []
+        def customFunction(message):
+            out.append(message)
+        Logger.addTarget(customFunction)
+        Target.get("customFunction")["level"] = LEVELS.DEBUG # without Logger.setLevel
+        assert Logger.isEnabledFor(LEVELS.DEBUG)
+        debug("debug line")
+        assert len(out) == 1 and out[0].endswith("debug line\n")
+        Target.get("customFunction")["level"] = LEVELS.WARNING
+        assert not Logger.isEnabledFor(LEVELS.DEBUG)
+        Logger.reset()
+        
+    def test_disabledLevelSkipsCallerInfo(self, monkeypatch):
+        import gamuLogger.gamuLogger as module
+        Logger.reset()
+        Module.clear()
+        
+        def fail():
+            raise AssertionError("caller info should not be resolved for a disabled level")
+        monkeypatch.setattr(module, "getCallerInfo", fail)
+        
+        debug("This message is disabled")
+        deepDebug("This message is disabled")
+        Logger.debug("This message is disabled")
+
+    def test_sensitiveSharedBetweenTargets(self, monkeypatch):
+        Logger.reset()
+        Module.clear()
+        
+        out1, out2 = [], []
+        def target1(message):
+            out1.append(message)
+        def target2(message):
+            out2.append(message)
+        Logger.addTarget(target1)
+        Logger.addTarget(target2)
+        Logger.addSensitiveData("secret")
+        
+        calls = []
+        redact = Logger().config.redact
+        def countingRedact(message):
+            calls.append(message)
+            return redact(message)
+        monkeypatch.setattr(Logger().config, "redact", countingRedact)
+        
+        info("This is a secret")
+        
+        assert out1 == out2
+        assert "secret" not in out1[0]
+        assert len(calls) == 2 # once for the terminal, once for both file targets
+
+    def test_setTimePrecision(self):
+        Logger.reset()
+        Module.clear()
+        
+        out = []
+        def customFunction(message):
+            out.append(message)
+        Logger.addTarget(customFunction)
+        
+        Logger.setTimePrecision(3)
+        info("This is a message")
+        Logger.setTimePrecision(6)
+        info("This is a message")
+        Logger.setTimePrecision(0)
+        
+        assert re.match(r"\[\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{3}\] \[   INFO   \] This is a message", out[0])
+        assert re.match(r"\[\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{6}\] \[   INFO   \] This is a message", out[1])
+        pytest.raises(ValueError, Logger.setTimePrecision, 2)
+
+    def test_parseArgs_timePrecision(self):
+        import argparse
+        Logger.reset()
+        Module.clear()
+        
+        parser = argparse.ArgumentParser()
+        Logger.configArgParse(parser)
+        Logger.parseArgs(parser.parse_args(["--timePrecision", "3"]))
+        assert Logger().config['timePrecision'] == 3
+        Logger().config['timePrecision'] = 0
+
+    def test_setFormat(self):
+        Logger.reset()
+        Module.clear()
+        
+        out = []
+        def customFunction(message):
+            out.append(message)
+        Logger.addTarget(customFunction)
+        Logger.addSensitiveData("secret")
+        Logger.setFormat("customFunction", FORMATS.JSONL)
+        
+        info({"password": "secret", "user": "me"})
+        message("raw message")
+        
+        data = json.loads(out[0])
+        assert data["level"] == "INFO"
+        assert data["message"] == {"password": "******", "user": "me"}
+        assert data["function"] == "Test_Logger.test_setFormat"
+        assert json.loads(out[1]) == {"message": "raw message"}
+        pytest.raises(ValueError, Logger.setFormat, "notATarget", FORMATS.JSONL)
+        Logger.reset()
+
+    def test_jsonlRedactedBeforeEncoding(self):
+        Logger.reset()
+        Module.clear()
+        
+        out = []
+        def customFunction(message):
+            out.append(message)
+        Logger.addTarget(customFunction)
+        Logger.setFormat("customFunction", FORMATS.JSONL)
+        for data in ('pa"ss\\wd', 'tab\tsecret', 'new\nline\x01', 'level'):
+            Logger.addSensitiveData(data)
+        
+        info('token pa"ss\\wd and tab\tsecret, new\nline\x01')
+        info({'key pa"ss\\wd': ['tab\tsecret']})
+        
+        line = json.loads(out[0])
+        assert line["message"] == f"token {'*' * 8} and {'*' * 10}, {'*' * 9}"
+        assert line["level"] == "INFO" # the field names are not redacted
+        assert json.loads(out[1])["message"] == {f"key {'*' * 8}": ['*' * 10]}
+        assert 'wd' not in out[0] + out[1] and 'secret' not in out[0] + out[1]
+        Logger.reset()
+
+    def test_lazyMessage(self):
+        Logger.reset()
+        Module.clear()
+        
+        out1, out2 = [], []
+        def target1(message):
+            out1.append(message)
+        def target2(message):
+            out2.append(message)
+        Logger.addTarget(target1)
+        Logger.addTarget(target2, LEVELS.DEBUG)
+        
+        calls = []
+        def build():
+            calls.append(1)
+            return "expensive message"
+        
+        deepDebug(build)
+        Logger.deepDebug(build)
+        assert calls == []
+        
+        debug(build)
+        assert calls == [1] # evaluated once, but only target2 prints it
+        assert out1 == []
+        assert out2[0].endswith("expensive message\n")
+        
+        info(lambda: {"key": "value"})
+        assert '"key": "value"' in out1[0] and out1[0] == out2[1]
+        
+    def test_formatArgs(self):
+        Logger.reset()
+        Module.clear()
+        
+        out = []
+        def customFunction(message):
+            out.append(message)
+        Logger.addTarget(customFunction)
+        
+        class Counting:
+            count = 0
+            def __str__(self):
+                Counting.count += 1
+                return "counting"
+        
+        debug("state: %s", Counting())
+        assert Counting.count == 0
+        
+        info("state: %s, %d", Counting(), 42)
+        Logger.warning("%(name)s is %(value)d", {"name": "x", "value": 3})
+        error("100% sure") # no argument: not formatted
+        assert Counting.count == 1
+        assert out[0].endswith("] state: counting, 42\n")
+        assert out[1].endswith("] x is 3\n")
+        assert out[2].endswith("] 100% sure\n")
+        
+        info("value %d", "x") # a wrong log statement does not raise
+        assert "<format error: TypeError" in out[3] and "value %d ('x',)" in out[3]
+
+    def test_legacyCallerInfo(self):
+        Logger.reset()
+        Module.clear()
+
+        out = []
+        def customFunction(message):
+            out.append(message)
+        Logger.addTarget(customFunction)
+        Logger.setTemplate(customFunction.__name__, "{file}:{function} {message}")
+
+        with pytest.deprecated_call():
+            Logger.info("message", ("file.py", "function"))
+        Logger.info("pair: %s", ("a", "b")) # consumed by the format: an argument
+        Logger.info("pair: %s, %s", "a", "b", callerInfo=("file.py", "function"))
+        assert out[0] == "file.py:function message\n"
+        assert out[1].endswith(" pair: ('a', 'b')\n") and not out[1].startswith("file.py")
+        assert out[2] == "file.py:function pair: a, b\n"
+        Logger.reset()
+
+    def test_debugFuncIsLazy(self):
+        Logger.reset()
+        Module.clear()
+        
+        class Counting:
+            count = 0
+            def __repr__(self):
+                Counting.count += 1
+                return "counting"
+            
+        @debugFunc()
+        def function(value):
+            return value
+        
+        function(Counting())
+        assert Counting.count == 0
+
+    def test_decoratorsWhenDisabled(self, capsys):
+        Logger.reset()
+        Module.clear()
+        
+        @debugFunc(True)
+        def failing(value):
+            """documentation"""
+            raise ValueError(value)
+        
+        @chrono
+        def function():
+            return 42
+        
+        assert failing.__name__ == "failing"
+        assert failing.__doc__ == "documentation"
+        assert function() == 42
+        pytest.raises(ValueError, failing, "wrong")
+        result = capsys.readouterr().out
+        assert "DEBUG" not in result
+        assert "An error occurred in function failing: ValueError - wrong" in result
+
+    def test_chronoStats(self, capsys):
+        Logger.reset()
+        Module.clear()
+        
+        @chrono(stats=True)
+        def function(value):
+            return value
+        
+        Logger.chronoStats(reset=True)
+        for i in range(100):
+            assert function(i) == i
+        assert function.__name__ == "function"
+        
+        stats = Logger.chronoStats()
+        name = f"{__name__}.Test_Logger.test_chronoStats.<locals>.function"
+        assert stats[name]["count"] == 100
+        assert 0 < stats[name]["min"] <= stats[name]["p50"] <= stats[name]["p99"] <= stats[name]["max"]
+        assert capsys.readouterr().out == "" # nothing printed for each call
+        
+        Logger.chronoSummary(reset=True)
+        result = capsys.readouterr().out
+        assert "   INFO   " in result and name in result and '"count": 100' in result
+        assert Logger.chronoStats() == {}
+        
+        Logger.chronoSummary() # nothing to report
+        assert capsys.readouterr().out == ""
+        
+    def test_chronoSummaryInterval(self):
+        Logger.reset()
+        Module.clear()
+        
+        out = []
+        def customFunction(message):
+            out.append(message)
+        Logger.addTarget(customFunction)
+        
+        @chrono(stats=True)
+        def function():
+            pass
+        
+        function()
+        Logger.setChronoSummaryInterval(0.05)
+        for _ in range(100):
+            if out:
+                break
+            sleep(0.01)
+        Logger.setChronoSummaryInterval(0)
+        assert '"count": 1' in out[0]
+        Logger.reset()
+
+    def test_rateLimit(self):
+        Logger.reset()
+        Module.clear()
+        
+        out = []
+        def customFunction(message):
+            out.append(message)
+        Logger.addTarget(customFunction)
+        Logger.setRateLimit("customFunction", 1, burst=3)
+        
+        for i in range(100):
+            error("storm %d", i)
+        warning("another call site")
+        Logger.flush() # reports the suppressed lines
+        
+        assert len(out) == 5
+        assert out[0].endswith("] storm 0\n")
+        assert out[2].endswith("] storm 2\n")
+        assert out[3].endswith("] another call site\n")
+        assert "[  ERROR   ]" in out[4] and out[4].endswith("] 97 similar messages suppressed\n")
+        Logger.reset()
+
+    @pytest.mark.skipif(not hasattr(os, 'fork'), reason="requires os.fork")
+    def test_fork(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = os.path.join(tmpdirname, "test.log")
+            Logger.reset()
+            Logger.addTarget(filepath)
+            Logger.setNonBlocking(filepath)
+            Logger.setDedup(filepath)
+            Logger.setTemplate(filepath, "{pid} {message}")
+            info("parent")
+            pid = os.fork()
+            if pid == 0: # every piece was reset by the fork hook: the writer thread runs again, and the child has its own label
+                try:
+                    info("child")
+                    info("child")
+                    Logger.flush()
+                finally:
+                    os._exit(0)
+            os.waitpid(pid, 0)
+            Logger.reset()
+            with open(filepath, 'r') as f:
+                lines = f.readlines()
+            assert lines[0] == f"{os.getpid()} parent\n"
+            assert lines[1:] == [f"{pid} child\n", f"{pid} last message repeated 1 times\n"]
+
+    def test_rateLimitReportedAtExit(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            lines = runUntilExit(
+                "import sys\n"
+                "from gamuLogger import Logger, error\n"
+                "Logger.addTarget(sys.argv[1])\n"
+                "Logger.setRateLimit(sys.argv[1], 1, burst=3)\n"
+                "for i in range(100):\n"
+                "    error('storm %d', i)\n",
+                os.path.join(tmpdirname, "test.log")
+            )
+            assert len(lines) == 4
+            assert lines[3].endswith("] 97 similar messages suppressed\n")
+        
+    def test_sampling(self):
+        Logger.reset()
+        Module.clear()
+        
+        out = []
+        def customFunction(message):
+            out.append(message)
+        Logger.addTarget(customFunction, LEVELS.DEBUG)
+        Logger.setSampling("customFunction", 0)
+        
+        debug("sampled")
+        info("sampled")
+        warning("kept")
+        assert len(out) == 1 and out[0].endswith("] kept\n")
+        pytest.raises(ValueError, Logger.setSampling, "customFunction", 2)
+        Logger.reset()
+        
+    def test_parseArgs_rateLimit(self):
+        import argparse
+        from gamuLogger.customTypes import Target #type: ignore
+        Logger.reset()
+        Module.clear()
+        
+        parser = argparse.ArgumentParser()
+        Logger.configArgParse(parser)
+        Logger.parseArgs(parser.parse_args(["--addTarget", "stdout", "info", "rateLimit=10", "sampling=0.5"]))
+        targetFilter = Target.get("stdout").filter
+        assert targetFilter.rateLimit == 10
+        assert targetFilter.sampling == 0.5
+        Logger.reset()
+
+    def test_dedup(self):
+        Logger.reset()
+        Module.clear()
+        
+        out = []
+        def customFunction(message):
+            out.append(message)
+        Logger.addTarget(customFunction)
+        Logger.setDedup("customFunction")
+        
+        for _ in range(50):
+            info("same message")
+        info("other message")
+        info("other message")
+        warning("other message") # another level
+        Logger.flush() # reports the repeats held back
+        
+        assert len(out) == 5
+        assert out[0].endswith("] same message\n")
+        assert out[1].endswith("] last message repeated 49 times\n")
+        assert out[2].endswith("] other message\n")
+        assert "INFO" in out[3] and out[3].endswith("] last message repeated 1 times\n")
+        assert "WARNING" in out[4] and out[4].endswith("] other message\n")
+        Logger.reset()
+        
+    def test_dedupTimeout(self):
+        Logger.reset()
+        Module.clear()
+        
+        out = []
+        def customFunction(message):
+            out.append(message)
+        Logger.addTarget(customFunction)
+        Logger.setDedup("customFunction", timeout=0.05)
+        
+        for _ in range(3):
+            info("same message")
+        for _ in range(100):
+            if len(out) == 2:
+                break
+            sleep(0.01)
+        assert out[1].endswith("] last message repeated 2 times\n")
+        Logger.reset()
+
+    def test_dedupReportedAtExit(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            lines = runUntilExit(
+                "import sys\n"
+                "from gamuLogger import Logger, info\n"
+                "Logger.addTarget(sys.argv[1])\n"
+                "Logger.setDedup(sys.argv[1])\n"
+                "for _ in range(10):\n"
+                "    info('same message')\n",
+                os.path.join(tmpdirname, "test.log")
+            )
+            assert len(lines) == 2
+            assert lines[1].endswith("] last message repeated 9 times\n")
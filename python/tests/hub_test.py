@@ -0,0 +1,113 @@
+import pytest
+
+import os
+import re
+import signal
+import tempfile
+import multiprocessing
+
+from gamuLogger.gamuLogger import Logger, info, error, LEVELS, FORMATS, Module #type: ignore
+from gamuLogger.customTypes import Target #type: ignore
+
+LINE = re.compile(r"\[\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\] \[   INFO   \] worker \d+ line \d+ x{100}$")
+
+
+def work(worker : int, count : int):
+    for i in range(count):
+        info(f"worker {worker} line {i} " + "x" * 100)
+
+def crash(worker : int, count : int):
+    work(worker, count)
+    Logger.flush()
+    os.kill(os.getpid(), signal.SIGKILL)
+
+def spawnedWork(address, authkey, worker : int, count : int):
+    Logger.connectHub(address, authkey)
+    work(worker, count)
+    info("my password is secret")
+    error({"worker": worker})
+
+def run(target, *argsList, method : str = 'fork'):
+    context = multiprocessing.get_context(method)
+    processes = [context.Process(target=target, args=args) for args in argsList]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    return processes
+
+def hubFile(tmpdirname : str) -> str:
+    Logger.reset()
+    Module.clear()
+    filepath = tmpdirname + "/test.log"
+    Logger.removeTarget("stdout")
+    Logger.addTarget(filepath, LEVELS.INFO)
+    return filepath
+
+def read(filepath : str) -> list[str]:
+    Logger.flush()
+    with open(filepath, 'r') as f:
+        return f.read().splitlines()
+
+
+class Test_Hub:
+    def test_forkedWorkers(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = hubFile(tmpdirname)
+            Logger.startHub()
+            run(work, *[(worker, 500) for worker in range(4)])
+            lines = read(filepath)
+            Logger.reset()
+            
+        assert len(lines) == 2000
+        assert all(LINE.match(line) for line in lines)
+        for worker in range(4): # the lines of a worker keep their order
+            numbers = [int(line.split()[-2]) for line in lines if f"worker {worker} " in line]
+            assert numbers == list(range(500))
+            
+    def test_spawnedWorker(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = hubFile(tmpdirname)
+            Logger.addSensitiveData("secret")
+            Logger.setFormat(filepath, FORMATS.JSONL)
+            address, authkey = Logger.startHub()
+            run(spawnedWork, (address, authkey, 0, 10), method='spawn')
+            lines = read(filepath)
+            Logger.reset()
+            
+        assert len(lines) == 12
+        assert '"message":"my password is ******"' in lines[10]
+        assert '"level":"ERROR"' in lines[11] and '"message":{"worker":0}' in lines[11]
+        
+    def test_workerCrash(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = hubFile(tmpdirname)
+            Logger.startHub()
+            crashed, = run(crash, (0, 100))
+            run(work, (1, 100))
+            lines = read(filepath)
+            Logger.reset()
+        
+        assert crashed.exitcode == -signal.SIGKILL
+        assert len(lines) == 200
+        assert all(LINE.match(line) for line in lines)
+        
+    def test_levelIsFilteredByWorkers(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = hubFile(tmpdirname)
+            Logger.setLevel(filepath, LEVELS.ERROR)
+            run(spawnedWork, (*Logger.startHub(), 0, 10), method='spawn')
+            lines = read(filepath)
+            Logger.reset()
+            
+        assert len(lines) == 3 # the dict is indented on 3 lines
+        assert "[  ERROR   ]" in lines[0]
+        
+    def test_stopHub(self):
+        Logger.reset()
+        address, authkey = Logger.startHub()
+        assert Logger.startHub() == (address, authkey)
+        Logger.stopHub()
+        with pytest.raises(OSError):
+            Logger.connectHub(address, authkey)
+        Logger.reset()
@@ -0,0 +1,95 @@
+import pytest
+
+import os
+import json
+import threading
+
+from gamuLogger.labels import ProcessLabel, ThreadLabel #type: ignore
+from gamuLogger.logRecord import LogRecord #type: ignore
+from gamuLogger.utils import getExecutableFormatted #type: ignore
+from gamuLogger.customTypes import LEVELS, FORMATS, Target, Module #type: ignore
+from gamuLogger.gamuLogger import Logger, info #type: ignore
+
+
+class Test_ProcessLabel:
+    def test_render(self):
+        label = ProcessLabel.current()
+        assert ProcessLabel.current() is label
+        assert label.name == getExecutableFormatted()
+        assert label.render(Target.Type.FILE) == f" [{getExecutableFormatted().center(20)}]"
+        assert label.render(Target.Type.FILE) is label.render(Target.Type.FILE)
+        assert label.render(Target.Type.FILE, False, True) == f" [{str(os.getpid()).center(20)}]"
+        assert label.render(Target.Type.FILE, True, True) == f" [{f'{label.name}:{os.getpid()}'.center(20)}]"
+        assert "\033[" in label.render(Target.Type.TERMINAL)
+
+    @pytest.mark.skipif(not hasattr(os, 'fork'), reason="requires os.fork")
+    def test_afterFork(self):
+        parent = ProcessLabel.current()
+        read, write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            label = ProcessLabel.current()
+            os.write(write, f"{label.pid} {label is parent} {ThreadLabel.current().nativeId}".encode())
+            os._exit(0)
+        os.waitpid(pid, 0)
+        childPid, same, childTid = os.read(read, 100).decode().split()
+        os.close(read)
+        os.close(write)
+        assert int(childPid) == pid
+        assert same == "False"
+        assert int(childTid) != ThreadLabel.current().nativeId
+
+
+class Test_ThreadLabel:
+    def test_perThread(self):
+        labels = {}
+        def run():
+            labels['thread'] = ThreadLabel.current()
+            labels['again'] = ThreadLabel.current()
+        thread = threading.Thread(target=run, name="worker")
+        thread.start()
+        thread.join()
+        assert labels['thread'] is labels['again']
+        assert labels['thread'].name == "worker"
+        assert labels['thread'].nativeId != ThreadLabel.current().nativeId
+        assert labels['thread'].render(Target.Type.FILE) == f" [ {'worker'.center(30)} ]"
+        assert labels['thread'].render(Target.Type.FILE, False, True) == f" [ {str(labels['thread'].nativeId).center(30)} ]"
+
+    def test_rename(self):
+        labels = []
+        def run():
+            labels.append(ThreadLabel.current())
+            threading.current_thread().name = "renamed"
+            labels.append(ThreadLabel.current())
+        thread = threading.Thread(target=run, name="original")
+        thread.start()
+        thread.join()
+        assert labels[0].name == "original"
+        assert labels[1].name == "renamed"
+
+
+class Test_LogRecord:
+    def test_ids(self):
+        Module.clear()
+        record = LogRecord(LEVELS.INFO, "message", ("file.py", "func"), showProcessId=True, showThreadId=True)
+        line = record.render(Target.Type.FILE)
+        assert f" [{str(os.getpid()).center(20)}] [ {str(threading.get_native_id()).center(30)} ] [   INFO   ] message\n" in line
+        data = json.loads(record.render(Target.Type.FILE, FORMATS.JSONL))
+        assert data["pid"] == os.getpid()
+        assert data["tid"] == threading.get_native_id()
+        assert "pid" not in json.loads(LogRecord(LEVELS.INFO, "message", ("file.py", "func")).renderJson())
+
+    def test_logger(self):
+        Logger.reset()
+        Module.clear()
+        lines = []
+        def target(line):
+            lines.append(line)
+        Logger.addTarget(target)
+        Logger.showProcessName()
+        Logger.showProcessId()
+        Logger.showThreadId()
+        info("message")
+        assert f" [{f'{getExecutableFormatted()}:{os.getpid()}'.center(20)}] [ {str(threading.get_native_id()).center(30)} ] [   INFO   ] message\n" in lines[0]
+        Logger.reset()
+        assert not Logger().config['showProcessId'] and not Logger().config['showThreadId']
@@ -0,0 +1,98 @@
+import pytest
+
+import os
+import json
+import tempfile
+import threading
+from xml.etree import ElementTree
+
+from gamuLogger.lineTemplate import LineTemplate #type: ignore
+from gamuLogger.logRecord import LogRecord #type: ignore
+from gamuLogger.customTypes import LEVELS, SENSITIVE_LEVELS, Target, Module, LoggerConfig #type: ignore
+from gamuLogger.gamuLogger import Logger, info, error #type: ignore
+
+
+class Test_LineTemplate:
+    def test_parse(self):
+        template = LineTemplate("{time} [{level}] {{raw}} {message}")
+        assert template.segments == [("", "time", ""), (" [", "level", ""), ("] {raw} ", "message", "")]
+        assert template.tail == "\n"
+        assert template.fields == {"time", "level", "message"}
+
+    def test_invalid(self):
+        pytest.raises(ValueError, LineTemplate, "{unknown}")
+        pytest.raises(ValueError, LineTemplate, "{}")
+        pytest.raises(ValueError, LineTemplate, "{level!r}")
+        pytest.raises(ValueError, LineTemplate, "{message:<10}")
+        pytest.raises(ValueError, LineTemplate, "{level")
+
+    def test_render(self):
+        Module.clear()
+        record = LogRecord(LEVELS.WARNING, "first\nsecond", ("file.py", "func"))
+        line = record.render(Target.Type.FILE, template=LineTemplate("{levelName:<8}|{file}:{function}| {message}"))
+        assert line == "WARNING |file.py:func| first\n" + " " * 21 + "| second\n"
+        line = record.render(Target.Type.FILE, template=LineTemplate("[{time}] [{level}] {message}"))
+        assert line == record.render(Target.Type.FILE) # same as the default layout without module
+        assert LineTemplate("no field").compile({}, False)(record) == "no field\n"
+
+    def test_colors(self):
+        template = LineTemplate("[{level}] {message}")
+        record = LogRecord(LEVELS.ERROR, "first\nsecond", ("file.py", "func"))
+        line = record.render(Target.Type.TERMINAL, template=template)
+        assert line.startswith(f"[{LEVELS.ERROR.color()}{LEVELS.ERROR}")
+        assert line.endswith("first\n" + " " * 11 + "| second\n") # the colors take no width
+        assert template.compile({}, True) is template.compile({}, True) # compiled once
+
+    def test_fields(self):
+        Module.clear()
+        Module.new("api", "file.py", "func")
+        Module.new("api.auth", "file.py", "func")
+        record = LogRecord(LEVELS.INFO, "message", ("file.py", "func"))
+        line = record.render(Target.Type.FILE, template=LineTemplate("{module} {process} {pid} {thread} {tid} {message}"))
+        parts = line.split(" ")
+        assert parts[0] == "api.auth"
+        assert str(os.getpid()) in parts
+        assert threading.current_thread().name in line
+        assert str(threading.get_native_id()) in parts
+        Module.clear()
+
+    def test_lazyTime(self):
+        record = LogRecord(LEVELS.INFO, "message", ("file.py", "func"))
+        record.render(Target.Type.FILE, template=LineTemplate("{message}"))
+        assert record._LogRecord__time is None # never computed
+
+
+class Test_Logger:
+    def test_setTemplate(self):
+        Logger.reset()
+        Module.clear()
+        lines = []
+        def target(line):
+            lines.append(line)
+        Logger.addTarget(target, LEVELS.INFO, SENSITIVE_LEVELS.SHOW)
+        Logger.setTemplate(target.__name__, "[{levelName}] {message}")
+        info("message")
+        Logger.setTemplate(target.__name__, None)
+        error("message")
+        assert lines[-2] == "[INFO] message\n"
+        assert lines[-1].endswith(f"[{LEVELS.ERROR}] message\n")
+        pytest.raises(ValueError, Logger.setTemplate, target.__name__, "{unknown}")
+        pytest.raises(ValueError, Logger.setTemplate, "missing", "{message}")
+        Logger.reset()
+
+    def test_config(self):
+        Logger.reset()
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = os.path.join(tmpdirname, "config.json")
+            logpath = os.path.join(tmpdirname, "test.log")
+            with open(filepath, 'w') as f:
+                json.dump({"targets": [{"file": logpath, "template": "{levelName} {message}"}]}, f)
+            Logger.setConfigFile(filepath)
+            info("from json")
+            Logger.reset()
+            with open(logpath, 'r') as f:
+                assert f.read() == "INFO from json\n"
+
+        config = LoggerConfig.fromXml(ElementTree.fromstring('<config><targets><target terminal="stdout" template="{level} {message}"/></targets></config>'), "config.xml")
+        assert config['targets'][0]["template"].source == "{level} {message}"
+        Logger.reset()
@@ -0,0 +1,123 @@
+import pytest
+
+import re
+import json
+from functools import partial
+
+from gamuLogger.logRecord import LogRecord, resolveMessage #type: ignore
+from gamuLogger.customTypes import LEVELS, FORMATS, Target, Module #type: ignore
+import gamuLogger.logRecord as logRecordModule #type: ignore
+
+
+class Test_LogRecord:
+    def test_render_file(self):
+        Module.clear()
+        record = LogRecord(LEVELS.INFO, "This is a message", ("file.py", "func"))
+        assert re.match(r"\[\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\] \[   INFO   \] This is a message\n$", record.render(Target.Type.FILE))
+        
+    def test_render_terminal(self):
+        Module.clear()
+        record = LogRecord(LEVELS.WARNING, "This is a message", ("file.py", "func"))
+        result = record.render(Target.Type.TERMINAL)
+        assert "\033[" in result
+        assert re.match(r"\[.*\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}.*\] \[.* WARNING  .*\] This is a message\n$", result)
+        
+    def test_render_module(self):
+        Module.clear()
+        Module.new("test", "file.py", "func")
+        record = LogRecord(LEVELS.INFO, "line1\nline2", ("file.py", "func"))
+        assert record.render(Target.Type.FILE).endswith(f"[   INFO   ] [ {'test'.center(15)} ] line1\n" + " " * 53 + "| line2\n")
+        Module.clear()
+        
+    @pytest.mark.parametrize("precision", [0, 3, 6])
+    def test_render_continuationAligned(self, precision):
+        Module.clear()
+        Module.new("api", "file.py", "func")
+        Module.new("api.auth", "file.py", "func")
+        record = LogRecord(LEVELS.INFO, "line1\nline2", ("file.py", "func"), showThreadsName=True, timePrecision=precision)
+        first, second = record.render(Target.Type.FILE).splitlines()
+        assert second.index("| ") + 2 == first.index("line1") # the next lines start under the message
+        first, second = re.sub("\033\\[[0-9;]*m", "", record.render(Target.Type.TERMINAL)).splitlines()
+        assert second.index("| ") + 2 == first.index("line1")
+        Module.clear()
+        
+    def test_render_processAndThread(self):
+        Module.clear()
+        record = LogRecord(LEVELS.INFO, "This is a message", ("file.py", "func"), showProcessName=True, showThreadsName=True)
+        assert record.render(Target.Type.FILE).endswith(f"] [ {'MainThread'.center(30)} ] [   INFO   ] This is a message\n")
+        
+    def test_render_isCached(self, monkeypatch):
+        Module.clear()
+        calls = []
+        pretty = logRecordModule.SERIALIZER.pretty
+        def countingPretty(*args, **kwargs):
+            calls.append(args)
+            return pretty(*args, **kwargs)
+        monkeypatch.setattr(logRecordModule.SERIALIZER, "pretty", countingPretty)
+        
+        record = LogRecord(LEVELS.INFO, {"key": "value"}, ("file.py", "func"))
+        first = record.render(Target.Type.FILE)
+        assert record.render(Target.Type.FILE) is first
+        record.render(Target.Type.TERMINAL)
+        assert len(calls) == 1
+
+    def test_renderJson(self):
+        Module.clear()
+        Module.new("test", "file.py", "func")
+        record = LogRecord(LEVELS.WARNING, {"key": [1, 2], "text": "line1\nline2"}, ("file.py", "func"))
+        line = record.render(Target.Type.TERMINAL, FORMATS.JSONL)
+        assert line.endswith("}\n") and line.count("\n") == 1
+        assert "\033[" not in line and ", " not in line
+        data = json.loads(line)
+        assert data["level"] == "WARNING"
+        assert data["module"] == "test"
+        assert data["file"] == "file.py"
+        assert data["function"] == "func"
+        assert data["thread"] == "MainThread"
+        assert data["message"] == {"key": [1, 2], "text": "line1\nline2"}
+        assert re.match(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$", data["time"])
+        assert record.render(Target.Type.FILE, FORMATS.JSONL) is line
+        Module.clear()
+
+    def test_lazyMessage(self):
+        Module.clear()
+        calls = []
+        def build(a, b):
+            calls.append(1)
+            return a + b
+        record = LogRecord(LEVELS.INFO, build, ("file.py", "func"), args=(1, 2))
+        assert calls == []
+        record.render(Target.Type.FILE)
+        record.render(Target.Type.TERMINAL)
+        record.render(Target.Type.FILE, FORMATS.JSONL)
+        assert calls == [1]
+        assert record.message == 3
+
+
+class Test_resolveMessage:
+    def test_resolve(self):
+        assert resolveMessage("message", ()) == "message"
+        assert resolveMessage({"a": 1}, ()) == {"a": 1}
+        assert resolveMessage(lambda: [1, 2], ()) == [1, 2]
+        assert resolveMessage("%s and %d", ("a", 1)) == "a and 1"
+        assert resolveMessage("%(a)s", ({"a": "b"},)) == "b"
+        assert resolveMessage("%s", ((1, 2),)) == "(1, 2)"
+        
+    def test_classIsNotCalled(self):
+        class Message:
+            pass
+        assert resolveMessage(Message, ()) is Message
+        
+    def test_callableObjectIsNotCalled(self):
+        class Model:
+            def __call__(self):
+                raise AssertionError("called")
+        model = Model()
+        assert resolveMessage(model, ()) is model
+        assert resolveMessage(partial(str, 1), ()) == "1"
+        assert resolveMessage([].copy, ()) == []
+        
+    def test_formatError(self):
+        assert resolveMessage("value %d", ("x",)) == "<format error: TypeError: %d format: a real number is required, not str> value %d ('x',)"
+        assert resolveMessage("%s %s", (1,)).startswith("<format error: TypeError: not enough arguments")
+        assert resolveMessage("%(missing)s", ({"a": 1},)).startswith("<format error: KeyError")
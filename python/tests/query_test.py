@@ -0,0 +1,141 @@
+import pytest
+
+import os
+import tempfile
+
+from gamuLogger.query import parseHeader, readRecords, query, main, LogIndex, TextRecord #type: ignore
+from gamuLogger.gamuLogger import Logger, debug, info, warning, error, message, LEVELS, Target, Module #type: ignore
+
+
+def writeLog(filepath : str, showThreadsName : bool = False):
+    Logger.reset()
+    Module.clear()
+    Logger.addTarget(Target.fromFile(filepath), LEVELS.DEBUG)
+    Logger.showThreadsName(showThreadsName)
+    info("starting")
+    Module.new("api", __file__, "writeLog")
+    Module.new("api.auth", __file__, "authenticate")
+    error("failed\nwith details")
+    authenticate()
+    warning({"key": "value"})
+    message("raw message")
+    Module.clear()
+    debug("done")
+    Logger.reset()
+
+
+def authenticate():
+    error("invalid token")
+    info("retry")
+
+
+class Test_Parser:
+    def test_parseHeader(self):
+        assert parseHeader(b"[2024-05-01 10:00:00] [   INFO   ] message\n") == ("2024-05-01 10:00:00", LEVELS.INFO, None)
+        assert parseHeader(b"[2024-05-01 10:00:00.123] [  ERROR   ] [      api      ] [     auth      ] message\n") == ("2024-05-01 10:00:00.123", LEVELS.ERROR, "api.auth")
+        assert parseHeader(b"[2024-05-01 10:00:00] [       main       ] [ " + b"MainThread".center(30) + b" ] [ WARNING  ] message\n") == ("2024-05-01 10:00:00", LEVELS.WARNING, None)
+        assert parseHeader(b"raw message\n") is None
+        assert parseHeader(b" " * 33 + b"| continuation\n") is None
+
+    def test_readRecords(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = os.path.join(tmpdirname, "test.log")
+            writeLog(filepath, showThreadsName=True)
+            with open(filepath, 'rb') as f:
+                records = list(readRecords(f))
+            assert [(record.level, record.module) for record in records] == [
+                (LEVELS.INFO, None),
+                (LEVELS.ERROR, "api"),
+                (LEVELS.ERROR, "api.auth"),
+                (LEVELS.INFO, "api.auth"),
+                (LEVELS.WARNING, "api"),
+                (None, None),
+                (LEVELS.DEBUG, None)
+            ]
+            assert records[1].message == "failed\nwith details"
+            assert records[4].message == '{\n    "key": "value"\n}'
+            assert records[5].message == "raw message"
+            with open(filepath, 'r') as f:
+                assert ''.join(record.text for record in records) == f.read()
+
+    def test_incompleteLine(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = os.path.join(tmpdirname, "test.log")
+            with open(filepath, 'wb') as f:
+                f.write(b"[2024-05-01 10:00:00] [   INFO   ] complete\n[2024-05-01 10:00:01] [   INFO   ] being wri")
+            with open(filepath, 'rb') as f:
+                assert [record.message for record in readRecords(f)] == ["complete"]
+
+
+class Test_Query:
+    def test_query(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = os.path.join(tmpdirname, "test.log")
+            writeLog(filepath)
+            for useIndex in (False, True):
+                assert [record.message for record in query(filepath, levels=[LEVELS.ERROR], modules=["api.auth"], useIndex=useIndex)] == ["invalid token"]
+                assert [record.message for record in query(filepath, levels=[LEVELS.ERROR], modules=["api"], useIndex=useIndex)] == ["failed\nwith details", "invalid token"]
+                assert len(list(query(filepath, useIndex=useIndex))) == 7
+                assert len(list(query(filepath, since="2000", useIndex=useIndex))) == 6 # the raw message has no time
+                assert list(query(filepath, until="2000-01-01", useIndex=useIndex)) == []
+            assert os.path.exists(filepath + ".idx")
+
+    def test_indexSkipsBlocks(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = os.path.join(tmpdirname, "test.log")
+            with open(filepath, 'w') as f:
+                for hour in range(10):
+                    for i in range(100):
+                        level = "  ERROR   " if hour == 5 and i == 50 else "   INFO   "
+                        f.write(f"[2024-05-01 {hour:02d}:00:{i % 60:02d}] [{level}] message {hour} {i}\n")
+            index = LogIndex.open(filepath, blockSize=100)
+            assert len(index.blocks) == 10
+            assert len(index.candidates(levels=[LEVELS.ERROR])) == 1
+            assert len(index.candidates(since="2024-05-01 03", until="2024-05-01 04")) == 2
+            assert [record.message for record in query(filepath, levels=[LEVELS.ERROR])] == ["message 5 50"]
+            assert len(list(query(filepath, since="2024-05-01 03", until="2024-05-01 04"))) == 200
+
+    def test_incrementalUpdate(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = os.path.join(tmpdirname, "test.log")
+            with open(filepath, 'w') as f:
+                f.write("[2024-05-01 10:00:00] [   INFO   ] first\n")
+            assert len(list(query(filepath))) == 1
+            with open(filepath, 'a') as f:
+                f.write("[2024-05-01 10:00:01] [  ERROR   ] second\n" + " " * 33 + "| continued\n")
+            assert [record.message for record in query(filepath, levels=[LEVELS.ERROR])] == ["second\ncontinued"]
+            assert not LogIndex.open(filepath).update() # up to date
+            with open(filepath, 'w') as f: # replaced by a new log
+                f.write("[2024-05-02 10:00:00] [ WARNING  ] new\n")
+            assert [record.message for record in query(filepath)] == ["new"]
+
+    def test_readOnlyDirectory(self, monkeypatch):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = os.path.join(tmpdirname, "test.log")
+            writeLog(filepath)
+            def save(self):
+                raise PermissionError(13, "Permission denied", self.indexPath)
+            monkeypatch.setattr(LogIndex, "save", save)
+            assert len(list(query(filepath))) == 7
+            assert not os.path.exists(filepath + ".idx")
+
+    def test_deepDebug(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = os.path.join(tmpdirname, "test.log")
+            writeLog(filepath)
+            for useIndex in (False, True):
+                assert [record.message for record in query(filepath, levels=[LEVELS.DEEP_DEBUG], useIndex=useIndex)] == ["done"]
+
+    def test_main(self, capsys):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = os.path.join(tmpdirname, "test.log")
+            writeLog(filepath)
+            capsys.readouterr() # the lines printed by the logger
+            main([filepath, "--minLevel", "warning", "--module", "api"])
+            output = capsys.readouterr().out
+            assert "failed\n" in output and "invalid token" in output and '"key": "value"' in output
+            assert "retry" not in output and "starting" not in output
+            main([filepath, "--level", "info", "--count"])
+            assert capsys.readouterr().out == "2\n"
+            main([filepath, "--noIndex", "--reindex", "--level", "debug", "--count"])
+            assert capsys.readouterr().out == "1\n"
@@ -0,0 +1,62 @@
+import pytest
+
+from gamuLogger.redaction import Redactor #type: ignore
+from gamuLogger.customTypes import LoggerConfig #type: ignore
+
+
+class Test_Redactor:
+    def test_empty(self):
+        assert Redactor()("password") == "password"
+        
+    def test_hide(self):
+        redactor = Redactor(["password", "token"])
+        assert redactor("my password and my token") == "my ******** and my *****"
+        assert redactor("password password") == "******** ********"
+        
+    def test_longestFirst(self):
+        redactor = Redactor(["abc", "abcdef"])
+        assert redactor("xabcdefx") == "x******x"
+        
+    def test_specialCharacters(self):
+        redactor = Redactor(["a.b", "(x)"])
+        assert redactor("a.b axb (x) x") == "*** axb *** x"
+        
+    def test_jsonEscaped(self):
+        redactor = Redactor(['pa"ss\\wd', 'tab\tsecret'])
+        assert redactor('{"key": "pa\\"ss\\\\wd", "other": "tab\\tsecret"}') == '{"key": "**********", "other": "***********"}'
+        
+    def test_nonString(self):
+        redactor = Redactor([1234, None, ""])
+        assert redactor("code 1234") == "code ****"
+        
+    def test_manySecrets(self):
+        secrets = [f"secret{i:04d}" for i in range(500)]
+        redactor = Redactor(secrets)
+        assert redactor("secret0042 and secret0499") == "********** and **********"
+        
+        
+class Test_LoggerConfigRedaction:
+    def test_updatedOnChange(self):
+        config = LoggerConfig([], [])
+        assert config.redact("password") == "password"
+        
+        config.addSensitiveData("password")
+        assert config.redact("password") == "********"
+        
+        config.addSensitiveData("token")
+        assert config.redact("token") == "*****"
+        
+        config.removeSensitiveData("password")
+        assert config.redact("password token") == "password *****"
+        pytest.raises(ValueError, config.removeSensitiveData, "password")
+        
+        config.sensitiveDatas = ["other"]
+        assert config.redact("password other") == "password *****"
+        
+    def test_notSharedWithCaller(self):
+        datas = ["password"]
+        config = LoggerConfig(datas, [])
+        assert config.redact("password token") == "******** token"
+        datas.append("token") # a copy is kept, a list edited in place cannot be missed by the cache
+        assert config.sensitiveDatas == ("password",)
+        assert config.redact("password token") == "******** token"
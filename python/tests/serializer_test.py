@@ -0,0 +1,100 @@
+import pytest
+
+import json
+from enum import Enum, IntEnum
+from dataclasses import dataclass
+
+from gamuLogger.serializer import MessageSerializer, orjson #type: ignore
+from gamuLogger.utils import CustomJSONEncoder #type: ignore
+
+
+BACKENDS = ['json', 'orjson'] if orjson is not None else ['json']
+
+
+class Color(Enum):
+    RED = 1
+
+class Number(IntEnum):
+    ONE = 1
+
+@dataclass
+class Point:
+    x : int
+    y : int
+
+class Node:
+    def __init__(self, name : str):
+        self.name = name
+        self.children = [] #type: list[Node]
+
+
+class Test_MessageSerializer:
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_sameAsJson(self, backend):
+        serializer = MessageSerializer(backend=backend)
+        message = {"key": "value", "list": [1, 2.5, True, None, "é"], "nested": {"empty": {}, "emptyList": []}}
+        assert serializer.pretty(message) == json.dumps(message, indent=4, ensure_ascii=False)
+        assert serializer.compact(message) == json.dumps(message, separators=(',', ':'), ensure_ascii=False)
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_types(self, backend):
+        serializer = MessageSerializer(backend=backend)
+        node = Node("root")
+        node.children.append(Node("child"))
+        assert serializer.normalize({
+            "enum": Color.RED,
+            "intEnum": Number.ONE,
+            "dataclass": Point(1, 2),
+            "object": node,
+            "tuple": (1, 2),
+            "set": {3},
+            "bytes": b"ab",
+            1: "int key",
+            None: "none key",
+            "nan": float("nan")
+        }) == {
+            "enum": "RED",
+            "intEnum": 1,
+            "dataclass": {"x": 1, "y": 2},
+            "object": {"name": "root", "children": [{"name": "child", "children": []}]},
+            "tuple": [1, 2],
+            "set": [3],
+            "bytes": "b'ab'",
+            "1": "int key",
+            "null": "none key",
+            "nan": "nan"
+        }
+        assert json.loads(serializer.pretty(Point(1, 2))) == {"x": 1, "y": 2}
+        assert serializer.pretty(2**70) == str(2**70) # too large for orjson
+
+    def test_compatibility(self):
+        serializer = MessageSerializer(backend='json')
+        node = Node("root")
+        message = {"enum": Color.RED, "object": node, "list": [Number.ONE]}
+        assert serializer.pretty(message) == json.dumps(message, indent=4, cls=CustomJSONEncoder)
+
+    def test_limits(self):
+        serializer = MessageSerializer(maxDepth=2, maxItems=3, maxLength=5, maxSize=100)
+        assert serializer.normalize([[["deep"]]]) == [["<list: maximum depth reached>"]]
+        assert serializer.normalize(list(range(10))) == [0, 1, 2, "<7 more items>"]
+        assert serializer.normalize({str(i): i for i in range(5)}) == {"0": 0, "1": 1, "2": 2, "<truncated>": "<2 more items>"}
+        assert serializer.normalize(["abcdefgh"]) == ["abcde...<3 more characters>"]
+
+        serializer = MessageSerializer(maxItems=1000, maxSize=10)
+        result = serializer.normalize([list(range(6)), list(range(6))])
+        assert result[0] == [0, 1, 2, 3, 4, 5]
+        assert result[1] == [0, "<5 more items>"] # 10 values: the 2 lists, their 6 + 1 items and the outer list
+
+    def test_circularReference(self):
+        node = Node("root")
+        node.children.append(node)
+        assert MessageSerializer().normalize(node) == {"name": "root", "children": ["<Node: circular reference>"]}
+        shared = [1]
+        assert MessageSerializer().normalize([shared, shared]) == [[1], [1]] # not a cycle
+
+    def test_configure(self):
+        pytest.raises(ValueError, MessageSerializer, maxDepth=0)
+        pytest.raises(ValueError, MessageSerializer, backend='unknown')
+        serializer = MessageSerializer(maxItems=5, backend='json')
+        assert serializer.options() == (16, 5, 10000, 10000, 'json')
+        assert MessageSerializer().backend == ('orjson' if orjson is not None else 'json')
@@ -0,0 +1,343 @@
+import pytest
+
+import os
+import gzip
+import tempfile
+import threading
+from time import sleep
+
+from gamuLogger.sinks import FileSink, RotatingFileSink, BackgroundWriter, OVERFLOW_POLICIES, parseSize, parseInterval #type: ignore
+from gamuLogger.gamuLogger import Logger, info, error, LEVELS, Target, Module #type: ignore
+
+
+def read(filepath : str) -> str:
+    with open(filepath, 'r') as f:
+        return f.read()
+
+
+class Test_FileSink:
+    def test_writeThrough(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = os.path.join(tmpdirname, "test.log")
+            sink = FileSink(filepath)
+            sink("line1\n")
+            assert read(filepath) == "line1\n"
+            sink.close()
+            
+    def test_truncate(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = os.path.join(tmpdirname, "test.log")
+            with open(filepath, 'w') as f:
+                f.write("old content\n")
+            FileSink(filepath).close()
+            assert read(filepath) == ""
+            
+            with open(filepath, 'w') as f:
+                f.write("old content\n")
+            sink = FileSink(filepath, truncate=False)
+            sink("line1\n")
+            assert read(filepath) == "old content\nline1\n"
+            sink.close()
+            
+    def test_truncatedByAnotherProcess(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = os.path.join(tmpdirname, "test.log")
+            sink = FileSink(filepath)
+            sink("line1\n")
+            os.truncate(filepath, 0) # logrotate with copytruncate
+            sink("line2\n")
+            assert read(filepath) == "line2\n" # no hole of NUL bytes before the line
+            sink.close()
+    
+    def test_bufferSize(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = os.path.join(tmpdirname, "test.log")
+            sink = FileSink(filepath, bufferSize=12, flushInterval=60)
+            sink("line1\n")
+            assert read(filepath) == ""
+            sink("line2\n")
+            assert read(filepath) == "line1\nline2\n"
+            sink("line3\n")
+            sink.flush()
+            assert read(filepath) == "line1\nline2\nline3\n"
+            sink.close()
+            
+    def test_flushInterval(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = os.path.join(tmpdirname, "test.log")
+            sink = FileSink(filepath, bufferSize=1024, flushInterval=0.05)
+            sink("line1\n")
+            assert read(filepath) == ""
+            sleep(0.5)
+            assert read(filepath) == "line1\n"
+            sink.close()
+            
+    def test_reopenAfterClose(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = os.path.join(tmpdirname, "test.log")
+            sink = FileSink(filepath)
+            sink("line1\n")
+            sink.close()
+            assert sink.closed
+            sink("line2\n")
+            assert read(filepath) == "line1\nline2\n"
+            sink.close()
+            
+    def test_flushOnError(self):
+        Logger.reset()
+        Module.clear()
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = os.path.join(tmpdirname, "test.log")
+            Logger.addTarget(Target.fromFile(filepath, bufferSize=1024, flushInterval=60))
+            
+            info("This is a message")
+            assert read(filepath) == ""
+            
+            error("This is an error")
+            result = read(filepath)
+            assert "This is a message" in result
+            assert "This is an error" in result
+            Logger.removeTarget(filepath)
+
+
+class Test_RotatingFileSink:
+    def test_parseSize(self):
+        assert parseSize(100) == 100
+        assert parseSize("100") == 100
+        assert parseSize("2K") == 2048
+        assert parseSize("10MB") == 10 * 1024**2
+        assert parseSize("1.5g") == int(1.5 * 1024**3)
+        
+    def test_parseInterval(self):
+        assert parseInterval(10) == 10.0
+        assert parseInterval("hourly") == 3600.0
+        assert parseInterval("daily") == 86400.0
+        assert parseInterval("30s") == 30.0
+        assert parseInterval("15m") == 900.0
+        assert parseInterval("2h") == 7200.0
+        assert parseInterval("1w") == 604800.0
+        
+    def test_invalid(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = os.path.join(tmpdirname, "test.log")
+            pytest.raises(ValueError, RotatingFileSink, filepath)
+            pytest.raises(ValueError, RotatingFileSink, filepath, maxBytes=10, keep=0)
+            pytest.raises(ValueError, RotatingFileSink, filepath, maxBytes=10, compression="rar")
+    
+    def test_appendAtStartup(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = os.path.join(tmpdirname, "test.log")
+            with open(filepath, 'w') as f:
+                f.write("old content\n")
+            sink = RotatingFileSink(filepath, maxBytes=1000)
+            sink("line1\n")
+            assert read(filepath) == "old content\nline1\n"
+            sink.close()
+    
+    def test_maxBytes(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = os.path.join(tmpdirname, "test.log")
+            sink = RotatingFileSink(filepath, maxBytes=12, keep=2)
+            for i in range(4):
+                sink(f"line{i}\n")
+                sink(f"LINE{i}\n")
+            sink("last\n")
+            RotatingFileSink.waitArchives()
+            
+            assert read(filepath) == "last\n"
+            with gzip.open(filepath + ".1.gz", 'rt') as f:
+                assert f.read() == "line3\nLINE3\n"
+            with gzip.open(filepath + ".2.gz", 'rt') as f:
+                assert f.read() == "line2\nLINE2\n"
+            assert not os.path.exists(filepath + ".3.gz")
+            assert sorted(os.listdir(tmpdirname)) == ["test.log", "test.log.1.gz", "test.log.2.gz"]
+            sink.close()
+            
+    def test_noCompression(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = os.path.join(tmpdirname, "test.log")
+            sink = RotatingFileSink(filepath, maxBytes=6, compression="none")
+            sink("line0\n")
+            sink("line1\n")
+            RotatingFileSink.waitArchives()
+            assert read(filepath + ".2") == "line0\n"
+            assert read(filepath + ".1") == "line1\n"
+            assert read(filepath) == ""
+            sink.close()
+            
+    def test_interval(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = os.path.join(tmpdirname, "test.log")
+            sink = RotatingFileSink(filepath, interval=0.2, compression="none")
+            sink("line0\n")
+            sleep(0.3)
+            sink("line1\n")
+            RotatingFileSink.waitArchives()
+            assert read(filepath + ".1") == "line0\n"
+            assert read(filepath) == "line1\n"
+            sink.close()
+            
+    def test_fromJson(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = os.path.join(tmpdirname, "test.log")
+            target = Target.fromJson({"file": filepath, "rotate": "daily", "maxBytes": "1M", "keep": 3, "compression": "none"})
+            assert isinstance(target.target, RotatingFileSink)
+            assert target.target.maxBytes == 1024**2
+            assert target.target.interval == 86400
+            assert target.target.keep == 3
+            target.close()
+            Target.clear()
+            
+    def test_addTarget(self):
+        Logger.reset()
+        Module.clear()
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = os.path.join(tmpdirname, "test.log")
+            Logger.addTarget(filepath, LEVELS.INFO, maxBytes=10, keep=1)
+            info("This is a message")
+            info("This is another message")
+            RotatingFileSink.waitArchives()
+            with gzip.open(filepath + ".1.gz", 'rt') as f:
+                assert "This is another message" in f.read()
+            Logger.removeTarget(filepath)
+        
+    def test_parseArgs(self):
+        import argparse
+        Logger.reset()
+        Module.clear()
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            filepath = os.path.join(tmpdirname, "test.log")
+            parser = argparse.ArgumentParser()
+            Logger.configArgParse(parser)
+            Logger.parseArgs(parser.parse_args(["--addTarget", filepath, "debug", "rotate=hourly", "keep=2"]))
+            target = Target.get(filepath)
+            assert isinstance(target.target, RotatingFileSink)
+            assert target.target.interval == 3600
+            assert target.target.keep == 2
+            assert target["level"] == LEVELS.DEBUG
+            Logger.removeTarget(filepath)
+        Logger.reset()
+
+
+class SlowOutput:
+    """Output that blocks until `release` is set"""
+    def __init__(self):
+        self.lines = []
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.flushed = 0
+        
+    def __call__(self, string):
+        self.started.set()
+        self.release.wait()
+        self.lines.append(string)
+        
+    def flush(self):
+        self.flushed += 1
+
+
+class Test_BackgroundWriter:
+    def test_order(self):
+        out = []
+        writer = BackgroundWriter(out.append)
+        for i in range(1000):
+            writer(f"line{i}")
+        assert writer.flush(5)
+        assert out == [f"line{i}" for i in range(1000)]
+        writer.close()
+        
+    def test_flushOutput(self):
+        output = SlowOutput()
+        output.release.set()
+        writer = BackgroundWriter(output, output.flush)
+        writer("line")
+        writer.flush(5)
+        assert output.lines == ["line"]
+        assert output.flushed == 1
+        writer.close()
+        
+    def test_dropNewest(self):
+        output = SlowOutput()
+        writer = BackgroundWriter(output, queueSize=2, overflowPolicy=OVERFLOW_POLICIES.DROP_NEWEST, batchSize=1)
+        writer("line0")
+        output.started.wait(5) # line0 is being written, the queue is empty
+        for i in range(1, 5):
+            writer(f"line{i}")
+        assert writer.dropped == 2
+        output.release.set()
+        writer.close(5)
+        assert output.lines == ["line0", "line1", "line2"]
+        
+    def test_dropOldest(self):
+        output = SlowOutput()
+        writer = BackgroundWriter(output, queueSize=2, overflowPolicy=OVERFLOW_POLICIES.DROP_OLDEST, batchSize=1)
+        writer("line0")
+        output.started.wait(5)
+        for i in range(1, 5):
+            writer(f"line{i}")
+        assert writer.dropped == 2
+        output.release.set()
+        writer.close(5)
+        assert output.lines == ["line0", "line3", "line4"]
+        
+    @pytest.mark.parametrize("policy", [OVERFLOW_POLICIES.DROP_NEWEST, OVERFLOW_POLICIES.DROP_OLDEST])
+    def test_flushRequestsBounded(self, policy):
+        output = SlowOutput()
+        writer = BackgroundWriter(output, output.flush, queueSize=10, overflowPolicy=policy, batchSize=1)
+        writer("line")
+        output.started.wait(5) # the output is stalled
+        for i in range(10000): # an error storm: every line asks for a flush
+            writer(f"line{i}")
+            writer.requestFlush()
+        assert writer.pending == 10
+        assert len(writer._BackgroundWriter__queue) <= 2 * 10 + 1
+        output.release.set()
+        writer.close(5)
+        assert output.flushed >= 1
+        
+    def test_block(self):
+        output = SlowOutput()
+        writer = BackgroundWriter(output, queueSize=1, overflowPolicy=OVERFLOW_POLICIES.BLOCK, batchSize=1)
+        writer("line0")
+        output.started.wait(5)
+        writer("line1")
+        
+        done = threading.Event()
+        def produce():
+            writer("line2")
+            done.set()
+        threading.Thread(target=produce).start()
+        assert not done.wait(0.1)
+        
+        output.release.set()
+        assert done.wait(5)
+        writer.close(5)
+        assert output.lines == ["line0", "line1", "line2"]
+        assert writer.dropped == 0
+        
+    def test_overflowPolicy_from_string(self):
+        assert OVERFLOW_POLICIES.from_string("block") == OVERFLOW_POLICIES.BLOCK
+        assert OVERFLOW_POLICIES.from_string("dropOldest") == OVERFLOW_POLICIES.DROP_OLDEST
+        assert OVERFLOW_POLICIES.from_string("drop-newest") == OVERFLOW_POLICIES.DROP_NEWEST
+        pytest.raises(ValueError, OVERFLOW_POLICIES.from_string, "invalid")
+        
+    def test_nonBlockingTarget(self):
+        Logger.reset()
+        Module.clear()
+        
+        out = []
+        def customFunction(message):
+            out.append((threading.current_thread().name, message))
+        
+        Logger.addTarget(customFunction)
+        Logger.setNonBlocking("customFunction")
+        info("This is a message")
+        Logger.flush()
+        
+        assert len(out) == 1
+        assert out[0][0] == "gamuLogger-writer-customFunction"
+        assert "This is a message" in out[0][1]
+        
+        Logger.setNonBlocking("customFunction", False)
+        assert not Target.get("customFunction").nonBlocking
+        Logger.reset()
@@ -3,15 +3,27 @@ import pytest
 import sys
 import os
 import re
+import tempfile
+from time import strftime, localtime
 
 FILEPATH = os.path.abspath(__file__)
 
-from gamuLogger.utils import getCallerInfo, getTime, replaceNewLine, centerString, strictTypeCheck, splitLongString #type: ignore
+from gamuLogger.utils import getCallerInfo, getTime, replaceNewLine, centerString, strictTypeCheck, splitLongString, QualnameIndex, getAllParents, setStrictTypeCheck #type: ignore
 
 
 def test_getTime():
     assert re.match(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}", getTime())
     
+def test_getTime_precision():
+    timestamp = 1_700_000_000_123_456_789
+    expected = strftime("%Y-%m-%d %H:%M:%S", localtime(1_700_000_000))
+    assert getTime(timestamp) == expected
+    assert getTime(timestamp, 3) == expected + ".123"
+    assert getTime(timestamp, 6) == expected + ".123456"
+    assert getTime(timestamp + 1_000_000_000) == strftime("%Y-%m-%d %H:%M:%S", localtime(1_700_000_001))
+    assert getTime(1_700_000_000_000_001_000, 6) == expected + ".000001"
+    pytest.raises(ValueError, getTime, timestamp, 2)
+    
 def test_replaceNewLine():
     assert replaceNewLine("Hello\nWorld") == "Hello\n                                 | World"
     assert replaceNewLine("Hello\nWorld", 10) == "Hello\n          | World"
@@ -63,10 +75,93 @@ def test_strictTypeCheck():
     
     with pytest.raises(TypeError):
         test3("1")
+    
+def test_strictTypeCheck_varArgs():
+    @strictTypeCheck
+    def test(a : int, *args, b : str = "Hello", **kwargs):
+        pass
+    
+    test(1, "2", 3.0, b="4", c=5)
+    
+    with pytest.raises(TypeError):
+        test("1", 2)
+        
+    with pytest.raises(TypeError):
+        test(1, b=2)
+        
+def test_setStrictTypeCheck():
+    @strictTypeCheck
+    def test(a : int):
+        pass
+    
+    setStrictTypeCheck(False)
+    try:
+        test("1")
+    finally:
+        setStrictTypeCheck(True)
+        
+    with pytest.raises(TypeError):
+        test("1")
 
 def test_splitLongString():
     assert splitLongString("Hello World", 5) == "Hello\nWorld"
     assert splitLongString("Hello World", 6) == "Hello\nWorld"
-    pytest.raises(ValueError, splitLongString, "Hello World", 2)
-    pytest.raises(ValueError, splitLongString, "HelloWorld", 8)
-    assert splitLongString("Hello World", 11) == "Hello World"
\ No newline at end of file
+    assert splitLongString("Hello World", 2) == "He\nll\no\nWo\nrl\nd"
+    assert splitLongString("HelloWorld", 8) == "HelloWor\nld"
+    assert splitLongString("a " + "x" * 10 + " b", 4) == "a\nxxxx\nxxxx\nxx b"
+    assert splitLongString("aaa bbb\nccc", 5) == "aaa\nbbb\nccc"
+    assert splitLongString("a  b " * 40, 150).replace("\n", " ") == "a  b " * 40 # only the spaces where lines are cut change
+    assert splitLongString("Hello World", 11) == "Hello World"
+
+def whoCalls():
+    return getCallerInfo()
+
+class MyClass:
+    def method(self):
+        return whoCalls()
+
+def test_getCallerInfo():
+    def nested():
+        return whoCalls()
+    
+    assert whoCalls() == (FILEPATH, "test_getCallerInfo")
+    assert nested() == (FILEPATH, "test_getCallerInfo.nested")
+    assert MyClass().method() == (FILEPATH, "MyClass.method")
+
+    
+def test_QualnameIndex():
+    index = QualnameIndex(
+        "class A:\n"                       # 1
+        "    def method(self):\n"          # 2
+        "        def inner():\n"           # 3
+        "            pass\n"               # 4
+        "        return 1\n"               # 5
+        "    classic = 'define'\n"         # 6
+        "\n"                               # 7
+        "async def func():\n"              # 8
+        "    if True:\n"                   # 9
+        "        x = 'class B:'\n"         # 10
+        "        return x\n"               # 11
+    )
+    assert index.get(1) == ("A",)
+    assert index.get(4) == ("A", "method", "inner")
+    assert index.get(5) == ("A", "method")
+    assert index.get(6) == ("A",)
+    assert index.get(7) == ()
+    assert index.get(11) == ("func",)
+    assert QualnameIndex("this is not python").get(1) == ()
+    
+def test_getAllParents():
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        filepath = os.path.join(tmpdirname, "source.py")
+        with open(filepath, "w") as f:
+            f.write("class A:\n    def method(self):\n        pass\n")
+        assert getAllParents(filepath, 3) == ["method", "A"]
+        
+        # the index is rebuilt when the file changes
+        with open(filepath, "w") as f:
+            f.write("def func():\n    pass\n")
+        os.utime(filepath, (0, 0))
+        assert getAllParents(filepath, 2) == ["func"]
+        
+    assert getAllParents("<string>", 1) == []